@@ -7,7 +7,9 @@ from dispatcher.constant import Language
 from dispatcher.dispatcher import Dispatcher
 from dispatcher.exception import DuplicatedSubmissionIdError
 from dispatcher.testdata import (
+    checker_api_key_cache_stats,
     ensure_testdata,
+    invalidate_checker_api_key,
     get_problem_meta,
     get_problem_root,
     # Trial Mode support
@@ -17,6 +19,7 @@ from dispatcher.testdata import (
     scan_and_generate_tasks,
 )
 from dispatcher.trial_testdata import prepare_custom_testdata
+from dispatcher.pipeline import invalidate_problem_rules, rules_cache_stats
 from dispatcher.config import SANDBOX_TOKEN, SUBMISSION_DIR
 
 logging.basicConfig(
@@ -59,6 +62,13 @@ def submit(submission_id: str):
         return "missing problem id", 400
     language = Language(request.form.get("language", type=int))
 
+    # keep the problem's cached testdata from being evicted while preparing
+    with DISPATCHER.testdata_cache.pinned(problem_id):
+        return _dispatch_submission(submission_id, problem_id, language)
+
+
+def _dispatch_submission(submission_id: str, problem_id: int,
+                         language: Language):
     # === Trial Submission Support ===
     # submission_type: "normal" (default) or "trial"
     submission_type = request.form.get("submission_type", "normal")
@@ -178,6 +188,27 @@ def submit(submission_id: str):
     })
 
 
+@app.post("/problem/<int:problem_id>/invalidate")
+def invalidate_problem(problem_id: int):
+    """
+    Called by the backend after a problem is edited, so cached per-problem
+    data is not served until its TTL runs out.
+    """
+    token = request.values.get("token", "")
+    if not secrets.compare_digest(token, SANDBOX_TOKEN):
+        logger.debug(f"get invalid token: {token}")
+        return "invalid token", 403
+    invalidate_problem_rules(problem_id)
+    invalidate_checker_api_key(problem_id)
+    # rebuild custom env images now if their Dockerfiles changed
+    DISPATCHER.network_controller.prebuild_custom_images(problem_id)
+    return jsonify({
+        "status": "ok",
+        "msg": "ok",
+        "data": "ok",
+    })
+
+
 @app.get("/status")
 def status():
     ret = {
@@ -192,7 +223,20 @@ def status():
             "maxContainerCount": DISPATCHER.MAX_TASK_COUNT,
             "submissions": [*DISPATCHER.result.keys()],
             "running": DISPATCHER.do_run,
+            "testdataCache": DISPATCHER.testdata_cache.stats(),
+            "staticAnalysisCache": DISPATCHER.sa_cache.stats(),
+            "checkerVerdictCache": DISPATCHER.checker_cache.stats(),
+            "customChecker": DISPATCHER.checker_stats(),
+            "checkerApiKeyCache": checker_api_key_cache_stats(),
+            "staticAnalysisRules": rules_cache_stats(),
         })
+        ret["networkProvisioning"] = (
+            DISPATCHER.network_controller.provision_stats())
+        ret["serviceReadiness"] = (
+            DISPATCHER.network_controller.readiness_stats())
+        ret["topologyPool"] = (
+            DISPATCHER.network_controller.topology_pool_stats())
+        ret["imageBuilds"] = DISPATCHER.network_controller.image_build_stats()
     return jsonify(ret), 200
 
 
@@ -10,7 +10,9 @@ from typing import Tuple
 
 from .constant import Language
 from .utils import logger
-from .testdata import ensure_ac_code
+from .build_cache import BuildCache
+from .cache_manager import AC_BUILD_KIND
+from .testdata import ensure_ac_code, read_ac_code_checksum
 from runner.ac_code_runner import ACCodeRunner, ACCodeCompileError, ACCodeRunError
 
 # Language enum to runner lang_key mapping
@@ -20,6 +22,12 @@ LANG_KEY_MAP = {
     Language.PY: "python3",
 }
 
+# Files produced by compiling AC code (see SubmissionRunner.compile_at_path)
+AC_BUILD_FILES = ("teacher_main", "main")
+
+# compiled AC code shared by the trial submissions of a problem
+_ac_builds = BuildCache(AC_BUILD_KIND, files=AC_BUILD_FILES)
+
 
 def get_ac_runner(problem_id: int) -> ACCodeRunner:
     """
@@ -27,7 +35,8 @@ def get_ac_runner(problem_id: int) -> ACCodeRunner:
     
     This function:
     1. Fetches AC code from cache (downloads if needed)
-    2. Compiles if C/C++
+    2. Compiles if C/C++, or reuses the binary compiled for the same
+       AC code checksum, language and compile image
     3. Returns ready-to-use runner
     
     Args:
@@ -56,18 +65,28 @@ def get_ac_runner(problem_id: int) -> ACCodeRunner:
 
     # Compile C/C++
     if lang_enum in (Language.C, Language.CPP):
-        logger().info(f"Compiling AC code for problem {problem_id}")
-        result = runner.compile()
+        checksum = read_ac_code_checksum(ac_code_path)
+        if checksum is None:
+            _compile_ac_code(runner, problem_id)
+            return runner
+        _ac_builds.reuse_or_build(problem_id,
+                                  _ac_builds.key(checksum,
+                                                 lang_key), ac_code_path,
+                                  lambda: _compile_ac_code(runner, problem_id))
+
+    return runner
 
-        if result.get("Status") != "AC":
-            stderr = result.get("Stderr", "Unknown error")
-            raise ACCodeCompileError(
-                f"AC code compile failed for problem {problem_id}: {stderr}")
 
-        logger().info(
-            f"AC code compiled successfully for problem {problem_id}")
+def _compile_ac_code(runner: ACCodeRunner, problem_id: int):
+    logger().info(f"Compiling AC code for problem {problem_id}")
+    result = runner.compile()
 
-    return runner
+    if result.get("Status") != "AC":
+        stderr = result.get("Stderr", "Unknown error")
+        raise ACCodeCompileError(
+            f"AC code compile failed for problem {problem_id}: {stderr}")
+
+    logger().info(f"AC code compiled successfully for problem {problem_id}")
 
 
 def generate_ac_outputs(
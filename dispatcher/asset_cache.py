@@ -9,7 +9,9 @@ import requests
 
 from .config import BACKEND_API, SANDBOX_TOKEN, TESTDATA_ROOT
 from .testdata import fetch_problem_asset
-from .utils import get_redis_client, logger
+from .coordination import get_coordination_backend
+from .utils import logger
+from .cache_manager import get_cache_manager
 from .file_manager import _safe_extract_zip
 
 ASSET_FILENAME_MAP = {
@@ -70,7 +72,7 @@ def ensure_custom_asset(
     filename: Optional[str] = None,
 ) -> Path:
     """
-    Ensure custom asset is up-to-date using Redis checksum.
+    Ensure custom asset is up-to-date using the cached checksum.
 
     Returns cache file path (TESTDATA_ROOT/<pid>/<asset_type>/<filename>).
     """
@@ -80,7 +82,7 @@ def ensure_custom_asset(
             f"filename required for asset_type '{asset_type}' (no default mapping)"
         )
 
-    client = get_redis_client()
+    client = get_coordination_backend()
     redis_key = f"problem-{problem_id}-{asset_type}-checksum"
     lock_key = f"{redis_key}-lock"
 
@@ -117,6 +119,7 @@ def ensure_custom_asset(
                 problem_id,
                 asset_type,
             )
+            get_cache_manager().touch(problem_id, asset_type, cache_dir)
             return asset_path
 
         # cache miss or outdated -> re-download
@@ -126,6 +129,10 @@ def ensure_custom_asset(
         asset_path.write_bytes(data)
         checksum_to_store = backend_checksum or _md5_bytes(data)
         client.setex(redis_key, 600, checksum_to_store)
+        get_cache_manager().touch(problem_id,
+                                  asset_type,
+                                  cache_dir,
+                                  refreshed=True)
         return asset_path
 
 
@@ -136,7 +143,7 @@ def ensure_extracted_resource(
     """
     Ensure resource zip is extracted to extracted/ directory.
     
-    Uses Redis lock to prevent concurrent extraction.
+    Uses a coordination lock to prevent concurrent extraction.
     Returns extracted/ directory path, or None if asset not configured.
     
     asset_type: "resource_data" | "resource_data_teacher" | "network_dockerfile"
@@ -156,7 +163,7 @@ def ensure_extracted_resource(
         )
         return None
 
-    client = get_redis_client()
+    client = get_coordination_backend()
     extracted_key = f"problem-{problem_id}-{asset_type}-extracted"
     lock_key = f"{extracted_key}-lock"
 
@@ -213,4 +220,8 @@ def ensure_extracted_resource(
 
         # Store extraction state
         client.setex(extracted_key, 600, zip_checksum)
+        get_cache_manager().touch(problem_id,
+                                  asset_type,
+                                  cache_dir,
+                                  refreshed=True)
         return extracted_dir
@@ -0,0 +1,118 @@
+"""
+Compiled programs shared by the submissions of a problem.
+
+Interactive teachers (build_strategy) and AC code for trial outputs
+(ac_code) are compiled once per build key into
+TESTDATA_ROOT/<pid>/<kind>/<key> and copied out of there. The key covers
+the source (by digest), its language and the compile image, so a build is
+reused until one of them changes.
+
+Builds are copies, not hard links: the orchestrator chowns / chmods the
+teacher dir of every submission, which would rewrite the cache entry and
+every other copy sharing the inode.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+from .cache_manager import get_cache_manager
+from .config import TESTDATA_ROOT, get_submission_config
+from .utils import logger
+
+# present in every build, its absence means there is nothing to reuse
+BUILD_MARKER = "teacher_main"
+
+
+class BuildCache:
+
+    def __init__(self, kind: str, files: Optional[tuple] = None):
+        """`files` are the names copied in and out, None for every file."""
+        self.kind = kind
+        self.files = files
+        # build dir -> lock held while it is being built
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def key(source_digest: str, lang_key: str) -> str:
+        image = get_submission_config().get("image", {}).get(lang_key, "")
+        parts = [source_digest, lang_key, image]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
+
+    def path(self, problem_id: int, key: str) -> Path:
+        return TESTDATA_ROOT / str(problem_id) / self.kind / key
+
+    def reuse_or_build(self, problem_id: int, key: str, dest_dir: Path,
+                       build: Callable[[], None]):
+        """
+        Copy the build of `key` into `dest_dir`, or run `build` (which
+        compiles in `dest_dir`) and publish its result. One build per key,
+        concurrent callers wait and copy it.
+        """
+        cache_dir = self.path(problem_id, key)
+        with self._lock(cache_dir):
+            if self._fetch(cache_dir, dest_dir, problem_id):
+                return
+            build()
+            self._publish(dest_dir, cache_dir, problem_id)
+
+    def _lock(self, cache_dir: Path) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(str(cache_dir), threading.Lock())
+
+    def _copy_files(self, src_dir: Path, dest_dir: Path):
+        for item in src_dir.iterdir():
+            if not item.is_file() or (self.files is not None
+                                      and item.name not in self.files):
+                continue
+            target = dest_dir / item.name
+            if target.exists() or target.is_symlink():
+                target.unlink()
+            shutil.copy2(item, target)
+
+    def _fetch(self, cache_dir: Path, dest_dir: Path, problem_id: int) -> bool:
+        if not (cache_dir / BUILD_MARKER).exists():
+            return False
+        try:
+            self._copy_files(cache_dir, dest_dir)
+        except OSError as exc:
+            # e.g. evicted meanwhile, build again
+            logger().warning(f"failed to copy cached {self.kind} "
+                             f"[problem_id={problem_id}]: {exc}")
+            return False
+        get_cache_manager().touch(problem_id, self.kind, cache_dir.parent)
+        logger().debug(f"{self.kind} cache hit [problem_id={problem_id}, "
+                       f"key={cache_dir.name}]")
+        return True
+
+    def _publish(self, src_dir: Path, cache_dir: Path, problem_id: int):
+        """
+        Publish atomically (staging dir + rename), so other processes never
+        copy a half written build, and drop the builds of other keys.
+        """
+        if not (src_dir / BUILD_MARKER).exists():
+            return
+        staging = cache_dir.with_name(
+            f".{cache_dir.name}-{os.getpid()}-{threading.get_ident()}")
+        try:
+            shutil.rmtree(staging, ignore_errors=True)
+            staging.mkdir(parents=True)
+            self._copy_files(src_dir, staging)
+            os.rename(staging, cache_dir)
+        except OSError as exc:
+            # another process published the same build first
+            logger().debug(
+                f"{self.kind} not cached [problem_id={problem_id}]: {exc}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        for sibling in cache_dir.parent.iterdir():
+            if sibling != cache_dir and not sibling.name.startswith("."):
+                shutil.rmtree(sibling, ignore_errors=True)
+        get_cache_manager().touch(problem_id,
+                                  self.kind,
+                                  cache_dir.parent,
+                                  refreshed=True)
@@ -1,3 +1,4 @@
+import hashlib
 import io
 import os
 import shutil
@@ -10,6 +11,8 @@ from typing import Callable, Iterable, Optional
 from .constant import AcceptedFormat, Language
 from .meta import Meta
 from .asset_cache import ensure_custom_asset, AssetNotFoundError
+from .build_cache import BuildCache
+from .cache_manager import TEACHER_BUILD_KIND
 from runner.submission import SubmissionRunner
 
 
@@ -17,6 +20,9 @@ class BuildStrategyError(ValueError):
     """Raised when a build strategy cannot be applied."""
 
 
+# compiled teachers shared by the submissions of a problem
+_teacher_builds = BuildCache(TEACHER_BUILD_KIND)
+
 _LANG_KEYS = {
     Language.C: "c11",
     Language.CPP: "cpp17",
@@ -297,9 +303,21 @@ def _prepare_teacher_artifacts(meta: Meta,
         if not src_path.exists():
             raise BuildStrategyError("teacher script missing")
         return
+    lang_key = _lang_key(teacher_lang)
+    if problem_id is None:
+        _compile_teacher(teacher_dir, lang_key, problem_id)
+        return
+    key = _teacher_builds.key(
+        hashlib.md5(src_path.read_bytes()).hexdigest(), lang_key)
+    _teacher_builds.reuse_or_build(
+        problem_id, key, teacher_dir,
+        lambda: _compile_teacher(teacher_dir, lang_key, problem_id))
+
+
+def _compile_teacher(teacher_dir: Path, lang_key: str, problem_id):
     compile_res = SubmissionRunner.compile_at_path(
         src_dir=str(teacher_dir.resolve()),
-        lang=_lang_key(teacher_lang),
+        lang=lang_key,
     )
     if compile_res.get("Status") != "AC":
         err_msg = compile_res.get("Stderr") or compile_res.get(
@@ -322,8 +340,6 @@ def _prepare_teacher_artifacts(meta: Meta,
             os.link(binary, main_exec)
         except Exception:
             try:
-                import shutil
-
                 shutil.copy(binary, main_exec)
             except Exception:
                 pass
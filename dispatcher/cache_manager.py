@@ -0,0 +1,334 @@
+"""
+Disk budget for the artifacts cached under TESTDATA_ROOT.
+
+Every problem accumulates testdata, public testdata, asset caches (with their
+``extracted/`` trees), AC code and per-submission trial testdata. The
+coordination keys only expire their checksums, the files stay forever. The
+cache manager records size and last access per artifact and evicts the least
+recently used ones once the configured budget is exceeded. Artifacts of
+problems with in-flight submissions are pinned and never evicted.
+"""
+
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .config import TESTDATA_CACHE_BUDGET, TESTDATA_ROOT
+from .coordination import get_coordination_backend
+from .utils import logger
+
+# directories directly under TESTDATA_ROOT that are not problem ids
+AC_CODE_KIND = "ac_code"
+TRIAL_KIND = "trial"
+TESTDATA_KIND = "testdata"
+PUBLIC_KIND = "public"
+# compiled interactive teachers in TESTDATA_ROOT/<pid>/teacher_build/<key>
+TEACHER_BUILD_KIND = "teacher_build"
+# compiled AC code for trial outputs in TESTDATA_ROOT/<pid>/ac_build/<key>
+AC_BUILD_KIND = "ac_build"
+# keyed by content, so they stay valid when the problem's testdata changes
+BUILD_KINDS = (TEACHER_BUILD_KIND, AC_BUILD_KIND)
+# asset caches living in TESTDATA_ROOT/<pid>/<asset_type>
+ASSET_KINDS = (
+    "checker",
+    "scoring_script",
+    "makefile",
+    "resource_data",
+    "resource_data_teacher",
+    "network_dockerfile",
+    "teacher_file",
+)
+
+
+@dataclass
+class CacheEntry:
+    problem_id: Optional[int]
+    kind: str
+    name: str
+    path: Path
+    size: int = 0
+    last_access: float = field(default_factory=time.time)
+
+    @property
+    def key(self) -> tuple:
+        return (self.kind, self.name)
+
+
+def _coordination_keys(entry: CacheEntry) -> list[str]:
+    """Checksum keys that claim the artifact is up to date."""
+    pid = entry.problem_id
+    if entry.kind == TESTDATA_KIND:
+        return [f"problem-{pid}-checksum"]
+    if entry.kind == PUBLIC_KIND:
+        return [f"problem-{pid}-public-checksum"]
+    if entry.kind == AC_CODE_KIND:
+        return [f"problem-{pid}-ac-code-checksum"]
+    if entry.kind in (TRIAL_KIND, TEACHER_BUILD_KIND, AC_BUILD_KIND):
+        return []
+    return [
+        f"problem-{pid}-{entry.kind}-checksum",
+        f"problem-{pid}-{entry.kind}-extracted",
+    ]
+
+
+def _dir_size(path: Path, skip: set[Path]) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    total = 0
+    for root, dirs, files in os.walk(path):
+        root_path = Path(root)
+        dirs[:] = [d for d in dirs if root_path / d not in skip]
+        for name in files:
+            try:
+                total += (root_path / name).lstat().st_size
+            except OSError:
+                continue
+    return total
+
+
+class CacheManager:
+
+    def __init__(self, root: Path, budget: int):
+        self.root = Path(root)
+        # budget in bytes, 0 disables eviction
+        self.budget = budget
+        self.entries: dict[tuple, CacheEntry] = {}
+        self.pins: dict[int, int] = {}
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self._lock = threading.RLock()
+
+    def _entry_name(self, problem_id, kind: str, name: Optional[str]) -> str:
+        if name is not None:
+            return str(name)
+        return str(problem_id)
+
+    def _nested_paths(self, entry: CacheEntry) -> set[Path]:
+        return {
+            other.path
+            for other in self.entries.values() if other is not entry
+            and other.path != entry.path and entry.path in other.path.parents
+        }
+
+    def touch(
+        self,
+        problem_id: Optional[int],
+        kind: str,
+        path: Path,
+        name: Optional[str] = None,
+        refreshed: bool = False,
+    ):
+        """
+        Record an access to a cached artifact. `refreshed` means its content
+        was (re)written, so the size is measured again and the budget is
+        enforced.
+        """
+        path = Path(path)
+        key = (kind, self._entry_name(problem_id, kind, name))
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.path != path:
+                entry = CacheEntry(
+                    problem_id=problem_id,
+                    kind=kind,
+                    name=key[1],
+                    path=path,
+                )
+                self.entries[key] = entry
+                refreshed = True
+            entry.last_access = time.time()
+            if refreshed:
+                self._measure(entry)
+        if refreshed:
+            self.enforce_budget()
+
+    def forget(self, kind: str, name: str):
+        with self._lock:
+            self.entries.pop((kind, str(name)), None)
+
+    def _measure(self, entry: CacheEntry):
+        if not entry.path.exists():
+            entry.size = 0
+            return
+        entry.size = _dir_size(entry.path, self._nested_paths(entry))
+
+    def pin(self, problem_id: int):
+        with self._lock:
+            self.pins[problem_id] = self.pins.get(problem_id, 0) + 1
+
+    def unpin(self, problem_id: int):
+        with self._lock:
+            count = self.pins.get(problem_id, 0) - 1
+            if count > 0:
+                self.pins[problem_id] = count
+            else:
+                self.pins.pop(problem_id, None)
+
+    @contextmanager
+    def pinned(self, problem_id: int):
+        self.pin(problem_id)
+        try:
+            yield
+        finally:
+            self.unpin(problem_id)
+
+    def is_pinned(self, entry: CacheEntry) -> bool:
+        return entry.problem_id is not None and entry.problem_id in self.pins
+
+    def used_bytes(self) -> int:
+        with self._lock:
+            return sum(e.size for e in self.entries.values())
+
+    def enforce_budget(self) -> list[CacheEntry]:
+        """
+        Evict least recently used, unpinned artifacts until the total size
+        fits the budget. Returns the evicted entries.
+        """
+        if self.budget <= 0:
+            return []
+        evicted = []
+        with self._lock:
+            used = sum(e.size for e in self.entries.values())
+            candidates = sorted(
+                (e for e in self.entries.values() if not self.is_pinned(e)),
+                key=lambda e: e.last_access,
+            )
+            for entry in candidates:
+                if used <= self.budget:
+                    break
+                if not self._evict(entry):
+                    continue
+                used -= entry.size
+                evicted.append(entry)
+        if used > self.budget:
+            logger().warning(
+                "testdata cache over budget after eviction [used=%s, budget=%s, pinned=%s]",
+                used,
+                self.budget,
+                sorted(self.pins),
+            )
+        return evicted
+
+    def _evict(self, entry: CacheEntry) -> bool:
+        """Remove the entry, False if it (or its keys) could not be removed
+        and it is kept for a later attempt."""
+        keys = _coordination_keys(entry)
+        if keys:
+            # drop the checksum first so the next ensure_* refetches
+            try:
+                get_coordination_backend().delete(*keys)
+            except Exception as exc:
+                logger().warning(
+                    "failed to drop cache keys on eviction [keys=%s]: %s",
+                    keys,
+                    exc,
+                )
+                return False
+        nested = self._nested_paths(entry)
+        try:
+            if entry.path.is_dir() and nested:
+                for child in entry.path.iterdir():
+                    if child in nested:
+                        continue
+                    if child.is_dir():
+                        shutil.rmtree(child)
+                    else:
+                        child.unlink()
+            elif entry.path.is_dir():
+                shutil.rmtree(entry.path)
+            elif entry.path.exists():
+                entry.path.unlink()
+        except OSError as exc:
+            logger().warning("failed to evict cache entry [path=%s]: %s",
+                             entry.path, exc)
+            return False
+        self.entries.pop(entry.key, None)
+        self.evictions += 1
+        self.evicted_bytes += entry.size
+        logger().info(
+            "evicted cached artifact [problem_id=%s, kind=%s, size=%s]",
+            entry.problem_id,
+            entry.kind,
+            entry.size,
+        )
+        return True
+
+    def scan(self):
+        """
+        Register artifacts left on disk by a previous process, using the
+        directory mtime as last access.
+        """
+        if not self.root.exists():
+            return
+        nested_kinds = (PUBLIC_KIND, TEACHER_BUILD_KIND, AC_BUILD_KIND,
+                        *ASSET_KINDS)
+        with self._lock:
+            for child in self.root.iterdir():
+                if not child.is_dir():
+                    continue
+                if child.name in (AC_CODE_KIND, TRIAL_KIND):
+                    for sub in child.iterdir():
+                        if not sub.is_dir():
+                            continue
+                        if child.name == AC_CODE_KIND and sub.name.isdigit():
+                            self._register(int(sub.name), AC_CODE_KIND, sub)
+                        elif child.name == TRIAL_KIND:
+                            self._register(None, TRIAL_KIND, sub, sub.name)
+                    continue
+                if not child.name.isdigit():
+                    continue
+                pid = int(child.name)
+                for sub in child.iterdir():
+                    if sub.is_dir() and sub.name in nested_kinds:
+                        self._register(pid, sub.name, sub)
+                self._register(pid, TESTDATA_KIND, child)
+            for entry in self.entries.values():
+                self._measure(entry)
+
+    def _register(self, problem_id, kind: str, path: Path, name=None):
+        key = (kind, self._entry_name(problem_id, kind, name))
+        if key in self.entries:
+            return
+        self.entries[key] = CacheEntry(
+            problem_id=problem_id,
+            kind=kind,
+            name=key[1],
+            path=path,
+            last_access=path.stat().st_mtime,
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_kind = {}
+            for entry in self.entries.values():
+                by_kind[entry.kind] = by_kind.get(entry.kind, 0) + entry.size
+            return {
+                "budgetBytes": self.budget,
+                "usedBytes": sum(by_kind.values()),
+                "usedBytesByKind": by_kind,
+                "entryCount": len(self.entries),
+                "pinnedProblems": sorted(self.pins),
+                "evictions": self.evictions,
+                "evictedBytes": self.evicted_bytes,
+            }
+
+
+_cache_manager = None
+_cache_manager_lock = threading.Lock()
+
+
+def get_cache_manager() -> CacheManager:
+    global _cache_manager
+    with _cache_manager_lock:
+        if _cache_manager is None:
+            _cache_manager = CacheManager(TESTDATA_ROOT, TESTDATA_CACHE_BUDGET)
+            try:
+                _cache_manager.scan()
+            except OSError as exc:
+                logger().warning(f"failed to scan testdata cache: {exc}")
+        return _cache_manager
@@ -0,0 +1,147 @@
+"""
+Cache of custom checker verdicts.
+
+Rejudges and identical outputs run the checker on the same case again. For
+problems that opt in (`checkerCache` in meta), the verdict of a
+deterministic checker only depends on the checker script, the testcase
+input, the answer and the student's output, so it is cached under the
+hashes of those and reused without starting a checker container.
+
+The checker also sees the student's and the teacher's case directories
+(/workspace/student, /workspace/teacher), which the student program may
+write to. Their whole trees (relative paths, file contents, symlink
+targets) are hashed into the key as well; a case whose directories cannot
+be read is not cached.
+
+AI checkers are never cached, neither are checkers containing
+NONDETERMINISTIC_MARKER (e.g. in a comment).
+"""
+
+import hashlib
+import os
+import stat
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+
+NONDETERMINISTIC_MARKER = b"noj: nondeterministic"
+
+# only clean verdicts, JE may come from a timeout or a docker failure
+CACHEABLE_STATUSES = {"AC", "WA"}
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _tree_digest(root: Optional[Path]) -> str:
+    """Hash of a directory tree, symlinks are not followed and only regular
+    files are read."""
+    digest = hashlib.sha256()
+    if root is None or not root.exists():
+        return digest.hexdigest()
+    for dirpath, dirnames, filenames in os.walk(root, onerror=_raise):
+        dirnames.sort()
+        for name in sorted(dirnames + filenames):
+            path = Path(dirpath) / name
+            mode = os.lstat(path).st_mode
+            digest.update(str(path.relative_to(root)).encode() + b"\0")
+            if stat.S_ISREG(mode):
+                digest.update(b"f" + _file_digest(path).encode())
+            elif stat.S_ISLNK(mode):
+                digest.update(b"l" + os.fsencode(os.readlink(path)))
+            else:
+                digest.update(f"m{stat.S_IFMT(mode)}".encode())
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _raise(exc: OSError):
+    raise exc
+
+
+class CheckerVerdictCache:
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.skipped = 0
+
+    @staticmethod
+    def checker_digest(checker_path: Path) -> Optional[str]:
+        """Hash of the checker script, None if it declares itself
+        non-deterministic."""
+        source = checker_path.read_bytes()
+        if NONDETERMINISTIC_MARKER in source:
+            return None
+        return hashlib.sha256(source).hexdigest()
+
+    @staticmethod
+    def make_key(
+        problem_id,
+        checker_digest: str,
+        case_in_path: Path,
+        case_ans_path: Path,
+        student_output: Iterable[bytes],
+        case_dirs: Iterable[Optional[Path]] = ()
+    ) -> str:
+        """Raises OSError if a file or one of `case_dirs` can't be read."""
+        output_digest = hashlib.sha256()
+        for chunk in student_output:
+            output_digest.update(chunk)
+        parts = (
+            str(problem_id),
+            checker_digest,
+            _file_digest(case_in_path),
+            _file_digest(case_ans_path),
+            output_digest.hexdigest(),
+            *(_tree_digest(case_dir) for case_dir in case_dirs),
+        )
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[tuple[str, str]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def put(self, key: str, status: str, message: str):
+        if self.max_entries <= 0 or status not in CACHEABLE_STATUSES:
+            return
+        with self._lock:
+            self._entries[key] = (status, message)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def skip(self):
+        """Count a case of an opted-in problem that could not be cached."""
+        with self._lock:
+            self.skipped += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxSize": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "skipped": self.skipped,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+            }
@@ -17,6 +17,10 @@ TESTDATA_ROOT = Path(os.getenv(
     'sandbox-testdata',
 ))
 TESTDATA_ROOT.mkdir(exist_ok=True)
+# Disk budget (MiB) for artifacts cached under TESTDATA_ROOT, 0 (default)
+# disables eviction
+TESTDATA_CACHE_BUDGET = int(os.getenv('TESTDATA_CACHE_BUDGET_MB',
+                                      '0')) * 1024 * 1024
 SUBMISSION_DIR = Path(os.getenv(
     'SUBMISSION_DIR',
     'submissions',
@@ -56,6 +60,73 @@ def get_dispatcher_limits(
     return queue_size, container_limit
 
 
+def get_static_analysis_limits(
+        config_path: str | Path | None = None) -> tuple[int, float]:
+    """
+    Number of static analysis worker processes (0 runs SA in the calling
+    thread) and the per-job timeout in seconds.
+    """
+    path = Path(
+        config_path) if config_path else _DEFAULT_DISPATCHER_CONFIG_PATH
+    cfg = _load_dispatcher_config(path) if path else {}
+    workers_default = cfg.get('SA_WORKERS', 2)
+    timeout_default = cfg.get('SA_TIMEOUT', 60)
+    workers = int(os.getenv('SA_WORKERS', workers_default))
+    timeout = float(os.getenv('SA_TIMEOUT', timeout_default))
+    return workers, timeout
+
+
+# Max number of static analysis verdicts kept in memory, 0 disables the cache
+SA_CACHE_SIZE = int(os.getenv('SA_CACHE_SIZE', '512'))
+
+# Seconds the static analysis rules of a problem are reused before asking
+# the backend again
+SA_RULES_TTL = float(os.getenv('SA_RULES_TTL', '300'))
+
+# Parse the standard headers C++ submissions start with from a
+# precompiled header instead of from source (opt-in, see
+# tools/bench_static_analysis_cpp.py)
+SA_CLANG_PCH = os.getenv('SA_CLANG_PCH', 'false').lower() == 'true'
+
+# Threads parsing the translation units of one multi-file C/C++ project
+SA_FILE_WORKERS = int(os.getenv('SA_FILE_WORKERS', '4'))
+
+# Max number of per-file C/C++ analysis results kept in memory by each
+# static analysis process, 0 disables the cache
+SA_FILE_CACHE_SIZE = int(os.getenv('SA_FILE_CACHE_SIZE', '2048'))
+
+# Start compile/build as soon as the source is extracted, concurrently with
+# static analysis and network setup. The result is dropped if SA fails.
+SPECULATIVE_BUILD = os.getenv('SPECULATIVE_BUILD', 'false').lower() == 'true'
+
+# Interactive cases of a task run in one orchestrator container, this many at
+# a time (1 keeps one container per case)
+INTERACTIVE_BATCH_SIZE = int(os.getenv('INTERACTIVE_BATCH_SIZE', '1'))
+# Pipe mode of interactive runs: auto, devfd, fifo or largepipe (devfd with
+# pipe buffers grown to pipeSizeBytes of .config/interactive.json)
+INTERACTIVE_PIPE_MODE = os.getenv('INTERACTIVE_PIPE_MODE', 'auto')
+
+# Custom checkers run in one long-lived container per submission (and memory
+# limit) fed case by case, instead of a container per case. AI checkers keep
+# their own container.
+CHECKER_WORKER = os.getenv('CHECKER_WORKER', 'false').lower() == 'true'
+
+# Max number of custom checker verdicts kept in memory for problems with
+# checkerCache, 0 disables the cache
+CHECKER_CACHE_SIZE = int(os.getenv('CHECKER_CACHE_SIZE', '4096'))
+
+# AI checker API keys are reused for this many seconds
+CHECKER_API_KEY_TTL = float(os.getenv('CHECKER_API_KEY_TTL', '300'))
+# AI gateway in the shared system router (runner/ai_gateway.py): port inside
+# the router's network namespace, upstream model API ('' for Google AI),
+# concurrent and per-second upstream calls (0 is unlimited) and cached
+# responses
+AI_GATEWAY_PORT = int(os.getenv('AI_GATEWAY_PORT', '8765'))
+AI_GATEWAY_UPSTREAM = os.getenv('AI_GATEWAY_UPSTREAM', '')
+AI_GATEWAY_CONCURRENCY = int(os.getenv('AI_GATEWAY_CONCURRENCY', '4'))
+AI_GATEWAY_RATE = float(os.getenv('AI_GATEWAY_RATE', '0'))
+AI_GATEWAY_CACHE_SIZE = int(os.getenv('AI_GATEWAY_CACHE_SIZE', '1024'))
+
 _SUBMISSION_CONFIG_PATH = Path(
     os.getenv('SUBMISSION_CONFIG', '.config/submission.json'))
 
@@ -70,6 +141,15 @@ def get_submission_config(config_path: str | Path | None = None) -> dict:
     return cfg
 
 
+# ============================================================
+# Cache Coordination Configuration
+# ============================================================
+# Backend for testdata/asset cache locks and checksums:
+# redis (shared by several hosts), memory (single process), file (single host)
+COORDINATION_BACKEND = os.getenv('COORDINATION_BACKEND', 'redis')
+COORDINATION_DIR = Path(
+    os.getenv('COORDINATION_DIR', str(TESTDATA_ROOT / '.coordination')))
+
 # ============================================================
 # Sidecar Resource Limits Configuration
 # ============================================================
@@ -77,8 +157,32 @@ SIDECAR_MEM_LIMIT = os.getenv('SIDECAR_MEM_LIMIT', '512m')
 SIDECAR_CPU_PERIOD = int(os.getenv('SIDECAR_CPU_PERIOD', '100000'))
 SIDECAR_CPU_QUOTA = int(os.getenv('SIDECAR_CPU_QUOTA', '50000'))
 SIDECAR_PIDS_LIMIT = int(os.getenv('SIDECAR_PIDS_LIMIT', '100'))
+# Submissions whose network is provisioned at the same time
+NETWORK_SETUP_WORKERS = int(os.getenv('NETWORK_SETUP_WORKERS', '4'))
+# Network containers are probed until their services are ready (declared
+# sidecar readiness, image HEALTHCHECK or lowest exposed TCP port).
+# Hard cap (in seconds) for a container to become ready
+READINESS_TIMEOUT = float(os.getenv('READINESS_TIMEOUT', '60'))
+# Cap (in seconds) for probes inferred from the image (HEALTHCHECK / EXPOSE);
+# past it, or when the image cannot run the probe, SERVICE_STARTUP_DELAY is
+# waited for instead
+READINESS_INFERRED_TIMEOUT = float(
+    os.getenv('READINESS_INFERRED_TIMEOUT', '20'))
+# Polling interval (in seconds), doubled after every round up to the max
+READINESS_POLL_INITIAL = float(os.getenv('READINESS_POLL_INITIAL', '0.05'))
+READINESS_POLL_MAX = float(os.getenv('READINESS_POLL_MAX', '1.0'))
+# Idle network topologies kept for reuse by submissions with the same network
+# config (0 disables pooling), see dispatcher/topology_pool.py
+TOPOLOGY_POOL_SIZE = int(os.getenv('TOPOLOGY_POOL_SIZE', '0'))
+# Seconds an idle pooled topology is kept before it is torn down
+TOPOLOGY_POOL_IDLE_SECONDS = float(
+    os.getenv('TOPOLOGY_POOL_IDLE_SECONDS', '600'))
+# Seconds a reset hook may run before its topology is torn down instead of
+# pooled
+TOPOLOGY_RESET_TIMEOUT = float(os.getenv('TOPOLOGY_RESET_TIMEOUT', '30'))
 # Delay (in seconds) to wait for container services (e.g., HTTP servers) to be ready
-# after the container is in 'running' state
+# after the container is in 'running' state; only used for containers that
+# have nothing to probe
 SERVICE_STARTUP_DELAY = float(os.getenv('SERVICE_STARTUP_DELAY', '5.0'))
 
 # ============================================================
@@ -96,3 +200,5 @@ ALLOWED_REGISTRIES = [
 # ============================================================
 DOCKER_BUILD_TIMEOUT = int(os.getenv('DOCKER_BUILD_TIMEOUT',
                                      '300'))  # 5 minutes
+# Custom env images built at the same time, across all problems
+IMAGE_BUILD_WORKERS = int(os.getenv('IMAGE_BUILD_WORKERS', '2'))
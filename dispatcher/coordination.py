@@ -0,0 +1,157 @@
+"""
+Coordination backends for the testdata / asset caches.
+
+The ensure_* helpers only need a small subset of Redis: a named lock, and
+checksum values with a TTL. Redis is still the default, since several
+sandbox hosts may share one cache. Single-node deployments, tests and
+benchmarks can use the in-process or file-lock backend, which answer
+without a network round-trip.
+
+Every backend follows the redis-py conventions the callers rely on:
+`lock(key, timeout)` returns a context manager, `get` returns bytes or None,
+`setex(key, ttl, value)` and `delete(*keys)`.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Union
+
+from .config import COORDINATION_BACKEND, COORDINATION_DIR
+from .utils import get_redis_client
+
+
+class CoordinationBackendError(Exception):
+    """Raised when the configured coordination backend is unknown."""
+
+
+def _to_bytes(value: Union[str, bytes, int, float]) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class InProcessBackend:
+    """
+    Locks and values live in this process. Only valid when a single
+    process serves the sandbox (the default gunicorn config).
+
+    Lock `timeout` is accepted for compatibility and ignored: a holder can
+    not disappear without taking the whole process with it.
+    """
+
+    def __init__(self):
+        self._values: dict[str, tuple[bytes, float]] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def lock(self, key: str, timeout: Optional[float] = None):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._guard:
+            item = self._values.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._values[key]
+                return None
+            return value
+
+    def setex(self, key: str, ttl: float, value):
+        with self._guard:
+            self._values[key] = (_to_bytes(value), time.monotonic() + ttl)
+
+    def delete(self, *keys: str) -> int:
+        with self._guard:
+            return sum(self._values.pop(k, None) is not None for k in keys)
+
+
+class FileLockBackend:
+    """
+    Locks are `flock`s on files under `root`, values are small JSON files.
+    Works across processes on the same host and survives restarts; the
+    kernel releases a lock when its holder dies, so `timeout` is ignored.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str, suffix: str) -> Path:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
+        return self.root / f"{safe}{suffix}"
+
+    @contextmanager
+    def lock(self, key: str, timeout: Optional[float] = None):
+        with self._path(key, ".lock").open("a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield self
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key, ".json")
+        try:
+            item = json.loads(path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if item["expires"] <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return item["value"].encode()
+
+    def setex(self, key: str, ttl: float, value):
+        path = self._path(key, ".json")
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps({
+                "value": _to_bytes(value).decode(),
+                "expires": time.time() + ttl,
+            }))
+        os.replace(tmp, path)
+
+    def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            path = self._path(key, ".json")
+            if path.exists():
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_coordination_backend(name: str, root: Optional[Path] = None):
+    if name == "redis":
+        return get_redis_client()
+    if name == "memory":
+        return InProcessBackend()
+    if name == "file":
+        return FileLockBackend(root or COORDINATION_DIR)
+    raise CoordinationBackendError(f"unknown coordination backend: {name}")
+
+
+def get_coordination_backend():
+    """
+    Return the backend selected by `COORDINATION_BACKEND`. Redis clients
+    share a connection pool, so a fresh client is returned each call like
+    `get_redis_client`; the local backends are process-wide singletons.
+    """
+    if COORDINATION_BACKEND == "redis":
+        return get_redis_client()
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_coordination_backend(COORDINATION_BACKEND)
+        return _backend
@@ -1,13 +1,24 @@
 import shutil
 import textwrap
+import threading
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from .config import TESTDATA_ROOT
+from .checker_cache import CheckerVerdictCache
 from .asset_cache import ensure_custom_asset, AssetNotFoundError
 from .result_factory import make_checker_result
 from runner.path_utils import PathTranslator
-from runner.custom_checker_runner import CustomCheckerRunner, CustomCheckerError
+from runner.custom_checker_runner import (
+    WORKER_SOURCE,
+    WORKER_SUBMISSION_DIR,
+    WORKER_WORK_DIR,
+    CheckerWorker,
+    CheckerWorkerError,
+    CustomCheckerRunner,
+    CustomCheckerError,
+    checker_timeout_sec,
+)
 from .constant import ExecutionMode
 
 
@@ -35,13 +46,91 @@ def ensure_custom_checker(problem_id: int, submission_path: Path,
     return target
 
 
+class CheckerWorkerPool:
+    """
+    Checker worker containers of the submissions being judged.
+
+    Cases of a submission judged concurrently each borrow an idle worker
+    with their memory limit, or start one; workers stay up until the
+    submission is released.
+    """
+
+    def __init__(self, image: str, docker_url: str):
+        self.image = image
+        self.docker_url = docker_url
+        self._idle: Dict[Tuple[str, int], List[CheckerWorker]] = {}
+        self._workers: Dict[str, List[CheckerWorker]] = {}
+        self._lock = threading.Lock()
+
+    def run(self, submission_id: str, submission_path: Path, mem_limit_kb: int,
+            request: dict, timeout_sec: int) -> Dict[str, str]:
+        key = (submission_id, mem_limit_kb)
+        worker = self._acquire(key, submission_path)
+        try:
+            result = worker.run(request, timeout_sec)
+        except CheckerWorkerError:
+            self._discard(submission_id, worker)
+            raise
+        except Exception:
+            self._give_back(key, worker)
+            raise
+        self._give_back(key, worker)
+        return result
+
+    def release(self, submission_id: str):
+        with self._lock:
+            workers = self._workers.pop(submission_id, [])
+            for key in [k for k in self._idle if k[0] == submission_id]:
+                del self._idle[key]
+        for worker in workers:
+            worker.stop()
+
+    def _acquire(self, key: Tuple[str, int],
+                 submission_path: Path) -> CheckerWorker:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+        translator = PathTranslator()
+        work_dir = submission_path / "checker" / "work"
+        work_dir.mkdir(parents=True, exist_ok=True)
+        worker = CheckerWorker(
+            submission_id=key[0],
+            image=self.image,
+            docker_url=self.docker_url,
+            worker_source=str(translator.host_root / WORKER_SOURCE),
+            submission_dir=str(translator.to_host(submission_path)),
+            work_dir=str(translator.to_host(work_dir)),
+            mem_limit_kb=key[1],
+        )
+        worker.start()
+        with self._lock:
+            self._workers.setdefault(key[0], []).append(worker)
+        return worker
+
+    def _give_back(self, key: Tuple[str, int], worker: CheckerWorker):
+        with self._lock:
+            if worker in self._workers.get(key[0], []):
+                self._idle.setdefault(key, []).append(worker)
+                return
+        # released while the case was running
+        worker.stop()
+
+    def _discard(self, submission_id: str, worker: CheckerWorker):
+        with self._lock:
+            workers = self._workers.get(submission_id, [])
+            if worker in workers:
+                workers.remove(worker)
+        worker.stop()
+
+
 def run_custom_checker_case(
     submission_id: str,
     case_no: str,
     checker_path: Path,
     case_in_path: Path,
     case_ans_path: Path,
-    student_output: str,
+    student_output: str | None,
     time_limit_ms: int,
     mem_limit_kb: int,
     image: str,
@@ -50,25 +139,64 @@ def run_custom_checker_case(
     teacher_dir: Path | None = None,
     ai_checker_config: dict | None = None,
     problem_id: int | None = None,
+    worker_pool: CheckerWorkerPool | None = None,
+    student_output_path: Path | None = None,
+    verdict_cache: CheckerVerdictCache | None = None,
 ) -> Dict[str, str]:
     """Execute custom checker for a single case and return status/message.
 
+    The testcase, the answer, the checker and `student_output_path` (the
+    sandbox's stdout file) are mounted read-only, only `student_output`
+    (used when there is no such file) is written to the case workdir.
+    `bytesWritten` of the result counts the student output handed to the
+    checker, the size of the stdout file or the bytes written in its place.
+
     Args:
         ai_checker_config: Optional dict with {enabled, model} from Meta
         problem_id: Required if ai_checker_config is enabled
+        worker_pool: Check in the submission's long-lived checker worker
+            instead of a container of its own (not for AI checkers)
+        verdict_cache: Reuse the verdict of an identical earlier case, for
+            problems that opted in
     """
-    from .testdata import fetch_checker_api_key
+    from .testdata import get_checker_api_key
+
+    streamed = student_output_path is not None and student_output_path.exists()
+    bytes_written = student_output_path.stat().st_size if streamed else 0
+    cache_key = None
+    if verdict_cache is not None:
+        cache_key = _verdict_cache_key(verdict_cache, problem_id, checker_path,
+                                       case_in_path, case_ans_path,
+                                       student_output, student_output_path,
+                                       ai_checker_config,
+                                       (student_workdir, teacher_dir))
+        cached = verdict_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            return {
+                "status": cached[0],
+                "message": cached[1],
+                "stdout": "",
+                "stderr": "",
+                "bytesWritten": bytes_written,
+                "cached": True,
+            }
 
     workdir = checker_path.parent / "work" / case_no
     workdir.mkdir(parents=True, exist_ok=True)
 
     try:
         # Prepare files
-        _copy_file(case_in_path, workdir / "input.in")
-        _copy_file(case_ans_path, workdir / "answer.out")
-        (workdir / "student.out").write_text(student_output)
-        local_checker = workdir / "custom_checker.py"
-        shutil.copyfile(checker_path, local_checker)
+        inputs = {
+            "custom_checker.py": checker_path,
+            "input.in": _require_file(case_in_path),
+            "answer.out": _require_file(case_ans_path),
+        }
+        if streamed:
+            inputs["student.out"] = student_output_path
+        else:
+            data = (student_output or "").encode()
+            (workdir / "student.out").write_bytes(data)
+            bytes_written += len(data)
 
         translator = PathTranslator()
         host_workdir = translator.to_host(workdir)
@@ -82,33 +210,48 @@ def run_custom_checker_case(
         enable_ai_network = False
         if ai_checker_config and ai_checker_config.get(
                 "enabled") and problem_id:
-            api_key = fetch_checker_api_key(problem_id)
+            api_key = get_checker_api_key(problem_id)
             if api_key:
                 env["AI_API_KEY"] = api_key
                 env["AI_MODEL"] = ai_checker_config.get(
                     "model", "gemini-2.5-flash")
                 enable_ai_network = True
 
-        runner = CustomCheckerRunner(
-            submission_id=submission_id,
-            case_no=case_no,
-            image=image,
-            docker_url=docker_url,
-            workdir=str(host_workdir),
-            checker_relpath="custom_checker.py",
-            time_limit_ms=time_limit_ms,
-            mem_limit_kb=mem_limit_kb,
-            student_dir=str(student_dir_host)
-            if student_dir_host is not None else None,
-            teacher_dir=str(teacher_dir_host)
-            if teacher_dir_host is not None else None,
-            env=env if env else None,
-            enable_ai_network=enable_ai_network,
-        )
-        result = runner.run()
+        result = None
+        if worker_pool is not None and not enable_ai_network:
+            result = _run_in_worker(worker_pool, submission_id, case_no,
+                                    checker_path.parent.parent, inputs,
+                                    student_workdir, teacher_dir,
+                                    time_limit_ms, mem_limit_kb)
+        if result is None:
+            runner = CustomCheckerRunner(
+                submission_id=submission_id,
+                case_no=case_no,
+                image=image,
+                docker_url=docker_url,
+                workdir=str(host_workdir),
+                checker_relpath="custom_checker.py",
+                time_limit_ms=time_limit_ms,
+                mem_limit_kb=mem_limit_kb,
+                student_dir=str(student_dir_host)
+                if student_dir_host is not None else None,
+                teacher_dir=str(teacher_dir_host)
+                if teacher_dir_host is not None else None,
+                env=env if env else None,
+                enable_ai_network=enable_ai_network,
+                files={
+                    name: str(translator.to_host(path))
+                    for name, path in inputs.items()
+                },
+            )
+            result = runner.run()
     except CustomCheckerError as exc:
         _cleanup(workdir)
-        return make_checker_result(status="JE", message=str(exc))
+        return {
+            **make_checker_result(status="JE", message=str(exc)),
+            "bytesWritten":
+            bytes_written,
+        }
     finally:
         _cleanup(workdir)
 
@@ -124,14 +267,92 @@ def run_custom_checker_case(
             message = stderr
     if not message and stderr:
         message = stderr
+    if cache_key is not None and exit_code == 0:
+        verdict_cache.put(cache_key, status, message or "")
     return {
         "status": status,
         "message": message or "",
         "stdout": result.get("stdout", ""),
         "stderr": stderr,
+        "bytesWritten": bytes_written,
     }
 
 
+def _verdict_cache_key(
+    verdict_cache: CheckerVerdictCache,
+    problem_id,
+    checker_path: Path,
+    case_in_path: Path,
+    case_ans_path: Path,
+    student_output: str | None,
+    student_output_path: Path | None,
+    ai_checker_config: dict | None,
+    case_dirs: tuple = ()) -> Optional[str]:
+    """Cache key of the case, None if its verdict must not be cached.
+    `case_dirs` are the directories mounted into the checker."""
+    checker_digest = None
+    if not (ai_checker_config and ai_checker_config.get("enabled")):
+        try:
+            checker_digest = verdict_cache.checker_digest(checker_path)
+        except OSError:
+            pass
+    if checker_digest is None or not (case_in_path.exists()
+                                      and case_ans_path.exists()):
+        verdict_cache.skip()
+        return None
+    if student_output_path is not None and student_output_path.exists():
+        output = _read_chunks(student_output_path)
+    else:
+        output = [(student_output or "").encode()]
+    try:
+        return verdict_cache.make_key(problem_id, checker_digest, case_in_path,
+                                      case_ans_path, output, case_dirs)
+    except OSError:
+        verdict_cache.skip()
+        return None
+
+
+def _read_chunks(path: Path, size: int = 1 << 20):
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(size), b"")
+
+
+def _run_in_worker(worker_pool: CheckerWorkerPool, submission_id: str,
+                   case_no: str, submission_path: Path,
+                   inputs: Dict[str, Path], student_workdir: Path | None,
+                   teacher_dir: Path | None, time_limit_ms: int,
+                   mem_limit_kb: int) -> Optional[Dict[str, str]]:
+    """Result of the checker worker, or None to run the case one-shot."""
+
+    def in_worker(path: Path | None) -> Optional[str]:
+        if path is None:
+            return None
+        rel = Path(path).relative_to(submission_path)
+        return f"{WORKER_SUBMISSION_DIR}/{rel.as_posix()}"
+
+    try:
+        request = {
+            "caseNo": case_no,
+            "dir": f"{WORKER_WORK_DIR}/{case_no}",
+            "student": in_worker(student_workdir),
+            "teacher": in_worker(teacher_dir),
+            "files": {
+                name: in_worker(path)
+                for name, path in inputs.items()
+            },
+        }
+    except ValueError:
+        # only the submission dir is mounted into the worker
+        return None
+    try:
+        return worker_pool.run(submission_id, submission_path, mem_limit_kb,
+                               request,
+                               checker_timeout_sec(time_limit_ms, False))
+    except CheckerWorkerError:
+        # the worker is gone, the one-shot container gives the same verdict
+        return None
+
+
 def _parse_checker_output(raw_stdout: str) -> Tuple[Optional[str], str]:
     status = None
     message = ""
@@ -145,10 +366,10 @@ def _parse_checker_output(raw_stdout: str) -> Tuple[Optional[str], str]:
     return status, message
 
 
-def _copy_file(src: Path, dst: Path):
+def _require_file(src: Path) -> Path:
     if not src.exists():
         raise CustomCheckerError(f"missing checker dependency: {src.name}")
-    shutil.copyfile(src, dst)
+    return src
 
 
 def _cleanup(path: Path):
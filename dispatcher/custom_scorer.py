@@ -37,6 +37,7 @@ def run_custom_scorer(
     mem_limit_kb: int,
     image: str,
     docker_url: str,
+    submission_id: Optional[str] = None,
 ) -> Dict[str, object]:
     """Execute custom scorer and return parsed result."""
     workdir = scorer_path.parent / "work"
@@ -55,6 +56,7 @@ def run_custom_scorer(
             scorer_relpath="score.py",
             time_limit_ms=time_limit_ms,
             mem_limit_kb=mem_limit_kb,
+            submission_id=submission_id,
         )
         result = runner.run(payload)
     except (CustomScorerError, CustomScorerSetupError) as exc:
@@ -7,12 +7,13 @@ import pathlib
 import queue
 import textwrap
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from runner.submission import SubmissionRunner
 from runner.interactive_runner import InteractiveRunner
 from . import job, file_manager, config
 from .exception import *
-from .meta import Meta
+from .meta import Meta, ScoringPolicy
 from .constant import AcceptedFormat, BuildStrategy, ExecutionMode, Language
 from .build_strategy import (
     BuildPlan,
@@ -23,13 +24,23 @@ from .build_strategy import (
     prepare_make_normal,
 )
 from .utils import logger
-from .pipeline import fetch_problem_rules
+from .pipeline import fetch_problem_rules, get_problem_rules
 from .artifact_collector import ArtifactCollector
 
-from .static_analysis import run_static_analysis, build_sa_ae_task_content
+from .static_analysis import (
+    SA_SYSTEM_ERROR,
+    build_sa_ae_task_content,
+    format_sa_failure_message,
+    run_static_analysis,
+)
 from .result_factory import make_runner_result, make_all_cases_result
-from .custom_checker import ensure_custom_checker, run_custom_checker_case
+from .custom_checker import (
+    CheckerWorkerPool,
+    ensure_custom_checker,
+    run_custom_checker_case,
+)
 from .custom_scorer import ensure_custom_scorer, run_custom_scorer
+from .scoring_policy import evaluate_scoring_policy
 from .resource_data import (
     prepare_resource_data,
     prepare_teacher_resource_data,
@@ -38,6 +49,10 @@ from .resource_data import (
     cleanup_resource_files,
 )
 from .network_control import NetworkController
+from .cache_manager import get_cache_manager
+from .sa_pool import StaticAnalysisPool
+from .sa_cache import StaticAnalysisCache
+from .checker_cache import CheckerVerdictCache
 
 
 class Dispatcher(threading.Thread):
@@ -78,7 +93,15 @@ class Dispatcher(threading.Thread):
                                                 self.custom_checker_image)
         self.custom_checker_info = {}
         self.custom_scorer_info = {}
+        self.checker_workers = (CheckerWorkerPool(self.custom_checker_image,
+                                                  self.docker_url)
+                                if config.CHECKER_WORKER else None)
+        self.checker_cache = CheckerVerdictCache(config.CHECKER_CACHE_SIZE)
         self.checker_payloads = {}
+        # student output handed to custom checkers, see checker_stats
+        self.checker_stats_lock = threading.Lock()
+        self.checked_cases = 0
+        self.checker_bytes_written = 0
         self.timeout = 300
         self.created_at = {}
 
@@ -88,6 +111,12 @@ class Dispatcher(threading.Thread):
             docker_url=docker_url,
             submission_dir=self.SUBMISSION_DIR,
         )
+        # provisioning waits on dockerd (pulls, readiness), keep it off the
+        # dispatcher loop
+        self.network_pool = ThreadPoolExecutor(
+            max_workers=config.NETWORK_SETUP_WORKERS,
+            thread_name_prefix="network-setup",
+        )
         # [Network] end
 
         # Build Strategy related
@@ -95,8 +124,23 @@ class Dispatcher(threading.Thread):
         self.build_strategies = {}
         self.build_plans = {}
         self.build_locks = {}
+        # [Speculative Build] compile/build without waiting for SA
+        self.speculative_build = config.SPECULATIVE_BUILD
+        self.deferred_build_failures = {}
+        self.speculation_lock = threading.Lock()
+        # [Interactive] cases per orchestrator container
+        self.interactive_batch_size = config.INTERACTIVE_BATCH_SIZE
+        self.interactive_pipe_mode = config.INTERACTIVE_PIPE_MODE
 
         # [Static Analysis] init
+        sa_workers, sa_timeout = config.get_static_analysis_limits(
+            dispatcher_config)
+        self.sa_timeout = sa_timeout
+        # SA runs in worker processes so the dispatcher loop never waits
+        # for libclang; 0 workers runs it in the job thread instead
+        self.sa_pool = (StaticAnalysisPool(sa_workers, sa_timeout)
+                        if sa_workers > 0 else None)
+        self.sa_cache = StaticAnalysisCache(config.SA_CACHE_SIZE)
         self.sa_payloads = {}
         self.submission_resources = {}
         self.pending_tasks = {}
@@ -111,6 +155,8 @@ class Dispatcher(threading.Thread):
 
         # Trial Submission support
         self.trial_submissions = set()
+        # pins testdata caches of in-flight submissions
+        self.testdata_cache = get_cache_manager()
 
     def compile_need(self, lang: Language):
         return lang in {Language.C, Language.CPP}
@@ -143,6 +189,12 @@ class Dispatcher(threading.Thread):
     def _case_dir(self, submission_id: str, case_no: str) -> pathlib.Path:
         return self.SUBMISSION_DIR / submission_id / "src" / "cases" / case_no
 
+    def _checker_stdout_path(self, submission_id: str,
+                             case_no: str) -> pathlib.Path:
+        stdout_dir = self.SUBMISSION_DIR / submission_id / "checker" / "stdout"
+        stdout_dir.mkdir(parents=True, exist_ok=True)
+        return stdout_dir / f"{case_no}.out"
+
     def inc_container(self):
         with self.container_count_lock:
             self.container_count += 1
@@ -151,6 +203,13 @@ class Dispatcher(threading.Thread):
         with self.container_count_lock:
             self.container_count -= 1
 
+    def checker_stats(self) -> dict:
+        with self.checker_stats_lock:
+            return {
+                "cases": self.checked_cases,
+                "bytesWritten": self.checker_bytes_written,
+            }
+
     def is_timed_out(self, submission_id: str):
         if not self.contains(submission_id):
             return False
@@ -306,6 +365,14 @@ class Dispatcher(threading.Thread):
         meta: Meta,
         submission_path: pathlib.Path,
     ):
+        policy = getattr(meta, "scoringPolicy", None)
+        if policy is not None:
+            # evaluated in-process, no scorer asset or container needed
+            self.custom_scorer_info[submission_id] = {
+                "enabled": True,
+                "policy": policy,
+            }
+            return
         if not getattr(meta, "scoringScript", False):
             self.custom_scorer_info[submission_id] = {"enabled": False}
             return
@@ -461,6 +528,11 @@ class Dispatcher(threading.Thread):
                 "message": info["error"],
             }, "JE"
 
+        policy = info.get("policy")
+        if policy is not None:
+            return self._run_scoring_policy(submission_id, policy, meta,
+                                            submission_result)
+
         late_seconds = self._fetch_late_seconds(submission_id)
         tasks_payload, default_total = self._build_scoring_tasks(
             meta, submission_result)
@@ -493,6 +565,7 @@ class Dispatcher(threading.Thread):
             mem_limit_kb=256000,
             image=image,
             docker_url=self.docker_url,
+            submission_id=submission_id,
         )
         status = runner_result.get("status")
         scoring_payload = {
@@ -512,8 +585,38 @@ class Dispatcher(threading.Thread):
         status_override = "JE" if status == "JE" else None
         return scoring_payload, status_override
 
+    def _run_scoring_policy(
+        self,
+        submission_id: str,
+        policy: ScoringPolicy,
+        meta: Meta,
+        submission_result: list,
+    ):
+        # only ask the backend when the policy needs it
+        late_seconds = (self._fetch_late_seconds(submission_id)
+                        if policy.latePenalty is not None else -1)
+        tasks_payload, _ = self._build_scoring_tasks(meta, submission_result)
+        result = evaluate_scoring_policy(
+            policy,
+            tasks_payload,
+            self._build_scoring_stats(submission_result),
+            late_seconds,
+        )
+        return {
+            "status": result["status"],
+            "score": result["score"],
+            "message": result["message"],
+            "breakdown": result["breakdown"],
+        }, None
+
     def _handle_build_failure(self, submission_id: str, message: str):
         err_msg = message or "build failed"
+        with self.speculation_lock:
+            if self._is_sa_pending(submission_id):
+                # speculative build failed before SA passed: an SA verdict
+                # takes precedence, report CE once NetworkSetup opens the gate
+                self.deferred_build_failures[submission_id] = err_msg
+                return
         # Clean up build-specific resources
         self.build_plans.pop(submission_id, None)
         self.build_locks.pop(submission_id, None)
@@ -581,6 +684,7 @@ class Dispatcher(threading.Thread):
         # [Result Init]
 
         self.problem_ids[submission_id] = problem_id
+        self.testdata_cache.pin(problem_id)
 
         # Note: Static Analysis is now handled asynchronously in run() via job.StaticAnalysis
 
@@ -660,16 +764,19 @@ class Dispatcher(threading.Thread):
 
         # [Static Analysis] init array for pending work
         tasks_to_run = []
+        # [Speculative Build] jobs queued right away, next to SA
+        speculative_jobs = []
+        build_jobs = (speculative_jobs
+                      if self.speculative_build else tasks_to_run)
 
         needs_build = build_plan.needs_make
         if needs_build:
-            # Wait for SA before building
             logger().debug(
-                f"[build] submission={submission_id} planned to build, waiting for SA"
-            )
+                f"[build] submission={submission_id} planned to build"
+                f" (speculative={self.speculative_build})")
             self.build_plans[submission_id] = build_plan
             self.build_locks[submission_id] = threading.Lock()
-            tasks_to_run.append(job.Build(submission_id=submission_id))
+            build_jobs.append(job.Build(submission_id=submission_id))
 
         else:
             if build_plan.finalize:
@@ -683,36 +790,55 @@ class Dispatcher(threading.Thread):
         # [Job Dispatching]
         if (not needs_build and not self._is_prebuilt_submission(submission_id)
                 and self.compile_need(submission_config.language)):
-            tasks_to_run.append(job.Compile(submission_id=submission_id))
+            build_jobs.append(job.Compile(submission_id=submission_id))
 
+        batch_size = (self.interactive_batch_size
+                      if ExecutionMode(submission_config.executionMode)
+                      == ExecutionMode.INTERACTIVE else 1)
         for i, task in enumerate(submission_config.tasks):
             for j in range(task.caseCount):
                 case_no = f"{i:02d}{j:02d}"
                 task_content[case_no] = None
-                tasks_to_run.append(
-                    job.Execute(
-                        submission_id=submission_id,
-                        task_id=i,
-                        case_id=j,
-                    ))
+                if batch_size <= 1:
+                    tasks_to_run.append(
+                        job.Execute(
+                            submission_id=submission_id,
+                            task_id=i,
+                            case_id=j,
+                        ))
+            if batch_size > 1:
+                for first in range(0, task.caseCount, batch_size):
+                    tasks_to_run.append(
+                        job.ExecuteBatch(
+                            submission_id=submission_id,
+                            task_id=i,
+                            case_ids=list(
+                                range(first,
+                                      min(first + batch_size,
+                                          task.caseCount))),
+                        ))
         self.pending_tasks[submission_id] = tasks_to_run
         try:
             self.queue.put_nowait(
                 job.StaticAnalysis(submission_id=submission_id,
                                    problem_id=problem_id))
+            for speculative_job in speculative_jobs:
+                self.queue.put_nowait(speculative_job)
         except queue.Full as e:
             self.release(submission_id)
             raise e
         # [Static Analysis] end
 
     def release(self, submission_id: str):
+        problem_id = self.problem_ids.pop(submission_id, None)
+        if problem_id is not None:
+            self.testdata_cache.unpin(problem_id)
         for v in (
                 self.result,
                 self.compile_locks,
                 self.compile_results,
                 self.locks,
                 self.created_at,
-                self.problem_ids,
         ):
             if submission_id in v:
                 del v[submission_id]
@@ -725,11 +851,14 @@ class Dispatcher(threading.Thread):
         self.build_strategies.pop(submission_id, None)
         self.build_plans.pop(submission_id, None)
         self.build_locks.pop(submission_id, None)
+        self.deferred_build_failures.pop(submission_id, None)
 
         # [Network] Cleanup
         self.network_controller.cleanup(submission_id)
         # [Network] end
         self.custom_checker_info.pop(submission_id, None)
+        if self.checker_workers is not None:
+            self.checker_workers.release(submission_id)
         self.custom_scorer_info.pop(submission_id, None)
         self.checker_payloads.pop(submission_id, None)
         self.artifact_collector.cleanup(submission_id)
@@ -778,83 +907,17 @@ class Dispatcher(threading.Thread):
 
             # [Static Analysis] Handle Static Analysis Job
             if isinstance(_job, job.StaticAnalysis):
-                logger().info(f"Running Static Analysis for {submission_id}")
-                submission_path = self.SUBMISSION_DIR / submission_id
-
-                try:
-                    rules_json = fetch_problem_rules(_job.problem_id)
-                    logger().debug(
-                        f"fetched static analysis rules: {rules_json}")
-                    is_zip_mode = submission_config.acceptedFormat == AcceptedFormat.ZIP
-
-                    # do SA
-                    success, payload, task_content = run_static_analysis(
-                        submission_id=submission_id,
-                        submission_path=submission_path,
-                        meta=submission_config,
-                        rules_json=rules_json,
-                        is_zip_mode=is_zip_mode,
-                    )
-                    if payload:
-                        self.sa_payloads[submission_id] = payload
-                    if success:
-                        logger().info(
-                            f"Static Analysis succeeded for {submission_id}.  Releasing pending jobs."
-                        )
-                        # pending_jobs = self.pending_tasks.pop(submission_id, [])
-                        # for pj in pending_jobs:
-                        #     self.queue.put(pj)
-                        self.queue.put(
-                            job.NetworkSetup(submission_id=submission_id,
-                                             problem_id=_job.problem_id))
-                    else:
-                        logger().info(
-                            f"Static Analysis failed for {submission_id}. Marking CE for all cases."
-                        )
-                        self._handle_sa_failure(
-                            submission_id=submission_id,
-                            payload=payload,
-                            task_content=task_content,
-                        )
-                except Exception as e:
-                    logger().error(f"Error in SA job for {submission_id}: {e}",
-                                   exc_info=True)
-                    msg = f"Static Analysis Exception: {e}"
-                    fail_content = build_sa_ae_task_content(
-                        submission_config,
-                        msg,
-                    )
-                    self._handle_sa_failure(
-                        submission_id,
-                        {
-                            "status": "sys_err",
-                            "message": msg
-                        },
-                        fail_content,
-                    )
+                threading.Thread(
+                    target=self.static_analysis,
+                    args=(submission_id, _job.problem_id),
+                ).start()
                 continue
             # [Static Analysis] end
 
-            # [Network] Determine Network Mode
+            # [Network] Provision off the loop, see network_setup
             if isinstance(_job, job.NetworkSetup):
-                logger().info(f"Setting up network for {submission_id}")
-                submission_config, _ = self.result[submission_id]
-                logger().debug(
-                    f"(*_*)[In NetworkSetup] submission meta: {submission_config}"
-                )
-
-                try:
-                    self.network_controller.provision_network(
-                        submission_id=submission_id,
-                        problem_id=_job.problem_id,
-                    )
-                    pending_jobs = self.pending_tasks.pop(submission_id, [])
-                    for pj in pending_jobs:
-                        self.queue.put(pj)
-
-                except Exception as e:
-                    logger().error(f"Network provision failed: {e}")
-                    self._handle_network_failure(submission_id, str(e))
+                self.network_pool.submit(self.network_setup, submission_id,
+                                         _job.problem_id)
                 continue
             # [Network] end
 
@@ -892,6 +955,23 @@ class Dispatcher(threading.Thread):
                 net_mode = self.network_controller.get_network_mode(
                     submission_id)
                 task_info = submission_config.tasks[_job.task_id]
+                if isinstance(_job, job.ExecuteBatch):
+                    logger().info(f"create container [task={submission_id}/"
+                                  f"{_job.task_id:02d} cases={_job.case_ids}]")
+                    threading.Thread(
+                        target=self.run_interactive_batch,
+                        args=(
+                            submission_id,
+                            _job.task_id,
+                            _job.case_ids,
+                            task_info.memoryLimit,
+                            task_info.timeLimit,
+                            submission_config.language,
+                            submission_config.teacherFirst,
+                            net_mode,
+                        ),
+                    ).start()
+                    continue
                 case_no = f"{_job.task_id:02d}{_job.case_id:02d}"
                 logger().info(
                     f"create container [task={submission_id}/{case_no}]")
@@ -925,14 +1005,146 @@ class Dispatcher(threading.Thread):
 
     def stop(self):
         self.do_run = False
+        if self.sa_pool is not None:
+            self.sa_pool.shutdown()
+        self.network_pool.shutdown(wait=False)
+        self.network_controller.drain_topology_pool()
+        self.network_controller.image_builds.shutdown()
+
+    def network_setup(self, submission_id: str, problem_id: int):
+        """
+        Provision the submission's network, then release its pending jobs
+        (or report a deferred speculative build failure).
+        """
+        if not self.contains(submission_id):
+            return
+        logger().info(f"Setting up network for {submission_id}")
+        try:
+            self.network_controller.provision_network(
+                submission_id=submission_id,
+                problem_id=problem_id,
+            )
+        except Exception as e:
+            logger().error(f"Network provision failed: {e}")
+            self._handle_network_failure(submission_id, str(e))
+            return
+        if not self.contains(submission_id):
+            # released (e.g. timed out) while provisioning
+            self.network_controller.cleanup(submission_id)
+            return
+        with self.speculation_lock:
+            pending_jobs = self.pending_tasks.pop(submission_id, [])
+            build_error = self.deferred_build_failures.pop(submission_id, None)
+        if build_error is not None:
+            self._handle_build_failure(submission_id, build_error)
+            return
+        for pj in pending_jobs:
+            self.queue.put(pj)
 
     # [Standard Methods]
+    def static_analysis(self, submission_id: str, problem_id: int):
+        """
+        Run SA for a submission off the dispatcher loop and post the result
+        back: NetworkSetup is queued on success, the submission is finished
+        with the SA verdict otherwise.
+        """
+        if not self.contains(submission_id):
+            return
+        submission_config, _ = self.result[submission_id]
+        logger().info(f"Running Static Analysis for {submission_id}")
+        submission_path = self.SUBMISSION_DIR / submission_id
+
+        try:
+            rules_json = get_problem_rules(problem_id)
+            logger().debug(f"fetched static analysis rules: {rules_json}")
+            is_zip_mode = submission_config.acceptedFormat == AcceptedFormat.ZIP
+            sa_kwargs = dict(
+                submission_id=submission_id,
+                submission_path=submission_path,
+                meta=submission_config,
+                rules_json=rules_json,
+                is_zip_mode=is_zip_mode,
+            )
+            cache_key = None
+            cached = None
+            if rules_json:
+                cache_key = self.sa_cache.make_key(submission_path,
+                                                   submission_config,
+                                                   rules_json, is_zip_mode)
+                cached = self.sa_cache.get(cache_key)
+            if cached is not None:
+                logger().info(
+                    f"Static Analysis cache hit [id={submission_id}]")
+                success, payload = cached
+                task_content = None if success else build_sa_ae_task_content(
+                    submission_config,
+                    format_sa_failure_message(payload.get("message")),
+                )
+            else:
+                # do SA
+                if self.sa_pool is not None and rules_json:
+                    success, payload, task_content = self.sa_pool.run(
+                        **sa_kwargs)
+                else:
+                    success, payload, task_content = run_static_analysis(
+                        **sa_kwargs)
+                # a crashed analysis says nothing about the submission
+                crashed = (payload or {}).get("status") == SA_SYSTEM_ERROR
+                if cache_key is not None and not crashed:
+                    self.sa_cache.put(cache_key, success, payload,
+                                      submission_path)
+        except Exception as e:
+            logger().error(f"Error in SA job for {submission_id}: {e}",
+                           exc_info=True)
+            msg = f"Static Analysis Exception: {e}"
+            fail_content = build_sa_ae_task_content(
+                submission_config,
+                msg,
+            )
+            self._handle_sa_failure(
+                submission_id,
+                {
+                    "status": SA_SYSTEM_ERROR,
+                    "message": msg
+                },
+                fail_content,
+            )
+            return
+
+        if not self.contains(submission_id):
+            logger().info(
+                f"discard SA result of finished submission [id={submission_id}]"
+            )
+            return
+        if payload:
+            self.sa_payloads[submission_id] = payload
+        if success:
+            logger().info(
+                f"Static Analysis succeeded for {submission_id}.  Releasing pending jobs."
+            )
+            self.queue.put(
+                job.NetworkSetup(submission_id=submission_id,
+                                 problem_id=problem_id))
+        else:
+            logger().info(
+                f"Static Analysis failed for {submission_id}. Marking CE for all cases."
+            )
+            self._handle_sa_failure(
+                submission_id=submission_id,
+                payload=payload,
+                task_content=task_content,
+            )
+
     def compile(
         self,
         submission_id: str,
         lang: Language,
     ):
-        if self.compile_locks[submission_id].locked():
+        lock = self.compile_locks.get(submission_id)
+        if lock is None:
+            # released (e.g. rejected by SA) before the compile started
+            return
+        if lock.locked():
             logger().error(
                 f"start a compile thread on locked submission {submission_id}")
             return
@@ -941,7 +1153,7 @@ class Dispatcher(threading.Thread):
                 f"try to compile submission {submission_id}"
                 f" with language {lang}", )
             return
-        with self.compile_locks[submission_id]:
+        with lock:
             logger().info(f"start compiling {submission_id}")
             res = SubmissionRunner(
                 submission_id=submission_id,
@@ -952,6 +1164,11 @@ class Dispatcher(threading.Thread):
                 lang=["c11", "cpp17"][int(lang)],
                 common_dir=str(self._common_dir(submission_id)),
             ).compile()
+            if not self.contains(submission_id):
+                logger().info(
+                    f"discard compile result of finished submission [id={submission_id}]"
+                )
+                return
             self.compile_results[submission_id] = res
             logger().debug(f'finish compiling, get status {res["Status"]}')
             meta_obj, _ = self.result.get(submission_id, (None, None))
@@ -1001,6 +1218,11 @@ class Dispatcher(threading.Thread):
                 common_dir=str(self._common_dir(submission_id)),
             )
             res = runner.build_with_make()
+            if not self.contains(submission_id):
+                logger().info(
+                    f"discard build result of finished submission [id={submission_id}]"
+                )
+                return
             if res.get("Status") != "AC":
                 self._handle_build_failure(
                     submission_id=submission_id,
@@ -1063,146 +1285,18 @@ class Dispatcher(threading.Thread):
         collect_artifacts = meta_obj and ArtifactCollector.should_collect_artifacts(
             meta_obj)
         common_dir = self._common_dir(submission_id)
-        case_dir = self._case_dir(submission_id, case_no)
-        # prepare per-case workdir: clean and copy common + resources
-        SANDBOX_UID = 1450
-        SANDBOX_GID = 1450
-        try:
-            if case_dir.exists():
-                shutil.rmtree(case_dir)
-            case_dir.mkdir(parents=True, exist_ok=True)
-            if common_dir.exists():
-                shutil.copytree(common_dir,
-                                case_dir,
-                                dirs_exist_ok=True,
-                                ignore=shutil.ignore_patterns("cases"))
-            # Set permissions for sandbox user to write if allowWrite is enabled
-            allow_write_val = bool(getattr(meta_obj, "allowWrite", False))
-            if allow_write_val:
-                import os
-                os.chown(case_dir, SANDBOX_UID, SANDBOX_GID)
-                os.chmod(case_dir, 0o755)
-                for item in case_dir.rglob("*"):
-                    try:
-                        os.chown(item, SANDBOX_UID, SANDBOX_GID)
-                        if item.is_dir():
-                            os.chmod(item, 0o755)
-                        else:
-                            os.chmod(item, 0o644)
-                    except Exception:
-                        pass
-        except Exception as exc:
-            logger().warning(
-                "prepare case dir failed [id=%s case=%s]: %s",
-                submission_id,
-                case_no,
-                exc,
-            )
-            res = make_runner_result(status="JE",
-                                     stderr=f"prepare case dir failed: {exc}")
-            lock = self.locks.get(submission_id)
-            target_fn = self.on_case_complete
-            if lock:
-                with lock:
-                    target_fn(
-                        submission_id=submission_id,
-                        case_no=case_no,
-                        stdout=res["Stdout"],
-                        stderr=res["Stderr"],
-                        exit_code=res["DockerExitCode"],
-                        exec_time=res["Duration"],
-                        mem_usage=res["MemUsage"],
-                        prob_status=res["Status"],
-                    )
-            else:
-                target_fn(
-                    submission_id=submission_id,
-                    case_no=case_no,
-                    stdout=res["Stdout"],
-                    stderr=res["Stderr"],
-                    exit_code=res["DockerExitCode"],
-                    exec_time=res["Duration"],
-                    mem_usage=res["MemUsage"],
-                    prob_status=res["Status"],
-                )
+        prepared = self._prepare_case(submission_id, case_no, meta_obj,
+                                      collect_artifacts)
+        if prepared is None:
             return
-        # copy resource files for this case (function checks if resource_data/ exists)
-        copied_resources = None
-        copy_error = None
-        try:
-            copied_resources = copy_resource_for_case(
-                submission_path=submission_path,
-                case_dir=case_dir,
-                task_no=int(case_no[:2]),
-                case_no=int(case_no[2:]),
-            )
-        except Exception as exc:
-            copy_error = exc
-            logger().warning(
-                "resource copy failed [id=%s case=%s]: %s",
-                submission_id,
-                case_no,
-                exc,
-            )
-        if copy_error:
-            res = make_runner_result(
-                status="JE", stderr=f"resource copy failed: {copy_error}")
-            lock = self.locks.get(submission_id)
-            if lock:
-                with lock:
-                    self.on_case_complete(
-                        submission_id=submission_id,
-                        case_no=case_no,
-                        stdout=res["Stdout"],
-                        stderr=res["Stderr"],
-                        exit_code=res["DockerExitCode"],
-                        exec_time=res["Duration"],
-                        mem_usage=res["MemUsage"],
-                        prob_status=res["Status"],
-                    )
-            else:
-                self.on_case_complete(
-                    submission_id=submission_id,
-                    case_no=case_no,
-                    stdout=res["Stdout"],
-                    stderr=res["Stderr"],
-                    exit_code=res["DockerExitCode"],
-                    exec_time=res["Duration"],
-                    mem_usage=res["MemUsage"],
-                    prob_status=res["Status"],
-                )
-            return
-        if collect_artifacts:
-            try:
-                self.artifact_collector.snapshot_before_case(
-                    submission_id=submission_id,
-                    task_no=int(case_no[:2]),
-                    case_no=int(case_no[2:]),
-                    workdir=case_dir,
-                )
-            except Exception as exc:
-                logger().warning(
-                    "snapshot before case failed [id=%s case=%s]: %s",
-                    submission_id,
-                    case_no,
-                    exc,
-                )
+        case_dir, copied_resources = prepared
         use_custom_checker = self._use_custom_checker(submission_id)
         checker_info = self.custom_checker_info.get(submission_id, {})
         if ExecutionMode(execution_mode) == ExecutionMode.INTERACTIVE:
-            # Fetch teacher language from meta (set by backend) to avoid running teacher with student lang.
-            submission_config, _ = self.result.get(submission_id, (None, None))
-            teacher_lang_val = (getattr(submission_config, "assetPaths", {})
-                                or {}).get("teacherLang")
-            student_allow_write = bool(
-                getattr(submission_config, "allowWrite", False))
-            mapping = {"c": "c11", "cpp": "cpp17", "py": "python3"}
-            teacher_lang_key = mapping.get(str(teacher_lang_val or "").lower())
-            if teacher_lang_key is None:
-                # mark JE for all cases of this submission
-                self._mark_submission_failed(submission_id, "JE",
-                                             "teacherLang missing/invalid")
+            options = self._interactive_options(submission_id)
+            if options is None:
                 return
+            teacher_lang_key, student_allow_write = options
             compile_res = self.extract_compile_result(submission_id, lang)
             if self.compile_need(lang) and compile_res.get("Status") == "CE":
                 res = compile_res
@@ -1224,6 +1318,7 @@ class Dispatcher(threading.Thread):
                     teacher_first=teacher_first,
                     lang_key=lang_key,
                     teacher_lang_key=teacher_lang_key,
+                    pipe_mode=self.interactive_pipe_mode,
                     case_dir=case_dir,
                     student_allow_write=student_allow_write,
                     teacher_case_dir=teacher_case_dir,
@@ -1253,10 +1348,15 @@ class Dispatcher(threading.Thread):
                 allow_write=bool(getattr(meta_obj, "allowWrite", False)),
             )
             res = self.extract_compile_result(submission_id, lang)
+            stdout_path = None
+            if use_custom_checker and self._custom_checker_path(submission_id):
+                # the checker mounts the sandbox's stdout file read-only
+                stdout_path = self._checker_stdout_path(submission_id, case_no)
             if res["Status"] != "CE":
                 try:
                     self.inc_container()
-                    res = runner.run(skip_diff=use_custom_checker)
+                    res = runner.run(skip_diff=use_custom_checker,
+                                     stdout_path=stdout_path)
                 finally:
                     self.dec_container()
                 if copied_resources:
@@ -1307,7 +1407,9 @@ class Dispatcher(threading.Thread):
                         checker_path=checker_path,
                         case_in_path=container_in_path,
                         case_ans_path=container_out_path,
-                        student_output=res.get("Stdout", ""),
+                        # Stdout is only a preview when it was streamed
+                        student_output=None
+                        if stdout_path is not None else res.get("Stdout", ""),
                         time_limit_ms=time_limit,
                         mem_limit_kb=mem_limit,
                         image=self.custom_checker_image,
@@ -1316,7 +1418,15 @@ class Dispatcher(threading.Thread):
                         teacher_dir=teacher_case_dir,
                         ai_checker_config=ai_checker_config,
                         problem_id=problem_id,
+                        worker_pool=self.checker_workers,
+                        student_output_path=stdout_path,
+                        verdict_cache=self.checker_cache if getattr(
+                            meta_obj, "checkerCache", False) else None,
                     )
+                    with self.checker_stats_lock:
+                        self.checked_cases += 1
+                        self.checker_bytes_written += checker_result.get(
+                            "bytesWritten", 0)
                     res["Status"] = checker_result["status"]
                     message = checker_result.get("message", "")
                     if message:
@@ -1331,6 +1441,250 @@ class Dispatcher(threading.Thread):
                         status=checker_result["status"],
                         message=message,
                     )
+            if stdout_path is not None:
+                stdout_path.unlink(missing_ok=True)
+        self._finish_case(submission_id, case_no, case_dir, res,
+                          collect_artifacts)
+
+    def run_interactive_batch(
+        self,
+        submission_id: str,
+        task_id: int,
+        case_ids: list,
+        mem_limit: int,
+        time_limit: int,
+        lang: Language,
+        teacher_first: bool = False,
+        network_mode: str = "none",
+    ):
+        """
+        Run interactive cases of a task in one orchestrator container. Every
+        case is prepared, reported and cleaned up on its own, the same way
+        `create_container` handles a single case.
+        """
+        lang_key = ["c11", "cpp17", "python3"][int(lang)]
+        submission_path = self.SUBMISSION_DIR / submission_id
+        meta_obj, _ = self.result.get(submission_id, (None, None))
+        collect_artifacts = meta_obj and ArtifactCollector.should_collect_artifacts(
+            meta_obj)
+        prepared = {}
+        for case_id in case_ids:
+            case_no = f"{task_id:02d}{case_id:02d}"
+            case = self._prepare_case(submission_id, case_no, meta_obj,
+                                      collect_artifacts)
+            if case is not None:
+                prepared[case_no] = case
+        if not prepared:
+            return
+        options = self._interactive_options(submission_id)
+        if options is None:
+            return
+        teacher_lang_key, student_allow_write = options
+        compile_res = self.extract_compile_result(submission_id, lang)
+        if self.compile_need(lang) and compile_res.get("Status") == "CE":
+            results = {case_no: compile_res for case_no in prepared}
+        else:
+            cases = []
+            for case_no, (case_dir, _) in prepared.items():
+                teacher_case_dir = prepare_teacher_for_case(
+                    submission_path=submission_path,
+                    task_no=int(case_no[:2]),
+                    case_no=int(case_no[2:]),
+                    teacher_common_dir=submission_path / "teacher" / "common",
+                    copy_testcase=True,
+                )
+                cases.append((case_no, case_dir, teacher_case_dir))
+            runner = InteractiveRunner(
+                submission_id=submission_id,
+                time_limit=time_limit,
+                mem_limit=mem_limit,
+                case_in_path=str(self.submission_runner_cwd / submission_id /
+                                 "testcase"),
+                teacher_first=teacher_first,
+                lang_key=lang_key,
+                teacher_lang_key=teacher_lang_key,
+                pipe_mode=self.interactive_pipe_mode,
+                student_allow_write=student_allow_write,
+                network_mode=network_mode,
+            )
+            try:
+                self.inc_container()
+                results = runner.run_batch(cases)
+            finally:
+                self.dec_container()
+            for case_dir, copied_resources in prepared.values():
+                if copied_resources:
+                    try:
+                        cleanup_resource_files(case_dir, copied_resources)
+                    except Exception:
+                        pass
+        for case_no, (case_dir, _) in prepared.items():
+            self._finish_case(submission_id, case_no, case_dir,
+                              results[case_no], collect_artifacts)
+
+    def _prepare_case(self, submission_id: str, case_no: str, meta_obj,
+                      collect_artifacts: bool):
+        """
+        Create the case workdir from the common dir and copy the case's
+        resource files. Returns (case_dir, copied resources), or None after
+        completing the case with JE.
+        """
+        submission_path = self.SUBMISSION_DIR / submission_id
+        common_dir = self._common_dir(submission_id)
+        case_dir = self._case_dir(submission_id, case_no)
+        # prepare per-case workdir: clean and copy common + resources
+        SANDBOX_UID = 1450
+        SANDBOX_GID = 1450
+        try:
+            if case_dir.exists():
+                shutil.rmtree(case_dir)
+            case_dir.mkdir(parents=True, exist_ok=True)
+            if common_dir.exists():
+                shutil.copytree(common_dir,
+                                case_dir,
+                                dirs_exist_ok=True,
+                                ignore=shutil.ignore_patterns("cases"))
+            # Set permissions for sandbox user to write if allowWrite is enabled
+            allow_write_val = bool(getattr(meta_obj, "allowWrite", False))
+            if allow_write_val:
+                import os
+                os.chown(case_dir, SANDBOX_UID, SANDBOX_GID)
+                os.chmod(case_dir, 0o755)
+                for item in case_dir.rglob("*"):
+                    try:
+                        os.chown(item, SANDBOX_UID, SANDBOX_GID)
+                        if item.is_dir():
+                            os.chmod(item, 0o755)
+                        else:
+                            os.chmod(item, 0o644)
+                    except Exception:
+                        pass
+        except Exception as exc:
+            logger().warning(
+                "prepare case dir failed [id=%s case=%s]: %s",
+                submission_id,
+                case_no,
+                exc,
+            )
+            res = make_runner_result(status="JE",
+                                     stderr=f"prepare case dir failed: {exc}")
+            lock = self.locks.get(submission_id)
+            target_fn = self.on_case_complete
+            if lock:
+                with lock:
+                    target_fn(
+                        submission_id=submission_id,
+                        case_no=case_no,
+                        stdout=res["Stdout"],
+                        stderr=res["Stderr"],
+                        exit_code=res["DockerExitCode"],
+                        exec_time=res["Duration"],
+                        mem_usage=res["MemUsage"],
+                        prob_status=res["Status"],
+                    )
+            else:
+                target_fn(
+                    submission_id=submission_id,
+                    case_no=case_no,
+                    stdout=res["Stdout"],
+                    stderr=res["Stderr"],
+                    exit_code=res["DockerExitCode"],
+                    exec_time=res["Duration"],
+                    mem_usage=res["MemUsage"],
+                    prob_status=res["Status"],
+                )
+            return None
+        # copy resource files for this case (function checks if resource_data/ exists)
+        copied_resources = None
+        copy_error = None
+        try:
+            copied_resources = copy_resource_for_case(
+                submission_path=submission_path,
+                case_dir=case_dir,
+                task_no=int(case_no[:2]),
+                case_no=int(case_no[2:]),
+            )
+        except Exception as exc:
+            copy_error = exc
+            logger().warning(
+                "resource copy failed [id=%s case=%s]: %s",
+                submission_id,
+                case_no,
+                exc,
+            )
+        if copy_error:
+            res = make_runner_result(
+                status="JE", stderr=f"resource copy failed: {copy_error}")
+            lock = self.locks.get(submission_id)
+            if lock:
+                with lock:
+                    self.on_case_complete(
+                        submission_id=submission_id,
+                        case_no=case_no,
+                        stdout=res["Stdout"],
+                        stderr=res["Stderr"],
+                        exit_code=res["DockerExitCode"],
+                        exec_time=res["Duration"],
+                        mem_usage=res["MemUsage"],
+                        prob_status=res["Status"],
+                    )
+            else:
+                self.on_case_complete(
+                    submission_id=submission_id,
+                    case_no=case_no,
+                    stdout=res["Stdout"],
+                    stderr=res["Stderr"],
+                    exit_code=res["DockerExitCode"],
+                    exec_time=res["Duration"],
+                    mem_usage=res["MemUsage"],
+                    prob_status=res["Status"],
+                )
+            return None
+        if collect_artifacts:
+            try:
+                self.artifact_collector.snapshot_before_case(
+                    submission_id=submission_id,
+                    task_no=int(case_no[:2]),
+                    case_no=int(case_no[2:]),
+                    workdir=case_dir,
+                )
+            except Exception as exc:
+                logger().warning(
+                    "snapshot before case failed [id=%s case=%s]: %s",
+                    submission_id,
+                    case_no,
+                    exc,
+                )
+        return case_dir, copied_resources
+
+    def _interactive_options(self, submission_id: str):
+        """
+        (teacher lang key, student allow write) of an interactive
+        submission, or None after failing the submission.
+        """
+        # Fetch teacher language from meta (set by backend) to avoid running teacher with student lang.
+        submission_config, _ = self.result.get(submission_id, (None, None))
+        teacher_lang_val = (getattr(submission_config, "assetPaths", {})
+                            or {}).get("teacherLang")
+        student_allow_write = bool(
+            getattr(submission_config, "allowWrite", False))
+        mapping = {"c": "c11", "cpp": "cpp17", "py": "python3"}
+        teacher_lang_key = mapping.get(str(teacher_lang_val or "").lower())
+        if teacher_lang_key is None:
+            # mark JE for all cases of this submission
+            self._mark_submission_failed(submission_id, "JE",
+                                         "teacherLang missing/invalid")
+            return None
+        return teacher_lang_key, student_allow_write
+
+    def _finish_case(self, submission_id: str, case_no: str,
+                     case_dir: pathlib.Path, res: dict,
+                     collect_artifacts: bool):
+        """Collect artifacts, report the case result and drop its workdir."""
+        if res.get("transcript"):
+            logger().debug(f"interactive transcript "
+                           f"[id={submission_id} case={case_no}]: "
+                           f"{res['transcript']}")
         if collect_artifacts:
             try:
                 # Only read input and answer for trial submissions
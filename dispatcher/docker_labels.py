@@ -0,0 +1,49 @@
+"""
+Labels put on every container and network the sandbox creates.
+
+Cleanup asks dockerd for exactly these resources through label filters
+instead of listing everything on the daemon and matching names.
+"""
+
+import uuid
+from typing import Dict, List, Optional
+
+MANAGED = "noj.managed"
+SUBMISSION = "noj.submission"
+ROLE = "noj.role"
+# process that created the resource, startup cleanup skips its own
+INSTANCE = "noj.instance"
+
+ROLE_NETWORK = "network"
+ROLE_ROUTER = "router"
+ROLE_SIDECAR = "sidecar"
+ROLE_CUSTOM_ENV = "custom-env"
+ROLE_SANDBOX = "sandbox"
+ROLE_BUILD = "build"
+ROLE_INTERACTIVE = "interactive"
+ROLE_CHECKER = "checker"
+ROLE_CHECKER_ROUTER = "checker-router"
+ROLE_SCORER = "scorer"
+
+# resources of a submission's network topology
+NETWORK_ROLES = (ROLE_NETWORK, ROLE_ROUTER, ROLE_SIDECAR, ROLE_CUSTOM_ENV)
+
+INSTANCE_ID = uuid.uuid4().hex[:12]
+
+
+def labels(submission_id: Optional[str], role: str) -> Dict[str, str]:
+    result = {MANAGED: "1", ROLE: role, INSTANCE: INSTANCE_ID}
+    if submission_id:
+        result[SUBMISSION] = str(submission_id)
+    return result
+
+
+def label_filters(submission_id: Optional[str] = None,
+                  role: Optional[str] = None) -> Dict[str, List[str]]:
+    """`filters` argument for APIClient.containers() / networks()."""
+    wanted = [f"{MANAGED}=1"]
+    if submission_id:
+        wanted.append(f"{SUBMISSION}={submission_id}")
+    if role:
+        wanted.append(f"{ROLE}={role}")
+    return {"label": wanted}
@@ -0,0 +1,62 @@
+"""
+Coordinator for custom environment image builds.
+
+Builds are keyed by (tag, checksum). Concurrent requests for the same key
+share a single flight, so two submissions of a problem arriving together
+build its images once. Independent images build in parallel, at most
+IMAGE_BUILD_WORKERS at a time across all problems.
+"""
+
+import pathlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Tuple
+
+
+class ImageBuildCoordinator:
+
+    def __init__(self, build: Callable[[pathlib.Path, str, str], bool],
+                 max_workers: int):
+        """
+        `build(context_path, tag, checksum)` returns whether the image is
+        usable; it runs on one of `max_workers` threads.
+        """
+        self._build = build
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                            thread_name_prefix="image-build")
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.joined = 0
+
+    def submit(self, context_path: pathlib.Path, tag: str,
+               checksum: str) -> Future:
+        """Start building `tag`, or join the flight already building it."""
+        key = (tag, checksum)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.joined += 1
+                return future
+            future = self._executor.submit(self._build, context_path, tag,
+                                           checksum)
+            self._inflight[key] = future
+            self.started += 1
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key: Tuple[str, str], future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "inflight": len(self._inflight),
+                "started": self.started,
+                "joined": self.joined,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import List
 
 
 @dataclass
@@ -18,6 +19,14 @@ class Execute:
     case_id: int
 
 
+@dataclass
+class ExecuteBatch:
+    """Interactive cases of one task run in a single container."""
+    submission_id: str
+    task_id: int
+    case_ids: List[int]
+
+
 @dataclass
 class StaticAnalysis:
     submission_id: str
@@ -8,11 +8,22 @@ from pydantic import (
 )
 
 
+# When a sidecar counts as ready; set one of tcpPort / command
+class Readiness(BaseModel):
+    tcpPort: Optional[int] = None
+    command: Optional[List[str]] = None
+    timeout: Optional[float] = None  # seconds, default READINESS_TIMEOUT
+
+
 class Sidecar(BaseModel):
     image: str
     name: str  # Hostname for the sidecar container ex: "mysql"
     env: Dict[str, str] = Field(default_factory=dict)
     args: List[str] = Field(default_factory=list)
+    readiness: Optional[Readiness] = None
+    # Restores the initial state so the sidecar can be reused, see
+    # dispatcher/topology_pool.py
+    reset: Optional[List[str]] = None
 
 
 class Task(BaseModel):
@@ -22,6 +33,28 @@ class Task(BaseModel):
     caseCount: int
 
 
+# Built-in scoring, evaluated in the dispatcher instead of a scorer
+# container, see dispatcher/scoring_policy.py
+class LatePenalty(BaseModel):
+    perDay: float  # fraction of the score taken per day late
+    max: float = 1.0  # cap of the total fraction taken
+    graceSeconds: int = 0
+
+
+class RuntimeBonus(BaseModel):
+    thresholdMs: int  # bonus when the run time is below this
+    rate: float  # fraction of the score added
+    metric: Literal["avgRunTime", "maxRunTime"] = "avgRunTime"
+    requireAllAC: bool = False
+
+
+class ScoringPolicy(BaseModel):
+    # score each task by its share of AC cases instead of all-or-nothing
+    partialCredit: bool = False
+    runtimeBonus: Optional[RuntimeBonus] = None
+    latePenalty: Optional[LatePenalty] = None
+
+
 class Meta(BaseModel):
     language: Language
     tasks: conlist(Task, min_items=1)
@@ -34,8 +67,13 @@ class Meta(BaseModel):
     sidecars: List[Sidecar] = Field(default_factory=list)
     customChecker: bool = False
     checkerAsset: Optional[str] = None
+    # reuse verdicts of identical (checker, input, answer, output) cases,
+    # see dispatcher/checker_cache.py
+    checkerCache: bool = False
     scoringScript: bool = False
     scorerAsset: Optional[str] = None
+    # takes precedence over scoringScript
+    scoringPolicy: Optional[ScoringPolicy] = None
     artifactCollection: list[str] = Field(default_factory=list)
     resourceData: bool = False
     resourceDataTeacher: bool = False
@@ -3,16 +3,44 @@ import json
 import time
 import multiprocessing
 import queue
+import threading
+import uuid
 import docker
 import pathlib
 import tarfile
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
 
 from . import config
 from .utils import logger
 from .meta import Sidecar
 from .pipeline import fetch_problem_network_config
+from . import docker_labels
 from .asset_cache import ensure_extracted_resource, get_asset_checksum
+from .image_builds import ImageBuildCoordinator
+from .readiness import Probe, ReadinessTimeout, run_exec, wait_until_ready
+from .topology_pool import TopologyPool, topology_key
+
+# Topology kinds, reported by NetworkController.provision_stats()
+TOPOLOGY_NONE = "none"
+TOPOLOGY_ROUTER = "router"
+TOPOLOGY_SIDECARS = "sidecars"
+TOPOLOGY_MIXED = "mixed"
+
+# network_router/entrypoint.sh creates it once the firewall and dnsmasq are up
+ROUTER_READY_FILE = "/tmp/router-ready"
+# readiness_stats() key for containers that had nothing to probe
+READINESS_DELAY = "delay"
+
+
+def classify_topology(need_router: bool, need_internal: bool) -> str:
+    if need_router and need_internal:
+        return TOPOLOGY_MIXED
+    if need_router:
+        return TOPOLOGY_ROUTER
+    if need_internal:
+        return TOPOLOGY_SIDECARS
+    return TOPOLOGY_NONE
 
 
 class BuildTimeoutError(Exception):
@@ -58,6 +86,22 @@ class NetworkController:
         self.SUBMISSION_DIR = submission_dir or config.SUBMISSION_DIR
         self.resources: Dict[str, Dict] = {}
         self.docker_url = docker_url
+        # topology -> provisioning timings
+        self._provision_stats: Dict[str, Dict] = {}
+        # probe kind -> time until containers were ready
+        self._readiness_stats: Dict[str, Dict] = {}
+        self._stats_lock = threading.Lock()
+        # released topologies waiting to be reused (None: pooling disabled)
+        self.topology_pool: Optional[TopologyPool] = None
+        self._reset_executor: Optional[ThreadPoolExecutor] = None
+        self.image_builds = ImageBuildCoordinator(
+            lambda context_path, tag, checksum: self._build_one_image(
+                context_path, tag, checksum), config.IMAGE_BUILD_WORKERS)
+        if config.TOPOLOGY_POOL_SIZE > 0:
+            self.topology_pool = TopologyPool(
+                config.TOPOLOGY_POOL_SIZE, config.TOPOLOGY_POOL_IDLE_SECONDS)
+            self._reset_executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="topology-reset")
 
         logger().debug(
             f"(*_*)[In __init__] Initializing NetworkController with Docker URL: {docker_url}"
@@ -73,17 +117,26 @@ class NetworkController:
             self.client = None
             self.docker_cli = None
 
-        # Cleanup stale resources from previous runs on initialization
+        # Cleanup stale resources from previous runs on initialization, in
+        # the background so it does not delay the service coming up
+        self._startup_cleanup: Optional[threading.Thread] = None
         if cleanup_on_init and self.client:
             logger().info(
                 "Performing startup cleanup of stale NOJ resources...")
-            self.cleanup_stale_resources()
+            self._startup_cleanup = threading.Thread(
+                target=self.cleanup_stale_resources,
+                name="network-startup-cleanup",
+                daemon=True)
+            self._startup_cleanup.start()
 
     def cleanup_stale_resources(self, submission_id: str = None):
         """
         Clean up any stale containers and networks left from previous runs.
         If submission_id is provided, only clean resources for that submission.
-        Otherwise, clean ALL noj-related resources.
+        Otherwise, clean ALL noj network resources not created by this process.
+
+        Resources are looked up by their labels (see docker_labels), so
+        dockerd only returns our own containers and networks.
 
         This should be called:
         1. Before provisioning a new network (with submission_id)
@@ -96,34 +149,23 @@ class NetworkController:
 
         logger().info(
             f"Cleaning up stale resources (submission_id={submission_id})...")
+        filters = docker_labels.label_filters(submission_id)
 
-        # Define patterns for containers and networks to clean
-        if submission_id:
-            container_patterns = [
-                f"router-{submission_id}",
-                f"sidecar-{submission_id}-",
-                f"custom-*-{submission_id}",
-            ]
-            network_patterns = [f"noj-net-{submission_id}"]
-        else:
-            # Clean all NOJ-related resources
-            container_patterns = ["router-", "sidecar-", "custom-"]
-            network_patterns = ["noj-net-"]
+        def is_stale(resource_labels: Optional[dict]) -> bool:
+            resource_labels = resource_labels or {}
+            if resource_labels.get(
+                    docker_labels.ROLE) not in docker_labels.NETWORK_ROLES:
+                return False
+            # on startup, keep what this process already created
+            return bool(submission_id) or resource_labels.get(
+                docker_labels.INSTANCE) != docker_labels.INSTANCE_ID
 
         # Step 1: Find and remove stale containers
         stale_containers = []
         try:
-            all_containers = self.client.containers(all=True)
-            for container in all_containers:
-                names = container.get("Names", [])
-                for name in names:
-                    # Docker names start with "/"
-                    clean_name = name.lstrip("/")
-                    for pattern in container_patterns:
-                        if clean_name.startswith(
-                                pattern) or pattern in clean_name:
-                            stale_containers.append(container["Id"])
-                            break
+            for container in self.client.containers(all=True, filters=filters):
+                if is_stale(container.get("Labels")):
+                    stale_containers.append(container["Id"])
         except Exception as e:
             logger().warning(
                 f"Failed to list containers for stale cleanup: {e}")
@@ -144,13 +186,9 @@ class NetworkController:
         # Step 2: Find and remove stale networks
         stale_networks = []
         try:
-            all_networks = self.client.networks()
-            for network in all_networks:
-                name = network.get("Name", "")
-                for pattern in network_patterns:
-                    if name.startswith(pattern):
-                        stale_networks.append(network["Id"])
-                        break
+            for network in self.client.networks(filters=filters):
+                if is_stale(network.get("Labels")):
+                    stale_networks.append(network["Id"])
         except Exception as e:
             logger().warning(f"Failed to list networks for stale cleanup: {e}")
 
@@ -173,44 +211,200 @@ class NetworkController:
     def provision_network(self, submission_id: str, problem_id: int):
         """
         Main Entry: Fetch Config -> Check/Build Custom Image -> Setup Topology
+
+        Submissions whose problem needs no network return right after the
+        config fetch, without any Docker call.
         """
         logger().debug(
             f"(*_*)[In provision_network] Starting network provisioning for submission {submission_id}, problem {problem_id}"
         )
-        if not self.client:
-            raise RuntimeError("Docker client not initialized")
-
-        # 0. Cleanup any stale resources from previous runs of this submission
-        self.cleanup_stale_resources(submission_id)
-
-        # 1. Fetch Config
-        logger().info(f"[{submission_id}] Fetching network config...")
-        net_config = fetch_problem_network_config(problem_id)
-        external_config = net_config.get("external", {})
-        logger().debug(
-            f"(*_*)[In provision_network] External network config: {external_config}"
-        )
-        sidecars_config = net_config.get("sidecars", [])
-        logger().debug(
-            f"(*_*)[In provision_network] Sidecars config: {sidecars_config}")
-        custom_env = net_config.get("custom_env", {})
-        logger().debug(
-            f"(*_*)[In provision_network] Custom environment config: {custom_env}"
-        )
-
-        # 2. Handle Custom Dockerfile
-        # Ensure local Docker Image is up-to-date
-        custom_image_name = None
-        if custom_env and custom_env.get("enabled"):
-            env_whitelist = custom_env.get("env_list")
-            custom_image_name = self._ensure_docker_image(
-                problem_id, env_whitelist)
+        started = time.monotonic()
+        topology = TOPOLOGY_NONE
+        ok = False
+        try:
+            # 1. Fetch Config
+            logger().info(f"[{submission_id}] Fetching network config...")
+            net_config = fetch_problem_network_config(problem_id)
+            external_config = net_config.get("external", {})
+            logger().debug(
+                f"(*_*)[In provision_network] External network config: {external_config}"
+            )
+            sidecars_config = net_config.get("sidecars", [])
+            logger().debug(
+                f"(*_*)[In provision_network] Sidecars config: {sidecars_config}"
+            )
+            custom_env = net_config.get("custom_env", {})
+            logger().debug(
+                f"(*_*)[In provision_network] Custom environment config: {custom_env}"
+            )
+            wants_custom = bool(custom_env and custom_env.get("enabled"))
+            topology = classify_topology(
+                self._need_router(external_config),
+                bool(sidecars_config) or wants_custom,
+            )
+            if topology == TOPOLOGY_NONE:
+                logger().info(f"[{submission_id}] No network needed")
+                ok = True
+                return
+
+            if not self.client:
+                raise RuntimeError("Docker client not initialized")
+
+            # 0. Cleanup any stale resources from previous runs of this submission
+            self.cleanup_stale_resources(submission_id)
+
+            # 2. Handle Custom Dockerfile
+            # Ensure local Docker Image is up-to-date
+            custom_image_name = None
+            if wants_custom:
+                env_whitelist = custom_env.get("env_list")
+                custom_image_name = self._ensure_docker_image(
+                    problem_id, env_whitelist)
+
+            # 3. Setup Network Topology, or lease a pooled one
+            pool_key = self._pool_key(external_config, sidecars_config,
+                                      custom_env, custom_image_name)
+            topology_id = submission_id
+            if pool_key is not None:
+                self._reap_idle_topologies()
+                record = self.topology_pool.acquire(pool_key)
+                if record is not None:
+                    logger().info(
+                        f"[{submission_id}] Reusing topology {record['topology_id']}"
+                    )
+                    self.resources[submission_id] = record
+                    ok = True
+                    return
+                # named after the topology, it outlives this submission
+                topology_id = f"pool-{uuid.uuid4().hex[:12]}"
+
+            self._setup_topology(submission_id=topology_id,
+                                 external_config=external_config,
+                                 sidecars_config=sidecars_config,
+                                 custom_image=custom_image_name)
+            if pool_key is not None:
+                record = self.resources.pop(topology_id)
+                hooks = self._reset_hooks(sidecars_config, custom_env,
+                                          custom_image_name)
+                record.update(pool_key=pool_key,
+                              topology_id=topology_id,
+                              reset_commands=dict(
+                                  zip(record["container_ids"], hooks)))
+                self.resources[submission_id] = record
+            ok = True
+        finally:
+            seconds = time.monotonic() - started
+            self._record_timing(self._provision_stats, topology, seconds, ok)
+            logger().info(
+                f"network provisioning took {seconds:.2f}s [topology={topology}, ok={ok}]"
+            )
 
-        # 3. Setup Network Topology
-        self._setup_topology(submission_id=submission_id,
-                             external_config=external_config,
-                             sidecars_config=sidecars_config,
-                             custom_image=custom_image_name)
+    @staticmethod
+    def _reset_hooks(sidecars_config: list, custom_env: dict,
+                     custom_images: Optional[Dict[str, str]]) -> list:
+        # one per internal container: sidecars first, then custom envs
+        custom_resets = (custom_env or {}).get("reset") or {}
+        return ([Sidecar(**sc).reset for sc in sidecars_config or []] +
+                [custom_resets.get(alias) for alias in custom_images or {}])
+
+    def _pool_key(self, external_config: dict, sidecars_config: list,
+                  custom_env: dict,
+                  custom_images: Optional[Dict[str, str]]) -> Optional[str]:
+        """
+        Pool key of the topology, or None if it must not be reused (pooling
+        disabled, or a container without a reset hook).
+        """
+        if self.topology_pool is None:
+            return None
+        if not all(
+                self._reset_hooks(sidecars_config, custom_env, custom_images)):
+            return None
+        image_ids = {
+            alias: self.client.inspect_image(tag)["Id"]
+            for alias, tag in (custom_images or {}).items()
+        }
+        return topology_key(external_config, sidecars_config, image_ids)
+
+    def _reset_topology(self, res: dict):
+        """Return a leased topology to its initial state, see topology_pool."""
+        for cid, command in res.get("reset_commands", {}).items():
+            exit_code = run_exec(self.client, cid, command,
+                                 config.TOPOLOGY_RESET_TIMEOUT)
+            if exit_code is None:
+                raise RuntimeError(f"reset of {cid[:12]} timed out after "
+                                   f"{config.TOPOLOGY_RESET_TIMEOUT}s")
+            if exit_code != 0:
+                raise RuntimeError(
+                    f"reset of {cid[:12]} exited with {exit_code}")
+        router_id = res.get("router_id")
+        if router_id:
+            self.client.restart(router_id, timeout=1)
+            self._wait_for_services_ready(
+                {router_id: Probe.exec(["test", "-f", ROUTER_READY_FILE])})
+
+    def _recycle_topology(self, res: dict):
+        topology_id = res["topology_id"]
+        try:
+            self._reset_topology(res)
+        except Exception as e:
+            logger().warning(f"Not reusing topology {topology_id}: {e}")
+            self.cleanup(topology_id, temp_resource=res)
+            return
+        logger().info(f"Topology {topology_id} reset and pooled")
+        for old in self.topology_pool.release(res["pool_key"], topology_id,
+                                              res):
+            self.cleanup(old["topology_id"], temp_resource=old)
+
+    def _reap_idle_topologies(self):
+        for old in self.topology_pool.expire():
+            logger().info(f"Removing idle topology {old['topology_id']}")
+            self.cleanup(old["topology_id"], temp_resource=old)
+
+    def drain_topology_pool(self):
+        """Tear down every idle pooled topology."""
+        if self.topology_pool is None:
+            return
+        for old in self.topology_pool.drain():
+            self.cleanup(old["topology_id"], temp_resource=old)
+
+    def topology_pool_stats(self) -> Optional[dict]:
+        if self.topology_pool is None:
+            return None
+        return self.topology_pool.stats()
+
+    def _record_timing(self, table: Dict[str, Dict], key: str, seconds: float,
+                       ok: bool):
+        with self._stats_lock:
+            stats = table.setdefault(
+                key, {
+                    "count": 0,
+                    "failures": 0,
+                    "totalSeconds": 0.0,
+                    "maxSeconds": 0.0,
+                })
+            stats["count"] += 1
+            if not ok:
+                stats["failures"] += 1
+            stats["totalSeconds"] += seconds
+            stats["maxSeconds"] = max(stats["maxSeconds"], seconds)
+
+    def _timing_summary(self, table: Dict[str, Dict]) -> Dict[str, Dict]:
+        with self._stats_lock:
+            return {
+                key: {
+                    **stats,
+                    "meanSeconds": stats["totalSeconds"] / stats["count"],
+                }
+                for key, stats in table.items()
+            }
+
+    def provision_stats(self) -> Dict[str, Dict]:
+        """Provisioning time per topology type."""
+        return self._timing_summary(self._provision_stats)
+
+    def readiness_stats(self) -> Dict[str, Dict]:
+        """Time until network containers were ready, per probe kind."""
+        return self._timing_summary(self._readiness_stats)
 
     def _ensure_docker_image(
             self,
@@ -236,8 +430,10 @@ class NetworkController:
         if not extracted_path:
             return []
         built_images = {}
+        # folder -> (image tag, build), in folder order
+        pending = {}
 
-        for item in extracted_path.iterdir():
+        for item in sorted(extracted_path.iterdir()):
             if item.is_dir() and (item / "Dockerfile").exists():
                 folder_name = item.name
                 if allowed_envs is not None and folder_name not in allowed_envs:
@@ -248,16 +444,49 @@ class NetworkController:
 
                 # Tag：noj-custom-env:{pid}-{folder_name}
                 tag = f"noj-custom-env:{problem_id}-{item.name}"
-                if self._build_one_image(item, tag, latest_checksum):
+                if self._image_up_to_date(tag, latest_checksum):
                     built_images[folder_name] = tag
-
+                    continue
+                # Build independent folders in parallel; a build of the
+                # same tag and checksum already in flight is joined
+                pending[folder_name] = (tag,
+                                        self.image_builds.submit(
+                                            item, tag, latest_checksum))
+
+        for folder_name, (tag, future) in pending.items():
+            if future.result():
+                built_images[folder_name] = tag
         return built_images
 
-    def _build_one_image(self, context_path: pathlib.Path, tag: str,
-                         checksum: str) -> bool:
-        logger().debug(
-            f"(*_*)[In _build_one_image] Building image {tag} with checksum {checksum}"
-        )
+    def prebuild_custom_images(self, problem_id: int):
+        """
+        Build a problem's custom env images in the background, e.g. right
+        after its network_dockerfile asset changed, so the first submission
+        does not wait for the build.
+        """
+        if not self.docker_cli:
+            return
+
+        def prebuild():
+            try:
+                images = self._ensure_docker_image(problem_id)
+                if images:
+                    logger().info(
+                        f"Custom images ready for problem {problem_id}: {sorted(images.values())}"
+                    )
+            except Exception as e:
+                logger().warning(
+                    f"Prebuilding custom images for problem {problem_id} failed: {e}"
+                )
+
+        threading.Thread(target=prebuild,
+                         name=f"image-prebuild-{problem_id}",
+                         daemon=True).start()
+
+    def image_build_stats(self) -> dict:
+        return self.image_builds.stats()
+
+    def _image_up_to_date(self, tag: str, checksum: str) -> bool:
         try:
             img = self.docker_cli.images.get(tag)
             if img.labels.get("noj_hash") == checksum:
@@ -267,6 +496,15 @@ class NetworkController:
             pass
         except Exception as e:
             logger().warning(f"Error checking image {tag}: {e}")
+        return False
+
+    def _build_one_image(self, context_path: pathlib.Path, tag: str,
+                         checksum: str) -> bool:
+        logger().debug(
+            f"(*_*)[In _build_one_image] Building image {tag} with checksum {checksum}"
+        )
+        if self._image_up_to_date(tag, checksum):
+            return True
 
         # Build Image with timeout
         timeout_seconds = config.DOCKER_BUILD_TIMEOUT
@@ -358,15 +596,70 @@ class NetworkController:
             if pending_ids:
                 time.sleep(0.5)
 
-    def _setup_topology(self,
-                        submission_id: str,
-                        external_config: dict,
-                        sidecars_config: list,
-                        custom_image: str = None):
-        # Build related Sidecars and Router
-        logger().debug(
-            f"(*_*)[In _setup_topology] Setting up topology {external_config}")
+    def _wait_for_services_ready(self, probes: Dict[str, Optional[Probe]]):
+        """
+        Wait until the services of running containers are ready. Containers
+        without a declared probe are checked through their image's
+        HEALTHCHECK or lowest exposed TCP port; SERVICE_STARTUP_DELAY is only
+        waited for when a container has nothing to probe, or when such an
+        inferred probe cannot run in the image or does not pass in time.
+        """
+        if not probes:
+            return
+        started = time.monotonic()
+        resolved, unprobed = {}, []
+        for cid, probe in probes.items():
+            if probe is None:
+                try:
+                    probe = Probe.from_container(
+                        self.client.inspect_container(cid),
+                        config.READINESS_INFERRED_TIMEOUT)
+                except Exception:
+                    probe = None
+            if probe is None:
+                unprobed.append(cid)
+            else:
+                resolved[cid] = probe
+
+        if resolved:
+            try:
+                ready_after = wait_until_ready(
+                    self.client,
+                    resolved,
+                    default_timeout=config.READINESS_TIMEOUT,
+                    initial_interval=config.READINESS_POLL_INITIAL,
+                    max_interval=config.READINESS_POLL_MAX)
+            except ReadinessTimeout as e:
+                elapsed = time.monotonic() - started
+                for probe in e.pending.values():
+                    self._record_timing(self._readiness_stats, probe.kind,
+                                        elapsed, False)
+                raise RuntimeError(f"Network provisioning failed: {e}") from e
+            for cid, seconds in ready_after.items():
+                self._record_timing(self._readiness_stats, resolved[cid].kind,
+                                    seconds, True)
+            # optional probes that were given up on
+            for cid, probe in resolved.items():
+                if cid not in ready_after:
+                    self._record_timing(self._readiness_stats, probe.kind,
+                                        time.monotonic() - started, False)
+                    unprobed.append(cid)
+
+        if unprobed and config.SERVICE_STARTUP_DELAY > 0:
+            # probing above already counts towards the delay
+            remaining = config.SERVICE_STARTUP_DELAY - (time.monotonic() -
+                                                        started)
+            logger().info(
+                f"No usable probe for {[cid[:12] for cid in unprobed]}, "
+                f"waiting {max(remaining, 0):.1f}s for container services to be ready..."
+            )
+            if remaining > 0:
+                time.sleep(remaining)
+            for _ in unprobed:
+                self._record_timing(self._readiness_stats, READINESS_DELAY,
+                                    config.SERVICE_STARTUP_DELAY, True)
 
+    def _need_router(self, external_config: dict) -> bool:
         need_router = False
         if external_config:
             ip_rules = external_config.get("ip", [])
@@ -402,6 +695,18 @@ class NetworkController:
             logger().info(
                 f"(*_*)[Router Decision] need_router=False (no external_config)"
             )
+        return need_router
+
+    def _setup_topology(self,
+                        submission_id: str,
+                        external_config: dict,
+                        sidecars_config: list,
+                        custom_image: str = None):
+        # Build related Sidecars and Router
+        logger().debug(
+            f"(*_*)[In _setup_topology] Setting up topology {external_config}")
+
+        need_router = self._need_router(external_config)
 
         has_sidecars = sidecars_config and len(sidecars_config) > 0
         has_custom = custom_image and len(custom_image) > 0
@@ -426,6 +731,8 @@ class NetworkController:
 
         try:
             containers_to_wait = []
+            # container id -> declared readiness probe (None: use defaults)
+            probes: Dict[str, Optional[Probe]] = {}
             net_name = f"noj-net-{submission_id}"
 
             # Cleanup existing network if any
@@ -443,24 +750,20 @@ class NetworkController:
                     f"(*_*)[In _setup_topology] Setting up mixed topology with router and sidecars for submission {submission_id}"
                 )
 
-                net_id = self.client.create_network(net_name,
-                                                    driver="bridge")["Id"]
+                net_id = self.client.create_network(
+                    net_name,
+                    driver="bridge",
+                    labels=docker_labels.labels(submission_id,
+                                                docker_labels.ROLE_NETWORK),
+                )["Id"]
                 resource_record["net_ids"].append(net_id)
 
-                internal_ids = []
-
-                # Start Sidecars
-                if sidecars_config:
-                    sc_ids = self._start_sidecars(submission_id,
-                                                  sidecars_config, net_name)
-                    internal_ids.extend(sc_ids)
-                # Start Custom Envs
-                if custom_image:
-                    ce_ids = self._start_custom_envs(submission_id,
-                                                     custom_image, net_name)
-                    internal_ids.extend(ce_ids)
-
-                resource_record["container_ids"].extend(internal_ids)
+                # Start Sidecars and Custom Envs
+                internal_ids = self._start_internal_containers(
+                    submission_id, sidecars_config, custom_image, net_name,
+                    resource_record)
+                probes.update(
+                    self._declared_probes(internal_ids, sidecars_config))
 
                 # FIX: Wait for internal containers to be running BEFORE collecting IPs
                 # This fixes the race condition where IPs may be empty if collected too early
@@ -510,7 +813,8 @@ class NetworkController:
                 containers_to_wait.append(router_id)
                 resource_record["mode"] = f"container:{router_id}"
                 # Wait for router entrypoint to complete firewall setup
-                time.sleep(20)
+                probes[router_id] = Probe.exec(
+                    ["test", "-f", ROUTER_READY_FILE])
 
             # case 2: Router
             elif need_router:
@@ -522,7 +826,8 @@ class NetworkController:
                 resource_record["mode"] = f"container:{router_id}"
                 containers_to_wait.append(router_id)
                 # Wait for router entrypoint to complete firewall setup
-                time.sleep(20)
+                probes[router_id] = Probe.exec(
+                    ["test", "-f", ROUTER_READY_FILE])
 
             # Case 3: Sidecar Only (no router needed)
             elif need_internal:
@@ -541,36 +846,30 @@ class NetworkController:
                     f"(*_*)[Sidecar Only] model={model}, internal={is_internal}"
                 )
 
-                net_id = self.client.create_network(net_name,
-                                                    driver="bridge",
-                                                    internal=is_internal)["Id"]
+                net_id = self.client.create_network(
+                    net_name,
+                    driver="bridge",
+                    internal=is_internal,
+                    labels=docker_labels.labels(submission_id,
+                                                docker_labels.ROLE_NETWORK),
+                )["Id"]
                 resource_record["net_ids"].append(net_id)
 
-                # Start Sidecars
-                if sidecars_config:
-                    sc_ids = self._start_sidecars(submission_id,
-                                                  sidecars_config, net_name)
-                    resource_record["container_ids"].extend(sc_ids)
-                    containers_to_wait.extend(sc_ids)
-                # Start Custom Envs
-                if custom_image:
-                    ce_ids = self._start_custom_envs(submission_id,
-                                                     custom_image, net_name)
-                    resource_record["container_ids"].extend(ce_ids)
-                    containers_to_wait.extend(ce_ids)
+                # Start Sidecars and Custom Envs
+                internal_ids = self._start_internal_containers(
+                    submission_id, sidecars_config, custom_image, net_name,
+                    resource_record)
+                containers_to_wait.extend(internal_ids)
+                probes.update(
+                    self._declared_probes(internal_ids, sidecars_config))
 
                 resource_record["mode"] = net_name
 
             self._wait_for_containers_running(containers_to_wait)
 
             # Wait for container services (e.g., HTTP servers) to be ready
-            # This delay is applied after containers are in 'running' state
-            # but before student code starts executing
-            if containers_to_wait and config.SERVICE_STARTUP_DELAY > 0:
-                logger().info(
-                    f"Waiting {config.SERVICE_STARTUP_DELAY}s for container services to be ready..."
-                )
-                time.sleep(config.SERVICE_STARTUP_DELAY)
+            # before student code starts executing
+            self._wait_for_services_ready(probes)
 
             self.resources[submission_id] = resource_record
 
@@ -579,6 +878,73 @@ class NetworkController:
             self.cleanup(submission_id, temp_resource=resource_record)
             raise e
 
+    @staticmethod
+    def _declared_probes(internal_ids: List[str],
+                         sidecars_config: list) -> Dict[str, Optional[Probe]]:
+        # internal ids start with one container per sidecar, in config order
+        probes = {cid: None for cid in internal_ids}
+        for cid, sc in zip(internal_ids, sidecars_config or []):
+            probes[cid] = Probe.from_readiness(Sidecar(**sc).readiness)
+        return probes
+
+    def _start_internal_containers(self, submission_id: str,
+                                   sidecars_config: list,
+                                   custom_image: Optional[Dict[str, str]],
+                                   net_name: str,
+                                   resource_record: dict) -> List[str]:
+        """
+        Start sidecars and custom envs concurrently. Returns the container
+        ids, sidecars first, and records them in `resource_record`.
+        """
+        with ThreadPoolExecutor(max_workers=2,
+                                thread_name_prefix="net-start") as pool:
+            sc_future = (pool.submit(self._start_sidecars, submission_id,
+                                     sidecars_config, net_name)
+                         if sidecars_config else None)
+            ce_future = (pool.submit(self._start_custom_envs, submission_id,
+                                     custom_image, net_name)
+                         if custom_image else None)
+            ids = []
+            error = None
+            for future in (sc_future, ce_future):
+                if future is None:
+                    continue
+                try:
+                    ids.extend(future.result())
+                except Exception as exc:
+                    error = error or exc
+        resource_record["container_ids"].extend(ids)
+        if error is not None:
+            raise error
+        return ids
+
+    def _start_all(self, items: list, start_one: Callable) -> List[str]:
+        """
+        Run `start_one(item)` for every item concurrently (image pulls and
+        container starts are mostly waiting on dockerd). Returns the ids in
+        item order. If any start fails, the containers that did start are
+        removed before the first error is raised.
+        """
+        if len(items) <= 1:
+            return [start_one(item) for item in items]
+        with ThreadPoolExecutor(max_workers=len(items),
+                                thread_name_prefix="net-start") as pool:
+            futures = [pool.submit(start_one, item) for item in items]
+        ids, errors = [], []
+        for future in futures:
+            try:
+                ids.append(future.result())
+            except Exception as exc:
+                errors.append(exc)
+        if errors:
+            for cid in ids:
+                try:
+                    self.client.remove_container(cid, v=True, force=True)
+                except Exception:
+                    pass
+            raise errors[0]
+        return ids
+
     def _validate_image_registry(self, image: str) -> bool:
         """
         Validate that the image is from an allowed registry.
@@ -621,20 +987,19 @@ class NetworkController:
 
     def _start_sidecars(self, submission_id: str, configs: list,
                         net_name: str) -> List[str]:
-        ids = []
-
-        for idx, sc in enumerate(configs):
-            logger().debug(
-                f"(*_*)[In _start_sidecars] Starting sidecar {idx} for submission {submission_id} with config: {sc}"
-            )
-            sc_obj = Sidecar(**sc)
-
-            # Validate image registry
+        sidecars = [Sidecar(**sc) for sc in configs]
+        # Validate image registry before starting anything
+        for sc_obj in sidecars:
             if not self._validate_image_registry(sc_obj.image):
                 raise ImageRegistryError(
                     f"Image '{sc_obj.image}' is not from an allowed registry. "
                     f"Allowed registries: {config.ALLOWED_REGISTRIES}")
 
+        def start_one(item) -> str:
+            idx, sc_obj = item
+            logger().debug(
+                f"(*_*)[In _start_sidecars] Starting sidecar {idx} for submission {submission_id} with config: {sc_obj}"
+            )
             try:
                 self.client.inspect_image(sc_obj.image)
             except docker.errors.ImageNotFound:
@@ -659,30 +1024,33 @@ class NetworkController:
                 environment=sc_obj.env,
                 command=sc_obj.args,
                 name=f"sidecar-{submission_id}-{idx}",
+                labels=docker_labels.labels(submission_id,
+                                            docker_labels.ROLE_SIDECAR),
                 host_config=host_config,
                 networking_config=networking_config,
                 detach=True)
             cid = c.get("Id")
             self.client.start(cid)
-            ids.append(cid)
             logger().info(
                 f"Started sidecar '{sc_obj.name}' with resource limits: "
                 f"mem={config.SIDECAR_MEM_LIMIT}, cpu_quota={config.SIDECAR_CPU_QUOTA}, "
                 f"pids={config.SIDECAR_PIDS_LIMIT}")
-        return ids
+            return cid
+
+        return self._start_all(list(enumerate(sidecars)), start_one)
 
     def _start_custom_envs(self, submission_id: str, images_map: Dict[str,
                                                                       str],
                            net_name: str) -> List[str]:
-        ids = []
         if not images_map:
-            return ids
+            return []
 
         logger().debug(
             f"(*_*)[In _start_custom_envs] Starting custom environments for submission {submission_id} with images: {images_map}"
         )
 
-        for alias, image_tag in images_map.items():
+        def start_one(item) -> str:
+            alias, image_tag = item
             logger().info(
                 f"Starting custom env [{alias}] using image [{image_tag}]")
 
@@ -703,20 +1071,23 @@ class NetworkController:
                 c = self.client.create_container(
                     image=image_tag,
                     name=f"custom-{alias}-{submission_id}",
+                    labels=docker_labels.labels(submission_id,
+                                                docker_labels.ROLE_CUSTOM_ENV),
                     host_config=host_config,
                     networking_config=networking_config,
                     detach=True)
                 cid = c.get("Id")
                 self.client.start(cid)
-                ids.append(cid)
                 logger().info(
                     f"Started custom env '{alias}' with resource limits: "
                     f"mem={config.SIDECAR_MEM_LIMIT}, cpu_quota={config.SIDECAR_CPU_QUOTA}, "
                     f"pids={config.SIDECAR_PIDS_LIMIT}")
+                return cid
             except Exception as e:
                 logger().error(f"Failed to start custom env {alias}: {e}")
                 raise e
-        return ids
+
+        return self._start_all(list(images_map.items()), start_one)
 
     def _start_router(self, submission_id: str, config_data: dict) -> str:
         logger().debug(
@@ -730,6 +1101,8 @@ class NetworkController:
         container = self.client.create_container(
             image="noj-router",
             name=f"router-{submission_id}",
+            labels=docker_labels.labels(submission_id,
+                                        docker_labels.ROLE_ROUTER),
             host_config=host_config,
             detach=True)
 
@@ -787,6 +1160,12 @@ class NetworkController:
         )
         res = temp_resource or self.resources.pop(submission_id, {})
 
+        # Pooled topologies are reset in the background and kept for reuse
+        if temp_resource is None and res.get("pool_key"):
+            self._reset_executor.submit(self._recycle_topology, res)
+            self._reap_idle_topologies()
+            return
+
         # If Docker client is not initialized, skip cleanup operations
         if not self.client:
             logger().warning(
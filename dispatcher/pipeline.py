@@ -1,10 +1,13 @@
 import json
+import threading
+import time
 import requests as rq
 
 from .utils import (
     logger, )
 from .config import (
     BACKEND_API,
+    SA_RULES_TTL,
     SANDBOX_TOKEN,
     TESTDATA_ROOT,
 )
@@ -20,12 +23,11 @@ def handle_problem_response(resp: rq.Response):
         raise RuntimeError()
 
 
-# for static analysis
-def fetch_problem_rules(problem_id: int) -> dict:
+def _request_problem_rules(problem_id: int) -> dict:
     """
-    Fetch static analysis rules.json from backend server
+    Request rules.json from backend. A problem without rules yields {},
+    other failures raise.
     """
-
     logger().debug(f"fetch problem rules [problem_id: {problem_id}]")
     resp = rq.get(
         f"{BACKEND_API}/problem/{problem_id}/rules",
@@ -41,12 +43,66 @@ def fetch_problem_rules(problem_id: int) -> dict:
         logger().warning(
             f"Not found problem rules, [problem_id: {problem_id}]")
         return {}
+
+
+# for static analysis
+def fetch_problem_rules(problem_id: int) -> dict:
+    """
+    Fetch static analysis rules.json from backend server
+    """
+    try:
+        return _request_problem_rules(problem_id)
     except Exception as e:
         logger().error(
             f"Error during fetch problem rules, [problem_id: {problem_id}]")
         return {}
 
 
+# problem_id -> (fetched_at, rules)
+_rules_cache: dict[int, tuple[float, dict]] = {}
+_rules_cache_lock = threading.Lock()
+_rules_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def get_problem_rules(problem_id: int) -> dict:
+    """
+    Cached `fetch_problem_rules`. Rules are reused for SA_RULES_TTL seconds
+    or until `invalidate_problem_rules` is called for the problem. Failed
+    requests are not cached.
+    """
+    now = time.monotonic()
+    with _rules_cache_lock:
+        item = _rules_cache.get(problem_id)
+        if item is not None and now - item[0] < SA_RULES_TTL:
+            _rules_cache_stats["hits"] += 1
+            return item[1]
+        _rules_cache_stats["misses"] += 1
+    try:
+        rules = _request_problem_rules(problem_id)
+    except Exception:
+        logger().error(
+            f"Error during fetch problem rules, [problem_id: {problem_id}]")
+        return {}
+    with _rules_cache_lock:
+        _rules_cache[problem_id] = (now, rules)
+    return rules
+
+
+def invalidate_problem_rules(problem_id: int | None = None):
+    """Drop cached rules of one problem, or of every problem."""
+    with _rules_cache_lock:
+        if problem_id is None:
+            _rules_cache.clear()
+        else:
+            _rules_cache.pop(problem_id, None)
+        _rules_cache_stats["invalidations"] += 1
+
+
+def rules_cache_stats() -> dict:
+    with _rules_cache_lock:
+        return {"size": len(_rules_cache), **_rules_cache_stats}
+
+
 def _translate_legacy_network_schema(raw_config: dict) -> dict:
     """
     將舊格式 (firewallExtranet/connectWithLocal) 轉換為新格式 (external/sidecars/custom_env)。
@@ -0,0 +1,241 @@
+"""
+Readiness probes for network containers.
+
+A container in 'running' state is not necessarily serving yet: a MySQL
+sidecar needs seconds before it accepts connections, and the router still
+has to apply its firewall rules. Instead of sleeping a fixed delay, every
+container gets a probe that is polled with a growing interval until it
+passes or its time cap is reached:
+
+- tcp: a port accepts connections inside the container's network namespace
+- exec: a command run in the container exits 0
+- healthcheck: the image's Docker HEALTHCHECK reports "healthy"
+
+Probes inferred from the image (`Probe.from_container`) are optional: when
+the image lacks the tools to run them, or they do not pass in time, the
+caller falls back to the fixed startup delay instead of failing.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import docker
+
+from .utils import logger
+
+PROBE_TCP = "tcp"
+PROBE_EXEC = "exec"
+PROBE_HEALTHCHECK = "healthcheck"
+
+# connect to the port with whatever the image ships: busybox / netcat or
+# bash's /dev/tcp, exit 127 when it ships neither
+_TCP_CHECK = ("if command -v nc >/dev/null 2>&1; "
+              "then nc -z 127.0.0.1 {port} 2>/dev/null; "
+              "elif command -v bash >/dev/null 2>&1; "
+              "then bash -c '</dev/tcp/127.0.0.1/{port}' 2>/dev/null; "
+              "else exit 127; fi")
+# exit codes of a command that cannot run (not found / not executable)
+_UNAVAILABLE_EXIT_CODES = (126, 127)
+# bound (in seconds) of a single exec probe attempt
+EXEC_ATTEMPT_TIMEOUT = 5.0
+
+
+class ReadinessTimeout(RuntimeError):
+    """Raised when a container is not ready within its time cap."""
+
+    def __init__(self, message: str, pending: Dict[str, "Probe"]):
+        super().__init__(message)
+        self.pending = pending
+
+
+class ProbeUnavailable(RuntimeError):
+    """Raised when a probe command cannot run in the container."""
+
+
+@dataclass
+class Probe:
+    kind: str
+    command: List[str] = field(default_factory=list)
+    # seconds; None uses the caller's default cap
+    timeout: Optional[float] = None
+    # give up silently instead of failing when it cannot run or never
+    # passes, see `wait_until_ready`
+    optional: bool = False
+
+    @classmethod
+    def tcp(cls, port: int, timeout: Optional[float] = None) -> "Probe":
+        return cls(PROBE_TCP,
+                   ["sh", "-c", _TCP_CHECK.format(port=int(port))], timeout)
+
+    @classmethod
+    def exec(cls,
+             command: List[str],
+             timeout: Optional[float] = None) -> "Probe":
+        return cls(PROBE_EXEC, list(command), timeout)
+
+    @classmethod
+    def healthcheck(cls, timeout: Optional[float] = None) -> "Probe":
+        return cls(PROBE_HEALTHCHECK, [], timeout)
+
+    @classmethod
+    def from_readiness(cls, readiness) -> Optional["Probe"]:
+        """Probe declared by a sidecar (`meta.Readiness`), if any."""
+        if readiness is None:
+            return None
+        if readiness.command:
+            return cls.exec(readiness.command, readiness.timeout)
+        if readiness.tcpPort:
+            return cls.tcp(readiness.tcpPort, readiness.timeout)
+        return None
+
+    @classmethod
+    def from_container(cls,
+                       container_info: dict,
+                       timeout: Optional[float] = None) -> Optional["Probe"]:
+        """
+        Default probe for a container without a declared one: its image's
+        HEALTHCHECK if it has one, else the lowest exposed TCP port. The
+        probe is optional and capped at `timeout`.
+        """
+        container_config = container_info.get("Config") or {}
+        healthcheck = container_config.get("Healthcheck") or {}
+        test = healthcheck.get("Test")
+        probe = None
+        if isinstance(test, list) and test and test[0] != "NONE":
+            probe = cls.healthcheck(timeout)
+        ports = []
+        for spec in (container_config.get("ExposedPorts") or {}):
+            port, _, proto = spec.partition("/")
+            if proto in ("", "tcp") and port.isdigit():
+                ports.append(int(port))
+        if probe is None and ports:
+            probe = cls.tcp(min(ports), timeout)
+        if probe is not None:
+            probe.optional = True
+        return probe
+
+
+def run_exec(client, container_id: str, command: List[str],
+             timeout: float) -> Optional[int]:
+    """
+    Run `command` in the container and return its exit code, None if it is
+    still running after `timeout` seconds (it is left to finish there).
+    """
+    exec_id = client.exec_create(container_id,
+                                 command,
+                                 stdout=False,
+                                 stderr=False)["Id"]
+    # detached, exec_start would block for as long as the command runs
+    client.exec_start(exec_id, detach=True)
+    deadline = time.monotonic() + timeout
+    interval = 0.01
+    while True:
+        info = client.exec_inspect(exec_id)
+        if not info.get("Running"):
+            return info.get("ExitCode")
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(interval)
+        interval = min(interval * 2, 0.2)
+
+
+def probe_passes(client,
+                 container_id: str,
+                 probe: Probe,
+                 attempt_timeout: float = EXEC_ATTEMPT_TIMEOUT) -> bool:
+    """
+    Run `probe` once. An exec probe still running after `attempt_timeout`
+    seconds counts as not passing (it is left to finish in the container).
+
+    Raises RuntimeError if the container has stopped, ProbeUnavailable if
+    the probe command cannot run in it.
+    """
+    if probe.kind == PROBE_HEALTHCHECK:
+        state = client.inspect_container(container_id).get("State", {})
+        _raise_if_stopped(container_id, state)
+        return (state.get("Health") or {}).get("Status") == "healthy"
+    try:
+        exit_code = run_exec(client, container_id, probe.command,
+                             attempt_timeout)
+        if exit_code is None:
+            return False
+        if exit_code in _UNAVAILABLE_EXIT_CODES:
+            raise ProbeUnavailable(
+                f"probe {probe.command[:1]} cannot run in container "
+                f"{container_id[:12]} (exit code {exit_code})")
+        return exit_code == 0
+    except docker.errors.APIError:
+        # e.g. 409 when the container is not running (anymore)
+        state = client.inspect_container(container_id).get("State", {})
+        _raise_if_stopped(container_id, state)
+        return False
+
+
+def _raise_if_stopped(container_id: str, state: dict):
+    if state.get("Status") in ("exited", "dead"):
+        err = state.get("Error") or f"exit code {state.get('ExitCode')}"
+        raise RuntimeError(f"Container {container_id} crashed: {err}")
+
+
+def wait_until_ready(client,
+                     probes: Dict[str, Probe],
+                     default_timeout: float,
+                     initial_interval: float = 0.05,
+                     max_interval: float = 1.0) -> Dict[str, float]:
+    """
+    Poll every probe until all of them pass. The interval between rounds
+    doubles from `initial_interval` up to `max_interval`, so fast services
+    are picked up within tens of milliseconds without hammering slow ones.
+
+    Returns the seconds each container took to become ready. Optional
+    probes that cannot run or exceed their cap are dropped and missing from
+    the result. Raises ReadinessTimeout when a required probe exceeds its
+    cap (`probe.timeout` or `default_timeout`) or cannot run at all.
+    """
+    start = time.monotonic()
+    pending = dict(probes)
+    ready_after = {}
+    interval = initial_interval
+    while pending:
+        for cid, probe in list(pending.items()):
+            cap = probe.timeout or default_timeout
+            attempt_timeout = max(
+                0.0, min(EXEC_ATTEMPT_TIMEOUT,
+                         cap - (time.monotonic() - start)))
+            try:
+                passed = probe_passes(client, cid, probe, attempt_timeout)
+            except ProbeUnavailable as e:
+                if not probe.optional:
+                    raise ReadinessTimeout(str(e), {cid: probe}) from e
+                logger().info(f"{e}, not probing it")
+                del pending[cid]
+                continue
+            if passed:
+                ready_after[cid] = time.monotonic() - start
+                del pending[cid]
+                logger().info(f"Container {cid[:12]} ready after "
+                              f"{ready_after[cid]:.2f}s [{probe.kind}]")
+        if not pending:
+            break
+        elapsed = time.monotonic() - start
+        expired = {
+            cid: probe
+            for cid, probe in pending.items()
+            if elapsed >= (probe.timeout or default_timeout)
+        }
+        for cid, probe in list(expired.items()):
+            if probe.optional:
+                logger().info(f"Container {cid[:12]} not ready after "
+                              f"{elapsed:.1f}s [{probe.kind}], giving up")
+                del pending[cid]
+                del expired[cid]
+        if expired:
+            raise ReadinessTimeout(
+                f"Containers {[cid[:12] for cid in expired]} not ready "
+                f"after {elapsed:.1f}s", expired)
+        if not pending:
+            break
+        time.sleep(interval)
+        interval = min(interval * 2, max_interval)
+    return ready_after
@@ -0,0 +1,99 @@
+"""
+Cache of static analysis verdicts.
+
+Rejudges and identical resubmissions analyse the same sources against the
+same rules again. The verdict only depends on the analysed files, the
+language, the build strategy / accepted format and the rules JSON, so it is
+cached under a hash of those and reused without touching libclang.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from .static_analysis import _is_code_file
+
+
+def _source_root(submission_path: Path) -> Path:
+    # same lookup as StaticAnalyzer.analyze / run_static_analysis
+    src = submission_path / "src"
+    if (src / "common").exists():
+        return src / "common"
+    return src
+
+
+class StaticAnalysisCache:
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[bool, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(submission_path: Path, meta, rules_json: dict,
+                 is_zip_mode: bool) -> str:
+        digest = hashlib.sha256()
+        header = {
+            "language": int(meta.language),
+            "buildStrategy": int(meta.buildStrategy),
+            "zip": bool(is_zip_mode),
+            "rules": rules_json,
+        }
+        digest.update(json.dumps(header, sort_keys=True).encode())
+        root = _source_root(submission_path)
+        # only what SA reads; a speculative compile may be writing binaries
+        # and objects next to the sources meanwhile
+        inputs = (
+            p for p in root.rglob("*")
+            if p.is_file() and (_is_code_file(p) or p.name == "Makefile"))
+        for path in sorted(inputs):
+            digest.update(b"\0" + str(path.relative_to(root)).encode() + b"\0")
+            digest.update(path.read_bytes())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[tuple[bool, dict]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        success, payload = item
+        return success, copy.deepcopy(payload)
+
+    def put(self, key: str, success: bool, payload: Optional[dict],
+            submission_path: Path):
+        if self.max_entries <= 0 or payload is None:
+            return
+        # messages that mention the submission directory (e.g. missing
+        # main file) are specific to that submission
+        text = json.dumps(payload, default=str)
+        if str(submission_path.resolve()) in text or str(
+                submission_path) in text:
+            return
+        with self._lock:
+            self._entries[key] = (success, copy.deepcopy(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxSize": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,147 @@
+"""
+Process pool for static analysis.
+
+libclang parses and the AST visitors are CPU bound and hold the GIL, so they
+run in long-lived worker processes instead of the dispatcher process. Each
+worker serves one job at a time over a pipe. The calling thread waits for
+the answer with a deadline; a worker that misses it is killed and replaced,
+so one pathological submission can not pin a pool slot forever.
+"""
+
+import multiprocessing
+import threading
+from typing import Callable, Optional
+
+from .static_analysis import run_static_analysis
+from .utils import logger
+
+
+class StaticAnalysisTimeout(Exception):
+    """Raised when a static analysis job exceeds its deadline."""
+
+
+class StaticAnalysisWorkerError(Exception):
+    """Raised when a worker crashed or the job raised inside the worker."""
+
+
+def _worker_main(conn, func: Callable):
+    while True:
+        try:
+            kwargs = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if kwargs is None:
+            break
+        try:
+            conn.send(("ok", func(**kwargs)))
+        except Exception as exc:
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    conn.close()
+
+
+class _Worker:
+
+    def __init__(self, ctx, func: Callable):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, func),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.conn.close()
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class StaticAnalysisPool:
+
+    def __init__(
+        self,
+        workers: int,
+        timeout: float,
+        func: Callable = run_static_analysis,
+        mp_context: Optional[multiprocessing.context.BaseContext] = None,
+    ):
+        if workers < 1:
+            raise ValueError("static analysis pool needs at least one worker")
+        self.workers = workers
+        self.timeout = timeout
+        self._func = func
+        # spawn: the dispatcher process is multi-threaded
+        self._ctx = mp_context or multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(workers)
+        self._idle: list[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _acquire(self) -> _Worker:
+        self._slots.acquire()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        try:
+            # workers are started lazily, the first job pays the import cost
+            return _Worker(self._ctx, self._func)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, worker: _Worker, healthy: bool):
+        with self._lock:
+            keep = healthy and not self._closed
+            if keep:
+                self._idle.append(worker)
+        if not healthy:
+            worker.kill()
+        elif not keep:
+            worker.close()
+        self._slots.release()
+
+    def run(self, timeout: Optional[float] = None, **kwargs):
+        """
+        Run one job on a worker and block the calling thread until it
+        answers. Raises StaticAnalysisTimeout after `timeout` seconds.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._acquire()
+        healthy = False
+        try:
+            worker.conn.send(kwargs)
+            if not worker.conn.poll(timeout):
+                logger().warning(
+                    "static analysis worker timed out, killing it [pid=%s]",
+                    worker.process.pid,
+                )
+                raise StaticAnalysisTimeout(
+                    f"static analysis exceeded {timeout}s")
+            status, value = worker.conn.recv()
+            healthy = True
+        except (EOFError, BrokenPipeError, ConnectionResetError) as exc:
+            raise StaticAnalysisWorkerError(
+                f"static analysis worker died: {exc!r}") from exc
+        finally:
+            self._release(worker, healthy)
+        if status == "error":
+            raise StaticAnalysisWorkerError(value)
+        return value
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
@@ -0,0 +1,95 @@
+"""
+Built-in scoring policies.
+
+Most scoring scripts only give partial credit per case, apply a lateness
+penalty or add a bonus for fast runs. Problems can declare those in meta
+(`scoringPolicy`) instead of shipping a script; the policy is evaluated
+in the dispatcher on the payload a scorer would receive, without starting
+a scorer container. The result has the same shape as the output of
+`custom_scorer._parse_scorer_output`.
+
+Order of evaluation, each step on the score of the previous one:
+
+1. task scores, all-or-nothing per task or by the share of AC cases
+2. runtime bonus, `int(score * rate)` when the run time metric is below
+   `thresholdMs`
+3. late penalty, `int(score * min(max, days late * perDay))`
+
+The final score is clamped to 0..100.
+"""
+
+from typing import Dict
+
+from .meta import ScoringPolicy
+
+SECONDS_PER_DAY = 86400
+
+
+def _task_score(task: dict, partial_credit: bool) -> tuple[int, int]:
+    """Score of one task of the scoring payload and its AC case count."""
+    results = task.get("results") or []
+    accepted = sum(1 for case in results if case.get("status") == "AC")
+    case_count = task.get("caseCount") or len(results)
+    if not partial_credit:
+        return task.get("subtaskScore", 0), accepted
+    if case_count <= 0:
+        return 0, accepted
+    return int(task["taskScore"] * accepted / case_count), accepted
+
+
+def evaluate_scoring_policy(
+    policy: ScoringPolicy,
+    tasks: list,
+    stats: dict,
+    late_seconds: int,
+) -> Dict[str, object]:
+    """Score a submission from the `tasks` and `stats` of the scoring
+    payload. `late_seconds` < 0 means unknown and is not penalized."""
+    messages = []
+    task_scores = []
+    all_ac = True
+    for task in tasks:
+        score, accepted = _task_score(task, policy.partialCredit)
+        task_scores.append(score)
+        if accepted < task.get("caseCount", 0):
+            all_ac = False
+        messages.append(f"Task {task['taskIndex'] + 1}: "
+                        f"{accepted}/{task.get('caseCount', 0)} AC "
+                        f"-> {score}")
+    total = sum(task_scores)
+
+    bonus = 0
+    rule = policy.runtimeBonus
+    if rule is not None:
+        run_time = stats.get(rule.metric, 0)
+        eligible = all_ac or not rule.requireAllAC
+        if eligible and 0 < run_time < rule.thresholdMs:
+            bonus = int(total * rule.rate)
+            total += bonus
+            messages.append(f"Runtime bonus: {rule.metric}={run_time}ms "
+                            f"< {rule.thresholdMs}ms -> +{bonus}")
+
+    penalty = 0
+    rule = policy.latePenalty
+    if rule is not None and late_seconds > rule.graceSeconds:
+        days = late_seconds / SECONDS_PER_DAY
+        rate = min(rule.max, days * rule.perDay)
+        penalty = int(total * rate)
+        total -= penalty
+        messages.append(
+            f"Late penalty: {late_seconds}s ({days:.1f} days) -> -{penalty}")
+
+    total = max(0, min(100, total))
+    return {
+        "status": "OK",
+        "score": total,
+        "message": " | ".join(messages),
+        "breakdown": {
+            "taskScores": task_scores,
+            "runtimeBonus": bonus,
+            "latePenalty": penalty,
+            "finalScore": total,
+        },
+        "stdout": "",
+        "stderr": "",
+    }
@@ -1,8 +1,17 @@
 import subprocess, shlex
+import atexit
+import copy
+import functools
+import hashlib
 import pathlib
 import ast
 import json
 import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING, Tuple, Optional
 
 try:
@@ -18,12 +27,25 @@ from .result_factory import make_all_cases_result
 if TYPE_CHECKING:
     from .meta import Meta
 
+# payload status of an analysis that crashed instead of judging the
+# submission; such results are reported but never cached
+SA_SYSTEM_ERROR = "sys_err"
+
 # -----------------------------------------------------------------------------
 # Helpers
 # -----------------------------------------------------------------------------
 
 
 def detect_include_args():
+    """
+    Include flags for libclang. The compiler paths never change while the
+    process lives, so the two probing subprocesses run only once.
+    """
+    return list(_detect_include_args())
+
+
+@functools.lru_cache(maxsize=None)
+def _detect_include_args() -> tuple:
     args = []
     try:
         rdir = subprocess.check_output(["clang", "-print-resource-dir"],
@@ -35,11 +57,11 @@ def detect_include_args():
                                           text=True).strip()
         args += [f"-I{cxx_inc}"]
     except (subprocess.SubprocessError, FileNotFoundError):
-        return []
+        return ()
 
     # try these path
     args += ["-I/usr/include", "-I/usr/include/x86_64-linux-gnu"]
-    return args
+    return tuple(args)
 
 
 # -----------------------------------------------------------------------------
@@ -148,6 +170,222 @@ def _init_cpp_cursor_kind_map():
 # Initialize the map at module load time
 _init_cpp_cursor_kind_map()
 
+# -----------------------------------------------------------------------------
+# libclang fast path
+# -----------------------------------------------------------------------------
+_clang_local = threading.local()
+
+
+def _get_clang_index():
+    """One libclang index per thread, reused across analyses."""
+    index = getattr(_clang_local, "index", None)
+    if index is None:
+        index = clang.cindex.Index.create()
+        _clang_local.index = index
+    return index
+
+
+_LEADING_INCLUDE_RE = re.compile(r"^#\s*include\s*<([^>]+)>\s*(//.*)?$")
+
+
+def _leading_system_includes(path: pathlib.Path) -> tuple[str, ...]:
+    """
+    The `#include <...>` lines a file starts with, before any other code or
+    directive. A PCH built from exactly these lines is equivalent to parsing
+    them in place.
+    """
+    headers = []
+    in_comment = False
+    for raw in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+        line = raw.strip()
+        if in_comment:
+            if "*/" in line:
+                in_comment = False
+                line = line.split("*/", 1)[1].strip()
+            else:
+                continue
+        if line.startswith("/*") and "*/" not in line:
+            in_comment = True
+            continue
+        if not line or line.startswith("//"):
+            continue
+        match = _LEADING_INCLUDE_RE.match(line)
+        if match is None:
+            break
+        headers.append(match.group(1))
+    return tuple(headers)
+
+
+class _PchCache:
+    """
+    Precompiled headers for the standard header sets C++ submissions start
+    with (mostly just `<bits/stdc++.h>`). Built once per process with
+    function bodies skipped, since SA never looks inside system headers.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dir = None
+
+    def _workdir(self) -> pathlib.Path:
+        if self._dir is None:
+            self._dir = pathlib.Path(tempfile.mkdtemp(prefix="noj-sa-pch-"))
+            atexit.register(shutil.rmtree, self._dir, True)
+        return self._dir
+
+    def get(self, headers: tuple[str, ...], lang_args: list[str],
+            include_args: list[str]) -> Optional[str]:
+        key = (headers, tuple(lang_args), tuple(include_args))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            pch = self._build(key)
+            self._entries[key] = pch
+            while len(self._entries) > self.max_entries:
+                _, old = self._entries.popitem(last=False)
+                if old:
+                    pathlib.Path(old).unlink(missing_ok=True)
+            return pch
+
+    def _build(self, key: tuple) -> Optional[str]:
+        headers, lang_args, include_args = key
+        workdir = self._workdir()
+        name = f"pch-{len(self._entries)}-{abs(hash(key))}"
+        header_path = workdir / f"{name}.hpp"
+        header_path.write_text("".join(f"#include <{h}>\n" for h in headers))
+        header_args = [
+            "c++-header" if arg == "c++" else arg for arg in lang_args
+        ]
+        try:
+            tu = _get_clang_index().parse(
+                str(header_path),
+                args=header_args + list(include_args),
+                options=(
+                    clang.cindex.TranslationUnit.PARSE_INCOMPLETE
+                    | clang.cindex.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES),
+            )
+            errors = [
+                d for d in tu.diagnostics
+                if d.severity >= clang.cindex.Diagnostic.Error
+            ]
+            if errors:
+                # e.g. a missing clang resource dir; parsing from source
+                # stops at the same error, a PCH would silently differ
+                logger().warning(
+                    f"not using PCH for {headers}: {errors[0].spelling}")
+                return None
+            pch_path = workdir / f"{name}.pch"
+            tu.save(str(pch_path))
+        except Exception as exc:
+            logger().warning(f"failed to build PCH for {headers}: {exc}")
+            return None
+        logger().debug(f"built PCH for {headers}")
+        return str(pch_path)
+
+
+_PCH_CACHE = _PchCache()
+
+
+def _pch_args(target_path: pathlib.Path, language: Language,
+              lang_args: list[str], include_args: list[str]) -> list[str]:
+    if language != Language.CPP or not dispatcher_config.SA_CLANG_PCH:
+        return []
+    headers = _leading_system_includes(target_path)
+    if not headers:
+        return []
+    pch = _PCH_CACHE.get(headers, lang_args, include_args)
+    return ["-include-pch", pch] if pch else []
+
+
+# -----------------------------------------------------------------------------
+# Per-file C/C++ facts
+# -----------------------------------------------------------------------------
+_LOCAL_HEADER_EXTS = {".h", ".hh", ".hpp", ".hxx", ".inc"}
+
+
+def _local_headers_digest(source_path: pathlib.Path) -> str:
+    """
+    Digest of every header in the project. A translation unit's facts only
+    depend on its own text and the headers it pulls in, so a header change
+    conservatively invalidates every file of the project.
+    """
+    digest = hashlib.sha256()
+    headers = sorted(p for p in source_path.rglob("*")
+                     if p.is_file() and p.suffix.lower() in _LOCAL_HEADER_EXTS)
+    for path in headers:
+        digest.update(str(path.relative_to(source_path)).encode() + b"\0")
+        digest.update(path.read_bytes() + b"\0")
+    return digest.hexdigest()
+
+
+class _FileFactCache:
+    """
+    LRU of the facts of single C/C++ files, so a resubmitted project only
+    re-parses the translation units that changed.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(target_path: pathlib.Path, args: list[str],
+                 headers_digest: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(
+            json.dumps([target_path.name, args, headers_digest]).encode())
+        digest.update(target_path.read_bytes())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            facts = self._entries.get(key)
+            if facts is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(facts)
+
+    def put(self, key: str, facts: dict):
+        max_entries = dispatcher_config.SA_FILE_CACHE_SIZE
+        if max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = copy.deepcopy(facts)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+_FILE_FACT_CACHE = _FileFactCache()
+
+
+def _cpp_file_facts(target_path: pathlib.Path,
+                    args: list[str]) -> Optional[dict]:
+    """Parse and walk one translation unit, None if clang gave up on it."""
+    translation_unit = _get_clang_index().parse(
+        str(target_path),
+        args=args,
+        options=clang.cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD,
+    )
+    if not translation_unit:
+        return None
+    visitor = CppAstVisitor(str(target_path), file_name=target_path.name)
+    visitor.visit(translation_unit.cursor)
+    visitor.detect_cycles()
+    return visitor.facts
+
 
 def _allowed_ext_for_language(language: Language) -> set[str]:
     if language == Language.C:
@@ -169,10 +407,8 @@ def _collect_sources_by_ext(source_dir: pathlib.Path,
     Collect source files based on language extension.
     """
     allowed_ext = _allowed_ext_for_language(language)
-    return [
-        p for p in source_dir.rglob("*")
-        if p.is_file() and p.suffix.lower() in allowed_ext
-    ]
+    return sorted(p for p in source_dir.rglob("*")
+                  if p.is_file() and p.suffix.lower() in allowed_ext)
 
 
 def _collect_sources_from_makefile(source_dir: pathlib.Path,
@@ -204,7 +440,8 @@ def _collect_sources_from_makefile(source_dir: pathlib.Path,
             continue
         if p.exists() and p.is_file() and p.suffix.lower() in allowed_ext:
             sources.append(p)
-    return sources
+    # candidates come out of a set, keep the merge order stable
+    return sorted(sources)
 
 
 def _merge_facts(target: dict, source: dict):
@@ -216,6 +453,79 @@ def _merge_facts(target: dict, source: dict):
             target[k].extend(v)
 
 
+# -----------------------------------------------------------------------------
+# Rule matching
+# -----------------------------------------------------------------------------
+def _is_rule_pattern(rule) -> bool:
+    # `operator*` and friends are C++ function names, not wildcards
+    return (isinstance(rule, str) and ("*" in rule or "?" in rule)
+            and not rule.startswith("operator"))
+
+
+class RuleMatcher:
+    """
+    One rule list of a problem (e.g. the banned functions) indexed for
+    lookups: a name matches when it, or one of its dotted suffixes
+    (`os.path.join` -> `path.join`, `join`), is listed. Entries with `*` or
+    `?` are glob patterns matched the same way.
+    """
+
+    __slots__ = ("exact", "pattern")
+
+    def __init__(self, rule_items):
+        self.exact = frozenset(r for r in rule_items
+                               if not _is_rule_pattern(r))
+        globs = [
+            re.escape(r).replace(r"\*", ".*").replace(r"\?", ".")
+            for r in rule_items if _is_rule_pattern(r)
+        ]
+        self.pattern = (re.compile(r"(?:.*\.)?(?:" + "|".join(globs) +
+                                   ")", re.DOTALL) if globs else None)
+
+    def matches(self, name: str) -> bool:
+        exact = self.exact
+        if name in exact:
+            return True
+        dot = name.find(".")
+        while dot != -1:
+            if name[dot + 1:] in exact:
+                return True
+            dot = name.find(".", dot + 1)
+        return self.pattern is not None and self.pattern.fullmatch(
+            name) is not None
+
+
+class CompiledRules:
+    """A problem's rules JSON with every rule list turned into a matcher."""
+
+    __slots__ = ("model", "imports", "headers", "functions", "syntax")
+
+    def __init__(self, rules: dict):
+        self.model = rules.get("model", "black")
+        self.imports = RuleMatcher(rules.get("imports", []))
+        self.headers = RuleMatcher(rules.get("headers", []))
+        self.functions = RuleMatcher(rules.get("functions", []))
+        self.syntax = RuleMatcher(rules.get("syntax", []))
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_rules_json(rules_json: str) -> CompiledRules:
+    return CompiledRules(json.loads(rules_json))
+
+
+def compile_rules(rules: dict) -> CompiledRules:
+    """
+    Compile a problem's rules once per process. Rules arrive as plain JSON
+    (they cross into the SA worker processes), so the cache is keyed by
+    their canonical encoding.
+    """
+    try:
+        key = json.dumps(rules, sort_keys=True)
+    except TypeError:
+        return CompiledRules(rules)
+    return _compile_rules_json(key)
+
+
 def _build_sa_report_text(analysis_result) -> str:
     report = analysis_result.message.strip()
     if analysis_result.json_result:
@@ -322,6 +632,12 @@ def run_static_analysis(
         stderr = format_sa_failure_message(analysis_result.message)
         return False, payload, build_sa_ae_task_content(meta, stderr)
 
+    except StaticAnalysisSystemError as exc:
+        logger().error(f"Static analyzer system error: {exc}", exc_info=True)
+        ar = AnalysisResult(success=False, message=str(exc))
+        payload = build_sa_payload(ar, SA_SYSTEM_ERROR)
+        stderr = format_sa_failure_message(str(exc))
+        return False, payload, build_sa_ae_task_content(meta, stderr)
     except StaticAnalysisError as exc:
         logger().error(f"Static analyzer error: {exc}", exc_info=True)
         ar = AnalysisResult(success=False, message=str(exc))
@@ -332,7 +648,7 @@ def run_static_analysis(
         logger().error(f"Unexpected error during static analysis: {exc}",
                        exc_info=True)
         ar = AnalysisResult(success=False, message=str(exc))
-        payload = build_sa_payload(ar, "fail")
+        payload = build_sa_payload(ar, SA_SYSTEM_ERROR)
         stderr = format_sa_failure_message(str(exc))
         return False, payload, build_sa_ae_task_content(meta, stderr)
 
@@ -341,6 +657,11 @@ class StaticAnalysisError(Exception):
     pass
 
 
+class StaticAnalysisSystemError(StaticAnalysisError):
+    """The analysis did not complete for a reason unrelated to the
+    submission, its result must not be cached."""
+
+
 class AnalysisResult:
 
     def __init__(self,
@@ -458,7 +779,7 @@ class StaticAnalyzer:
 
         except Exception as e:
             logger().error(f"An unexpected error occurred: {e}", exc_info=True)
-            raise StaticAnalysisError(
+            raise StaticAnalysisSystemError(
                 f"An unexpected error occurred: {e}") from e
 
         if self.result.is_success():
@@ -621,7 +942,8 @@ class StaticAnalyzer:
 
         # Setup Clang Index
         try:
-            index = clang.cindex.Index.create()
+            # surface a broken libclang install before touching any file
+            _get_clang_index()
             lang_args = []
             if language == Language.C:
                 lang_args = ["-x", "c", "-std=c11"]
@@ -630,28 +952,50 @@ class StaticAnalyzer:
 
             include_args = detect_include_args()
         except clang.cindex.LibclangError as e:
-            raise StaticAnalysisError(f"Libclang init failed: {e}")
+            raise StaticAnalysisSystemError(f"Libclang init failed: {e}")
 
-        # analyze each file
+        # analyze each file, unchanged files come from the fact cache and
+        # the rest are parsed in parallel (libclang releases the GIL)
+        headers_digest = _local_headers_digest(source_path)
+        per_file = {}
+        pending = []
         for target_path in target_paths:
-            translation_unit = index.parse(
-                str(target_path),
-                args=lang_args + include_args,
-                options=clang.cindex.TranslationUnit.
-                PARSE_DETAILED_PROCESSING_RECORD,
-            )
-            if not translation_unit:
+            args = lang_args + include_args
+            key = _FILE_FACT_CACHE.make_key(target_path, args, headers_digest)
+            cached = _FILE_FACT_CACHE.get(key)
+            if cached is not None:
+                per_file[target_path] = cached
+                continue
+            args = args + _pch_args(target_path, language, lang_args,
+                                    include_args)
+            pending.append((target_path, key, args))
+
+        workers = min(dispatcher_config.SA_FILE_WORKERS, len(pending))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers,
+                                    thread_name_prefix="sa-file") as pool:
+                results = list(
+                    pool.map(lambda item: _cpp_file_facts(item[0], item[2]),
+                             pending))
+        else:
+            results = [
+                _cpp_file_facts(path, args) for path, _, args in pending
+            ]
+        for (target_path, key, _), file_facts in zip(pending, results):
+            if file_facts is not None:
+                _FILE_FACT_CACHE.put(key, file_facts)
+            per_file[target_path] = file_facts
+
+        # merge in input order so reports do not depend on scheduling
+        for target_path in target_paths:
+            file_facts = per_file[target_path]
+            if file_facts is None:
                 self.result._success = False
                 self.result.message += (
                     f"[Syntax Error] Clang could not analyze {target_path.name}"
                 )
                 return self.result
-
-            file_name = target_path.name
-            visitor = CppAstVisitor(str(target_path), file_name=file_name)
-            visitor.visit(translation_unit.cursor)
-            visitor.detect_cycles()
-            _merge_facts(facts, visitor.facts)
+            _merge_facts(facts, file_facts)
         logger().debug(f"C/C++ analysis facts: {facts}")
 
         violations_dict = self.get_violations(facts, rules, language)
@@ -675,7 +1019,8 @@ class StaticAnalyzer:
             "functions": [...]
         }
         """
-        model = rules.get("model", "black")
+        compiled = compile_rules(rules)
+        model = compiled.model
         violations_structure = {
             "model": model,
             "syntax": [],
@@ -686,19 +1031,19 @@ class StaticAnalyzer:
         # import / header check
         if language == Language.PY:
             violations_structure["imports"] = self._check_items(
-                facts.get("imports", []), rules.get("imports", []), model)
+                facts.get("imports", []), compiled.imports, model)
             del violations_structure["headers"]
         else:
             violations_structure["headers"] = self._check_items(
-                facts.get("headers", []), rules.get("headers", []), model)
+                facts.get("headers", []), compiled.headers, model)
             del violations_structure["imports"]
 
         # function call check
         violations_structure["functions"] = self._check_items(
-            facts.get("function_calls", []), rules.get("functions", []), model)
+            facts.get("function_calls", []), compiled.functions, model)
         # syntax check
         violations_structure["syntax"] = self._check_items(
-            facts.get("syntax", []), rules.get("syntax", []), model)
+            facts.get("syntax", []), compiled.syntax, model)
 
         has_violations = False
         for key, items in violations_structure.items():
@@ -711,61 +1056,41 @@ class StaticAnalyzer:
             return {}
         return violations_structure
 
-    def _check_items(self, used_items: list, rule_items: list,
+    def _check_items(self, used_items: list, matcher: "RuleMatcher | list",
                      model: str) -> list:
         """
         used_items: [{"name": "sort", "line": 10}, ...]
-        rule_items: ["sort", "vector"]
+        matcher: RuleMatcher (or a raw rule list such as ["sort", "vector"])
         return: [{"content": "sort", "line": 10}, ...]
         """
-        violations = []
-        rule_set = set(rule_items)
+        if not isinstance(matcher, RuleMatcher):
+            matcher = RuleMatcher(matcher)
+        if model == "black":
+            flag_matched = True
+        elif model == "white":
+            flag_matched = False
+        else:
+            return []
 
+        violations = []
+        seen = set()
         for item in used_items:
             name = item["name"]
             lineno = item["line"]
-            is_violation = False
-
-            if model == "black":
-                if name in rule_set:
-                    is_violation = True
-                else:
-                    for rule in rule_set:
-                        if name.endswith("." + rule):
-                            is_violation = True
-                            break
-
-            elif model == "white":
-                is_allowed = False
-                if name in rule_set:
-                    is_allowed = True
-                else:
-                    for rule in rule_set:
-                        if name.endswith("." + rule):
-                            is_allowed = True
-                            break
-
-                if not is_allowed:
-                    is_violation = True
-
-            if is_violation:
-                file_name = item.get("file", "")
-                violations.append({
-                    "content": name,
-                    "line": lineno,
-                    "file": file_name
-                })
-
-        # Deduplicate results by line and content
-        unique_violations = []
-        seen = set()
-        for v in violations:
-            key = (v["content"], v["line"])
-            if key not in seen:
-                seen.add(key)
-                unique_violations.append(v)
+            if matcher.matches(name) != flag_matched:
+                continue
+            # Deduplicate results by line and content
+            key = (name, lineno)
+            if key in seen:
+                continue
+            seen.add(key)
+            violations.append({
+                "content": name,
+                "line": lineno,
+                "file": item.get("file", ""),
+            })
 
-        return sorted(unique_violations, key=lambda x: x["line"])
+        return sorted(violations, key=lambda x: x["line"])
 
 
 class DefinitionVisitor(ast.NodeVisitor):
@@ -986,6 +1311,10 @@ class CppAstVisitor:
 
         in_main = (node.location and node.location.file
                    and str(node.location.file) == self.main_file_path)
+        # nothing below a cursor from another file (e.g. the thousands of
+        # declarations of <bits/stdc++.h>) is ever recorded
+        if node.location and node.location.file and not in_main:
+            return
 
         if node_kind in (
                 clang.cindex.CursorKind.FUNCTION_DECL,
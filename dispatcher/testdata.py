@@ -3,19 +3,29 @@ import json
 import secrets
 import shutil
 import hashlib
+import threading
+import time
 from pathlib import Path
 from zipfile import ZipFile
 import requests as rq
 
 from .constant import AcceptedFormat, BuildStrategy, ExecutionMode, Language
 from .meta import Meta
-from .file_manager import _safe_extract_zip
-from .utils import (
-    get_redis_client,
-    logger,
+from .cache_manager import (
+    AC_CODE_KIND,
+    BUILD_KINDS,
+    PUBLIC_KIND,
+    TESTDATA_KIND,
+    TRIAL_KIND,
+    get_cache_manager,
 )
+from .file_manager import _safe_extract_zip
+from .pipeline import invalidate_problem_rules
+from .coordination import get_coordination_backend
+from .utils import logger
 from .config import (
     BACKEND_API,
+    CHECKER_API_KEY_TTL,
     SANDBOX_TOKEN,
     TESTDATA_ROOT,
 )
@@ -147,7 +157,7 @@ def ensure_testdata(problem_id: int):
     """
     Ensure the testdata of problem is up to date
     """
-    client = get_redis_client()
+    client = get_coordination_backend()
     key = f"problem-{problem_id}-checksum"
     lock_key = f"{key}-lock"
     with client.lock(lock_key, timeout=60):
@@ -159,13 +169,15 @@ def ensure_testdata(problem_id: int):
                 logger().debug(
                     f"problem testdata is up to date [problem_id: {problem_id}]"
                 )
+                get_cache_manager().touch(problem_id, TESTDATA_KIND,
+                                          get_problem_root(problem_id))
                 return
         logger().info(f"refresh problem testdata [problem_id: {problem_id}]")
         testdata = fetch_testdata(problem_id)
         problem_root = get_problem_root(problem_id)
         if problem_root.exists():
             for child in problem_root.iterdir():
-                if child.name == "public":
+                if child.name == PUBLIC_KIND or child.name in BUILD_KINDS:
                     continue
                 if child.is_dir():
                     shutil.rmtree(child)
@@ -176,8 +188,15 @@ def ensure_testdata(problem_id: int):
         with ZipFile(io.BytesIO(testdata)) as zf:
             _safe_extract_zip(zf, problem_root)
         meta = fetch_problem_meta(problem_id)
+        # the problem changed, its SA rules may have changed with it
+        invalidate_problem_rules(problem_id)
+        invalidate_checker_api_key(problem_id)
         checksum = calc_checksum(testdata + meta.encode())
         client.setex(key, 600, checksum)
+        get_cache_manager().touch(problem_id,
+                                  TESTDATA_KIND,
+                                  problem_root,
+                                  refreshed=True)
 
 
 # === Trial Submission Support ===
@@ -228,7 +247,7 @@ def ensure_public_testdata(problem_id: int):
     Ensure public test data for Trial Mode is up to date.
     Similar to ensure_testdata() but for public cases.
     """
-    client = get_redis_client()
+    client = get_coordination_backend()
     key = f"problem-{problem_id}-public-checksum"
     lock_key = f"{key}-lock"
     with client.lock(lock_key, timeout=60):
@@ -242,6 +261,9 @@ def ensure_public_testdata(problem_id: int):
                     logger().debug(
                         f"public testdata is up to date [problem_id: {problem_id}]"
                     )
+                    get_cache_manager().touch(
+                        problem_id, PUBLIC_KIND,
+                        get_public_testdata_root(problem_id))
                     return
             except Exception as exc:
                 logger().warning(
@@ -257,6 +279,10 @@ def ensure_public_testdata(problem_id: int):
             _safe_extract_zip(zf, public_root)
         checksum = calc_checksum(testdata)
         client.setex(key, 600, checksum)
+        get_cache_manager().touch(problem_id,
+                                  PUBLIC_KIND,
+                                  public_root,
+                                  refreshed=True)
 
 
 def scan_and_generate_tasks(testdata_path: Path, base_time_limit: int,
@@ -317,6 +343,7 @@ def scan_and_generate_tasks(testdata_path: Path, base_time_limit: int,
 def cleanup_custom_testdata(submission_id: str):
     """Remove custom test data directory after judging is complete."""
     custom_dir = get_custom_testdata_root(submission_id)
+    get_cache_manager().forget(TRIAL_KIND, submission_id)
     if custom_dir.exists():
         try:
             shutil.rmtree(custom_dir)
@@ -441,6 +468,17 @@ def _normalize_ac_code_filename(ac_code_root: Path, language: int) -> None:
     source_file.rename(expected_path)
 
 
+def read_ac_code_checksum(ac_code_root: Path) -> str | None:
+    """
+    Checksum of the AC code extracted in `ac_code_root`, None if it was
+    extracted before checksums were recorded.
+    """
+    try:
+        return (ac_code_root / ".checksum").read_text().strip() or None
+    except OSError:
+        return None
+
+
 def ensure_ac_code(problem_id: int) -> tuple:
     """
     Ensure AC code for Trial Mode is up to date.
@@ -448,7 +486,7 @@ def ensure_ac_code(problem_id: int) -> tuple:
     Returns:
         Tuple of (ac_code_path, language_int)
     """
-    client = get_redis_client()
+    client = get_coordination_backend()
     key = f"problem-{problem_id}-ac-code-checksum"
     lock_key = f"{key}-lock"
 
@@ -471,6 +509,8 @@ def ensure_ac_code(problem_id: int) -> tuple:
                     # Ensure filename is normalized even for cached files
                     if language is not None:
                         _normalize_ac_code_filename(ac_code_root, language)
+                    get_cache_manager().touch(problem_id, AC_CODE_KIND,
+                                              ac_code_root)
                     return ac_code_root, language
             except Exception as exc:
                 logger().warning(f"Failed to verify AC code checksum: {exc}")
@@ -494,7 +534,13 @@ def ensure_ac_code(problem_id: int) -> tuple:
             (ac_code_root / ".language").write_text(str(language))
 
         checksum = calc_checksum(ac_code_content)
+        # keys the compiled AC code cache, see dispatcher/ac_code.py
+        (ac_code_root / ".checksum").write_text(checksum)
         client.setex(key, 600, checksum)
+        get_cache_manager().touch(problem_id,
+                                  AC_CODE_KIND,
+                                  ac_code_root,
+                                  refreshed=True)
 
         return ac_code_root, language
 
@@ -533,3 +579,44 @@ def fetch_checker_api_key(problem_id: int) -> str | None:
     except Exception as exc:
         logger().warning(f"Exception fetching checker API key: {exc}")
         return None
+
+
+# problem_id -> (fetched_at, api key)
+_checker_key_cache: dict[int, tuple[float, str]] = {}
+_checker_key_lock = threading.Lock()
+_checker_key_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def get_checker_api_key(problem_id: int) -> str | None:
+    """
+    Cached `fetch_checker_api_key`. A key is reused for CHECKER_API_KEY_TTL
+    seconds or until `invalidate_checker_api_key` is called for the
+    problem. Missing keys and failed requests are not cached.
+    """
+    now = time.monotonic()
+    with _checker_key_lock:
+        item = _checker_key_cache.get(problem_id)
+        if item is not None and now - item[0] < CHECKER_API_KEY_TTL:
+            _checker_key_stats["hits"] += 1
+            return item[1]
+        _checker_key_stats["misses"] += 1
+    api_key = fetch_checker_api_key(problem_id)
+    if api_key:
+        with _checker_key_lock:
+            _checker_key_cache[problem_id] = (now, api_key)
+    return api_key
+
+
+def invalidate_checker_api_key(problem_id: int | None = None):
+    """Drop the cached key of one problem, or of every problem."""
+    with _checker_key_lock:
+        if problem_id is None:
+            _checker_key_cache.clear()
+        else:
+            _checker_key_cache.pop(problem_id, None)
+        _checker_key_stats["invalidations"] += 1
+
+
+def checker_api_key_cache_stats() -> dict:
+    with _checker_key_lock:
+        return {"size": len(_checker_key_cache), **_checker_key_stats}
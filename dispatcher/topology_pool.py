@@ -0,0 +1,115 @@
+"""
+Pool of network topologies reused across submissions.
+
+Submissions of the same network problem all get the same bridge network,
+router and sidecars. Creating and tearing them down per submission costs
+seconds of Docker work each time, so when TOPOLOGY_POOL_SIZE > 0 a released
+topology is reset and parked here under a key of its normalised network
+config (external rules, sidecars, custom env images), and the next
+submission with the same key leases it instead of building a new one.
+
+Reset semantics:
+
+- A topology is only pooled if every sidecar declares a `reset` command
+  and every custom env has one in the custom env config (`reset`, alias ->
+  command). The command runs in the container after each lease and must
+  return the service to its initial state (e.g. drop and reload the
+  database) and exit 0 once it serves again. Restarting the container is
+  not enough, as files written to it survive a restart, so sidecars
+  without a reset hook are never reused.
+- The router is restarted, which makes its entrypoint flush and re-apply
+  the firewall rules and restart dnsmasq (dropping its DNS cache), and is
+  waited for through its readiness marker.
+- A topology whose reset fails is torn down instead of pooled.
+
+At most TOPOLOGY_POOL_SIZE idle topologies are kept (the least recently
+released one is evicted first) and topologies idle for longer than
+TOPOLOGY_POOL_IDLE_SECONDS are torn down; expiry is checked whenever the
+pool is used.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+
+def topology_key(external_config: dict, sidecars_config: list,
+                 custom_images: Optional[dict]) -> str:
+    """
+    `custom_images` maps alias -> image id, so rebuilt custom envs (same
+    tag, new image) do not reuse old containers.
+    """
+    normalised = {
+        "external": external_config or {},
+        "sidecars": sidecars_config or [],
+        "custom": custom_images or {},
+    }
+    return hashlib.sha256(json.dumps(normalised,
+                                     sort_keys=True).encode()).hexdigest()
+
+
+class TopologyPool:
+
+    def __init__(self, max_size: int, idle_seconds: float):
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        # (key, topology id) -> (resource record, released at), oldest first
+        self._idle: "OrderedDict[tuple, tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(self, key: str) -> Optional[dict]:
+        """Lease an idle topology for `key`, if there is one."""
+        with self._lock:
+            for entry in reversed(self._idle):
+                if entry[0] == key:
+                    record, _ = self._idle.pop(entry)
+                    self.hits += 1
+                    return record
+            self.misses += 1
+            return None
+
+    def release(self, key: str, topology_id: str, record: dict) -> List[dict]:
+        """
+        Park a reset topology. Returns the records that no longer fit and
+        must be torn down by the caller.
+        """
+        with self._lock:
+            self._idle[(key, topology_id)] = (record, time.monotonic())
+            evicted = []
+            while len(self._idle) > self.max_size:
+                evicted.append(self._idle.popitem(last=False)[1][0])
+                self.evictions += 1
+            return evicted
+
+    def expire(self) -> List[dict]:
+        """Remove and return topologies idle for too long."""
+        deadline = time.monotonic() - self.idle_seconds
+        with self._lock:
+            expired = [
+                entry for entry, (_, released_at) in self._idle.items()
+                if released_at < deadline
+            ]
+            return [self._idle.pop(entry)[0] for entry in expired]
+
+    def drain(self) -> List[dict]:
+        """Remove and return every idle topology."""
+        with self._lock:
+            records = [record for record, _ in self._idle.values()]
+            self._idle.clear()
+            return records
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "maxSize": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -20,6 +20,7 @@ from .testdata import (
     handle_problem_response,
 )
 from .asset_cache import ensure_custom_asset
+from .cache_manager import TRIAL_KIND, get_cache_manager
 
 
 def download_custom_testcases(custom_testcases_path: str) -> bytes:
@@ -198,4 +199,9 @@ def prepare_custom_testdata(
     if getattr(meta, "customChecker", False):
         copy_checker_to_testdata(problem_id, custom_dir)
 
+    get_cache_manager().touch(problem_id,
+                              TRIAL_KIND,
+                              custom_dir,
+                              name=submission_id,
+                              refreshed=True)
     return custom_dir
@@ -7,6 +7,9 @@ DNSMASQ_ALLOWLIST="/etc/dnsmasq.d/allowlist.conf"
 
 echo "=== Starting Router with DNS Sinkhole + IPv6 ==="
 
+# Not ready until the rules are (re-)applied, also when restarted for reuse
+rm -f /tmp/router-ready
+
 # ============================================================
 # 1. Parse Configuration
 # ============================================================
@@ -333,6 +336,9 @@ if ! kill -0 $DNSMASQ_PID 2>/dev/null; then
 fi
 echo "dnsmasq started with PID $DNSMASQ_PID"
 
+# Readiness marker polled by the dispatcher (ROUTER_READY_FILE)
+touch /tmp/router-ready
+
 # ============================================================
 # 7. Drop Privileges and Keep Running
 # ============================================================
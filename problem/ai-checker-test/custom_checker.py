@@ -111,14 +111,9 @@ def evaluate_with_ai(api_key, model, question, student_answer,
     Returns:
         tuple: (status, message)
     """
-    # Note: In production, you would use the actual google-generativeai library:
-    #
-    # import google.generativeai as genai
-    # genai.configure(api_key=api_key)
-    # model = genai.GenerativeModel(model)
-    # response = model.generate_content(prompt)
-    #
-    # For this demo, we simulate the AI evaluation:
+    # The sandbox routes model calls through its AI gateway (shared rate
+    # limit and response cache) and passes its address as AI_GATEWAY_URL.
+    # Without it, the AI evaluation is simulated below.
 
     prompt = f"""
             You are a grading assistant. Evaluate if the student's answer is semantically correct.
@@ -133,6 +128,15 @@ def evaluate_with_ai(api_key, model, question, student_answer,
             """
     debug_log("ai_prompt_len=%d" % len(prompt))
 
+    gateway_url = os.environ.get("AI_GATEWAY_URL")
+    if gateway_url:
+        reply = generate_content(gateway_url, api_key, model, prompt)
+        debug_log("ai_reply=%r" % reply[:200])
+        verdict = reply.strip().split(maxsplit=1)
+        if verdict and verdict[0].upper() == "CORRECT":
+            return "AC", f"AI Evaluation: Semantically correct (model: {model})"
+        return "WA", "AI Evaluation: Answer does not match expected semantics"
+
     # Simulated AI response for demo (remove in production)
     # In production, call the actual Gemini API here
 
@@ -154,6 +158,31 @@ def evaluate_with_ai(api_key, model, question, student_answer,
         return "WA", f"AI Evaluation: Answer does not match expected semantics"
 
 
+def generate_content(gateway_url, api_key, model, prompt):
+    """Call generateContent through the AI gateway, return the reply text."""
+    import json
+    import urllib.request
+
+    request = urllib.request.Request(
+        f"{gateway_url}/v1beta/models/{model}:generateContent",
+        data=json.dumps({
+            "contents": [{
+                "parts": [{
+                    "text": prompt
+                }]
+            }]
+        }).encode(),
+        headers={
+            "Content-Type": "application/json",
+            "x-goog-api-key": api_key,
+        },
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=10) as resp:
+        data = json.loads(resp.read())
+    return data["candidates"][0]["content"]["parts"][0]["text"]
+
+
 if __name__ == "__main__":
     if len(sys.argv) != 4:
         print("STATUS: WA")
@@ -0,0 +1,54 @@
+#include <stdio.h>
+#include <time.h>
+
+// Pipe stress test: sends `n` numbers one at a time and waits for each
+// reply, so the run time is dominated by round trips through the pipes.
+int main(void) {
+    FILE *fp = fopen("testcase.in", "r");
+    if (!fp) {
+        return 1;
+    }
+    long long n = 0;
+    if (fscanf(fp, "%lld", &n) != 1) {
+        fclose(fp);
+        return 1;
+    }
+    fclose(fp);
+
+    struct timespec start, end;
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    printf("%lld\n", n);
+    fflush(stdout);
+    long long wrong = -1;
+    for (long long i = 0; i < n; ++i) {
+        printf("%lld\n", i);
+        fflush(stdout);
+        long long reply = 0;
+        if (scanf("%lld", &reply) != 1) {
+            wrong = i;
+            break;
+        }
+        if (reply != i + 1 && wrong < 0) {
+            wrong = i;
+        }
+    }
+    clock_gettime(CLOCK_MONOTONIC, &end);
+    double seconds = (end.tv_sec - start.tv_sec) +
+                     (end.tv_nsec - start.tv_nsec) / 1e9;
+
+    FILE *out = fopen("Check_Result", "w");
+    if (!out) {
+        return 1;
+    }
+    if (wrong >= 0) {
+        fprintf(out, "STATUS: WA\nMESSAGE: bad reply to query %lld\n", wrong);
+    } else {
+        fprintf(out,
+                "STATUS: AC\nMESSAGE: %lld round trips in %.3fs (%.0f/s)\n",
+                n,
+                seconds,
+                seconds > 0 ? n / seconds : 0.0);
+    }
+    fclose(out);
+    return 0;
+}
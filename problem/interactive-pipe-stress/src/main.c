@@ -0,0 +1,17 @@
+#include <stdio.h>
+
+int main(void) {
+    long long n = 0;
+    if (scanf("%lld", &n) != 1) {
+        return 0;
+    }
+    for (long long i = 0; i < n; ++i) {
+        long long x = 0;
+        if (scanf("%lld", &x) != 1) {
+            return 0;
+        }
+        printf("%lld\n", x + 1);
+        fflush(stdout);
+    }
+    return 0;
+}
@@ -0,0 +1,256 @@
+"""
+AI gateway run *inside* the shared system router container.
+
+AI checker containers join the router's network namespace and send their
+model requests to http://127.0.0.1:<port>/<upstream path> instead of
+calling the model API directly. The gateway forwards them to the upstream
+API and
+
+- runs at most `concurrency` upstream calls at a time,
+- starts at most `rate` upstream calls per second (token bucket),
+- answers a request whose model path and body were already answered
+  successfully from an LRU cache, and lets identical requests in flight
+  share one upstream call.
+
+The API key (query `key` or `x-goog-api-key` header) is passed through but
+is not part of the cache key. GET /stats returns the counters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+# request headers forwarded upstream
+FORWARD_HEADERS = ("Content-Type", "x-goog-api-key", "Authorization")
+
+# (status, content type, body)
+Response = Tuple[int, str, bytes]
+
+
+class RateLimiter:
+    """Token bucket, `rate` calls per second with bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a call may start, return the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class _Flight:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Optional[Response] = None
+
+
+class Gateway:
+
+    def __init__(self,
+                 upstream: str,
+                 concurrency: int = 4,
+                 rate: float = 0,
+                 cache_size: int = 1024,
+                 timeout: float = 60):
+        self.upstream = upstream.rstrip("/")
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._limiter = RateLimiter(rate)
+        self._cache: "OrderedDict[str, Response]" = OrderedDict()
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "upstreamCalls": 0,
+            "cacheHits": 0,
+            "joined": 0,
+            "errors": 0,
+            "rateLimitedSeconds": 0.0,
+        }
+
+    @staticmethod
+    def cache_key(path: str, body: bytes) -> str:
+        url = urllib.parse.urlsplit(path)
+        query = [(k, v) for k, v in urllib.parse.parse_qsl(url.query)
+                 if k != "key"]
+        digest = hashlib.sha256()
+        digest.update(url.path.encode() + b"\0")
+        digest.update(urllib.parse.urlencode(sorted(query)).encode() + b"\0")
+        digest.update(body)
+        return digest.hexdigest()
+
+    def handle(self, path: str, body: bytes, headers: Dict[str,
+                                                           str]) -> Response:
+        key = self.cache_key(path, body)
+        with self._lock:
+            self.stats["requests"] += 1
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats["cacheHits"] += 1
+                return cached
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.stats["joined"] += 1
+        if not leader:
+            flight.done.wait()
+            return flight.response
+        try:
+            flight.response = self._call_upstream(path, body, headers)
+        finally:
+            if flight.response is None:
+                flight.response = (502, "text/plain",
+                                   b"ai gateway: upstream call failed")
+            with self._lock:
+                del self._inflight[key]
+                if flight.response[0] == 200 and self.cache_size > 0:
+                    self._cache[key] = flight.response
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            flight.done.set()
+        return flight.response
+
+    def _call_upstream(self, path: str, body: bytes,
+                       headers: Dict[str, str]) -> Response:
+        request = urllib.request.Request(self.upstream + path,
+                                         data=body,
+                                         headers=headers,
+                                         method="POST")
+        with self._slots:
+            waited = self._limiter.acquire()
+            with self._lock:
+                self.stats["upstreamCalls"] += 1
+                self.stats["rateLimitedSeconds"] += waited
+            try:
+                with urllib.request.urlopen(request,
+                                            timeout=self.timeout) as resp:
+                    return (resp.status,
+                            resp.headers.get("Content-Type",
+                                             "application/json"), resp.read())
+            except urllib.error.HTTPError as exc:
+                with self._lock:
+                    self.stats["errors"] += 1
+                return (exc.code, exc.headers.get("Content-Type",
+                                                  "text/plain"), exc.read())
+            except OSError as exc:
+                with self._lock:
+                    self.stats["errors"] += 1
+                return (502, "text/plain",
+                        f"ai gateway: {exc}".encode("utf-8", "ignore"))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "cacheSize": len(self._cache),
+                "inflight": len(self._inflight),
+            }
+
+
+def make_handler(gateway: Gateway):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length)
+            headers = {
+                name: self.headers[name]
+                for name in FORWARD_HEADERS if self.headers.get(name)
+            }
+            self._reply(*gateway.handle(self.path, body, headers))
+
+        def do_GET(self):
+            if self.path != "/stats":
+                self._reply(404, "text/plain", b"not found")
+                return
+            self._reply(200, "application/json",
+                        json.dumps(gateway.snapshot()).encode())
+
+        def _reply(self, status: int, content_type: str, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(gateway: Gateway, host: str, port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(gateway))
+    server.daemon_threads = True
+    return server
+
+
+def parse_args() -> argparse.Namespace:
+    env = os.environ.get
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port",
+                        type=int,
+                        default=int(env("AI_GATEWAY_PORT", "8765")))
+    parser.add_argument("--upstream",
+                        default=env(
+                            "AI_GATEWAY_UPSTREAM",
+                            "https://generativelanguage.googleapis.com"))
+    parser.add_argument("--concurrency",
+                        type=int,
+                        default=int(env("AI_GATEWAY_CONCURRENCY", "4")))
+    parser.add_argument("--rate",
+                        type=float,
+                        default=float(env("AI_GATEWAY_RATE", "0")))
+    parser.add_argument("--cache-size",
+                        type=int,
+                        default=int(env("AI_GATEWAY_CACHE_SIZE", "1024")))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    gateway = Gateway(args.upstream, args.concurrency, args.rate,
+                      args.cache_size)
+    serve(gateway, args.host, args.port).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
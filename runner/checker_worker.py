@@ -0,0 +1,149 @@
+"""
+Custom checker worker run *inside* the checker container.
+
+The container is started once per submission and kept alive while the
+submission is judged. Each stdin line is one case as JSON::
+
+    {"caseNo": "0000", "dir": "/checker-work/0000",
+     "student": "/submission/src/cases/0000",
+     "teacher": "/submission/teacher/cases/0000",
+     "files": {"input.in": "/submission/testcase/0000.in", ...},
+     "timeoutSec": 5}
+
+`dir` is the case's writable workdir. `files` (input.in, answer.out,
+custom_checker.py and usually student.out) are linked into it from the
+read-only submission mount, so it is laid out as the one-shot checker
+container sees /workspace. The worker points /workspace at it, runs the
+checker exactly as the one-shot container does and writes one JSON line
+back::
+
+    {"caseNo": "0000", "exitCode": 0, "stdout": "...", "stderr": "...",
+     "timedOut": false}
+
+Memory is limited by the container itself, time per case here.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+
+def _point_workspace(workspace: Path, target: str):
+    """Make `workspace` a symlink to `target`, replacing the image's dir."""
+    if workspace.is_symlink():
+        pass
+    elif workspace.is_dir():
+        workspace.rmdir()
+    staging = workspace.with_name(f".{workspace.name}.{os.getpid()}")
+    if staging.is_symlink():
+        staging.unlink()
+    os.symlink(target, staging)
+    os.replace(staging, workspace)
+
+
+def _link(case_dir: Path, name: str, target: str | None):
+    link = case_dir / name
+    if link.is_symlink():
+        link.unlink()
+    if target:
+        os.symlink(target, link)
+
+
+def _clear_dir(path: Path):
+    """Drop what the previous checker left in /tmp."""
+    if not path.is_dir():
+        return
+    for entry in path.iterdir():
+        try:
+            if entry.is_dir() and not entry.is_symlink():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink()
+        except OSError:
+            pass
+
+
+def check_case(request: dict, workspace: Path, tmp_dir: Path) -> dict:
+    case_dir = Path(request["dir"])
+    _link(case_dir, "student", request.get("student"))
+    _link(case_dir, "teacher", request.get("teacher"))
+    for name, target in (request.get("files") or {}).items():
+        _link(case_dir, name, target)
+    _point_workspace(workspace, str(case_dir))
+    command = [
+        "python3",
+        f"{workspace}/custom_checker.py",
+        f"{workspace}/input.in",
+        f"{workspace}/student.out",
+        f"{workspace}/answer.out",
+    ]
+    proc = subprocess.Popen(
+        command,
+        cwd=str(workspace),
+        env={
+            **os.environ, "PWD": str(workspace)
+        },
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    timed_out = False
+    try:
+        stdout, stderr = proc.communicate(timeout=request["timeoutSec"])
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        # the checker may have spawned helpers, take its whole group down
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        stdout, stderr = proc.communicate()
+    finally:
+        _clear_dir(tmp_dir)
+    exit_code = proc.returncode
+    if exit_code < 0:
+        # as docker reports a container killed by a signal (OOM: 137)
+        exit_code = 128 - exit_code
+    return {
+        "caseNo": request.get("caseNo"),
+        "exitCode": exit_code,
+        "stdout": stdout.decode("utf-8", "ignore"),
+        "stderr": stderr.decode("utf-8", "ignore"),
+        "timedOut": timed_out,
+    }
+
+
+def serve(stdin, stdout, workspace: Path, tmp_dir: Path):
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            result = check_case(json.loads(line), workspace, tmp_dir)
+        except Exception as exc:
+            result = {"error": f"checker worker failed: {exc}"}
+        stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+        stdout.flush()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workspace", default="/workspace")
+    parser.add_argument("--tmp-dir", default="/tmp")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    serve(sys.stdin, sys.stdout, Path(args.workspace), Path(args.tmp_dir))
+
+
+if __name__ == "__main__":
+    main()
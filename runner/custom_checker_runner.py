@@ -1,19 +1,44 @@
+import json
 import math
+import socket
+import struct
+import threading
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Dict
 import docker
 
+from dispatcher import config as dispatcher_config
+from dispatcher import docker_labels
+from dispatcher.readiness import Probe, wait_until_ready
+from runner.path_utils import PathTranslator
+
 # Fixed timeout for AI Checker (15 seconds)
 AI_CHECKER_TIMEOUT_SEC = 15
 
 # System router image for AI Checker whitelist
 SYSTEM_ROUTER_IMAGE = "noj-system-router:latest"
 
+# The only file of the sandbox the router needs, mounted where
+# system_router/entrypoint.sh looks for it
+AI_GATEWAY_SOURCE = Path("runner") / "ai_gateway.py"
+AI_GATEWAY_MOUNT = "/app/runner/ai_gateway.py"
+
 
 class CustomCheckerError(Exception):
     """Raised when custom checker cannot be executed."""
 
 
+class CheckerWorkerError(CustomCheckerError):
+    """The checker worker container broke; the case did not get a verdict."""
+
+
+def checker_timeout_sec(time_limit_ms: int, enable_ai_network: bool) -> int:
+    if enable_ai_network:
+        return AI_CHECKER_TIMEOUT_SEC
+    return max(5, math.ceil(time_limit_ms / 1000) * 5)
+
+
 @dataclass
 class CustomCheckerRunner:
     submission_id: str
@@ -28,7 +53,8 @@ class CustomCheckerRunner:
     teacher_dir: str | None = None
     env: dict | None = None  # Environment variables for container
     enable_ai_network: bool = False  # Enable AI network (system_router)
-    _router_container_id: str | None = field(default=None, repr=False)
+    # name under /workspace -> host file, mounted read-only
+    files: dict | None = None
 
     def run(self) -> Dict[str, str]:
         client = docker.APIClient(base_url=self.docker_url)
@@ -48,14 +74,18 @@ class CustomCheckerRunner:
                 "bind": "/workspace/teacher",
                 "mode": "ro"
             }
+        for name, host_path in (self.files or {}).items():
+            binds[host_path] = {"bind": f"/workspace/{name}", "mode": "ro"}
 
         # Determine network mode and timeout
+        environment = dict(self.env or {})
         if self.enable_ai_network:
-            network_mode = self._start_system_router(client)
-            timeout_sec = AI_CHECKER_TIMEOUT_SEC
+            network_mode = f"container:{SYSTEM_ROUTER.ensure(client)}"
+            environment["AI_GATEWAY_URL"] = SYSTEM_ROUTER.gateway_url
         else:
             network_mode = "none"
-            timeout_sec = max(5, math.ceil(self.time_limit_ms / 1000) * 5)
+        timeout_sec = checker_timeout_sec(self.time_limit_ms,
+                                          self.enable_ai_network)
 
         host_config = client.create_host_config(
             binds=binds,
@@ -75,7 +105,9 @@ class CustomCheckerRunner:
             command=command,
             working_dir="/workspace",
             host_config=host_config,
-            environment=self.env or {},
+            environment=environment,
+            labels=docker_labels.labels(self.submission_id,
+                                        docker_labels.ROLE_CHECKER),
         )
         try:
             client.start(container)
@@ -95,8 +127,6 @@ class CustomCheckerRunner:
                 client.remove_container(container, v=True, force=True)
             except Exception:
                 pass
-            # Cleanup router container
-            self._cleanup_system_router(client)
 
         status_code = exit_status.get("StatusCode", 1) if exit_status else 1
         if exit_status is None:
@@ -107,31 +137,237 @@ class CustomCheckerRunner:
             "stderr": logs_stderr,
         }
 
-    def _start_system_router(self, client: docker.APIClient) -> str:
-        """Start system_router container for AI Checker network whitelist."""
+
+class SystemRouter:
+    """
+    The system router shared by the AI checkers of this process.
+
+    It is started on first use and recreated when it is gone. AI checker
+    containers join its network namespace, where it serves the AI gateway
+    (runner/ai_gateway.py) on 127.0.0.1, so model calls of all submissions
+    share one concurrency / rate limit and response cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._container_id: str | None = None
+        self.started = 0
+
+    @property
+    def gateway_url(self) -> str:
+        return f"http://127.0.0.1:{dispatcher_config.AI_GATEWAY_PORT}"
+
+    def ensure(self, client: docker.APIClient) -> str:
+        """Id of the running router, started if needed."""
+        with self._lock:
+            if self._container_id and self._running(client):
+                return self._container_id
+            self._remove(client)
+            try:
+                self._container_id = self._start(client)
+            except Exception as exc:
+                self._remove(client)
+                raise CustomCheckerError(
+                    f"Failed to start system_router: {exc}") from exc
+            self.started += 1
+            return self._container_id
+
+    def stop(self, client: docker.APIClient):
+        with self._lock:
+            self._remove(client)
+
+    def _start(self, client: docker.APIClient) -> str:
+        translator = PathTranslator()
+        environment = {
+            "AI_GATEWAY_PORT": str(dispatcher_config.AI_GATEWAY_PORT),
+            "AI_GATEWAY_CONCURRENCY":
+            str(dispatcher_config.AI_GATEWAY_CONCURRENCY),
+            "AI_GATEWAY_RATE": str(dispatcher_config.AI_GATEWAY_RATE),
+            "AI_GATEWAY_CACHE_SIZE":
+            str(dispatcher_config.AI_GATEWAY_CACHE_SIZE),
+        }
+        if dispatcher_config.AI_GATEWAY_UPSTREAM:
+            environment[
+                "AI_GATEWAY_UPSTREAM"] = dispatcher_config.AI_GATEWAY_UPSTREAM
+        # NET_ADMIN for the whitelist firewall
+        host_config = client.create_host_config(
+            cap_add=["NET_ADMIN"],
+            binds={
+                str(translator.host_root / AI_GATEWAY_SOURCE): {
+                    "bind": AI_GATEWAY_MOUNT,
+                    "mode": "ro"
+                }
+            },
+        )
+        router = client.create_container(
+            image=SYSTEM_ROUTER_IMAGE,
+            host_config=host_config,
+            detach=True,
+            environment=environment,
+            labels=docker_labels.labels(None,
+                                        docker_labels.ROLE_CHECKER_ROUTER),
+        )
+        self._container_id = router["Id"]
+        client.start(router)
+        wait_until_ready(
+            client,
+            {router["Id"]: Probe.tcp(dispatcher_config.AI_GATEWAY_PORT)},
+            dispatcher_config.READINESS_TIMEOUT,
+            dispatcher_config.READINESS_POLL_INITIAL,
+            dispatcher_config.READINESS_POLL_MAX,
+        )
+        return router["Id"]
+
+    def _running(self, client: docker.APIClient) -> bool:
         try:
-            # Create router container with NET_ADMIN capability
-            host_config = client.create_host_config(cap_add=["NET_ADMIN"], )
-            router = client.create_container(
-                image=SYSTEM_ROUTER_IMAGE,
+            state = client.inspect_container(self._container_id)["State"]
+        except Exception:
+            return False
+        return bool(state.get("Running"))
+
+    def _remove(self, client: docker.APIClient):
+        if self._container_id:
+            try:
+                client.remove_container(self._container_id, force=True)
+            except Exception:
+                pass
+            self._container_id = None
+
+
+SYSTEM_ROUTER = SystemRouter()
+
+# where CheckerWorker mounts things inside the container
+WORKER_SUBMISSION_DIR = "/submission"
+WORKER_WORK_DIR = "/checker-work"
+# the only file of the sandbox a worker needs, mounted on its own
+WORKER_SOURCE = Path("runner") / "checker_worker.py"
+WORKER_MOUNT = "/app/runner/checker_worker.py"
+# slack on top of the per-case timeout the worker enforces itself
+WORKER_REPLY_SLACK_SEC = 10
+
+
+@dataclass
+class CheckerWorker:
+    """
+    A checker container kept alive across the cases of one submission.
+
+    runner/checker_worker.py runs in it and takes one case per line on the
+    container's stdin. The container is created with the memory limit of
+    the cases it serves, so a worker is only reused for cases with the same
+    limit.
+    """
+    submission_id: str
+    image: str
+    docker_url: str
+    # host path of runner/checker_worker.py
+    worker_source: str
+    submission_dir: str
+    work_dir: str
+    mem_limit_kb: int
+    _client: docker.APIClient | None = field(default=None, repr=False)
+    _container_id: str | None = field(default=None, repr=False)
+    _sock: socket.socket | None = field(default=None, repr=False)
+    _stdout: bytes = field(default=b"", repr=False)
+
+    def start(self):
+        client = docker.APIClient(base_url=self.docker_url)
+        host_config = client.create_host_config(
+            binds={
+                self.worker_source: {
+                    "bind": WORKER_MOUNT,
+                    "mode": "ro"
+                },
+                self.submission_dir: {
+                    "bind": WORKER_SUBMISSION_DIR,
+                    "mode": "ro"
+                },
+                self.work_dir: {
+                    "bind": WORKER_WORK_DIR,
+                    "mode": "rw"
+                },
+            },
+            network_mode="none",
+            mem_limit=f"{max(self.mem_limit_kb,0)}k",
+            tmpfs={"/tmp": "rw,noexec,nosuid"},
+        )
+        try:
+            container = client.create_container(
+                image=self.image,
+                command=["python3", WORKER_MOUNT],
+                working_dir="/",
+                stdin_open=True,
                 host_config=host_config,
-                detach=True,
+                labels=docker_labels.labels(self.submission_id,
+                                            docker_labels.ROLE_CHECKER),
             )
-            client.start(router)
-            self._router_container_id = router["Id"]
-            # Return network mode to share router's network
-            return f"container:{self._router_container_id}"
+            self._client = client
+            self._container_id = container["Id"]
+            sock = client.attach_socket(self._container_id,
+                                        params={
+                                            "stdin": 1,
+                                            "stdout": 1,
+                                            "stream": 1,
+                                        })
+            self._sock = getattr(sock, "_sock", sock)
+            client.start(self._container_id)
         except Exception as exc:
-            raise CustomCheckerError(
-                f"Failed to start system_router: {exc}") from exc
+            self.stop()
+            raise CheckerWorkerError(
+                f"failed to start checker worker: {exc}") from exc
 
-    def _cleanup_system_router(self, client: docker.APIClient):
-        """Stop and remove system_router container."""
-        if self._router_container_id:
+    def run(self, request: dict, timeout_sec: int) -> Dict[str, str]:
+        """Check one case, same result shape as CustomCheckerRunner.run."""
+        if self._sock is None:
+            raise CheckerWorkerError("checker worker is not running")
+        request = {**request, "timeoutSec": timeout_sec}
+        try:
+            self._sock.settimeout(timeout_sec + WORKER_REPLY_SLACK_SEC)
+            self._sock.sendall(
+                json.dumps(request, ensure_ascii=False).encode() + b"\n")
+            reply = json.loads(self._read_line())
+        except (OSError, EOFError, ValueError) as exc:
+            raise CheckerWorkerError(f"checker worker failed: {exc}") from exc
+        if "error" in reply:
+            raise CheckerWorkerError(reply["error"])
+        if reply.get("timedOut"):
+            raise CustomCheckerError("custom checker timed out")
+        return {
+            "exit_code": reply.get("exitCode", 1),
+            "stdout": reply.get("stdout", ""),
+            "stderr": reply.get("stderr", ""),
+        }
+
+    def stop(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        if self._client is not None and self._container_id is not None:
             try:
-                client.stop(self._router_container_id, timeout=5)
-                client.remove_container(self._router_container_id, force=True)
+                self._client.remove_container(self._container_id,
+                                              v=True,
+                                              force=True)
             except Exception:
                 pass
-            finally:
-                self._router_container_id = None
+        self._container_id = None
+
+    def _read_line(self) -> bytes:
+        """Next stdout line of the multiplexed attach stream."""
+        while b"\n" not in self._stdout:
+            stream, size = struct.unpack(">BxxxL", self._recv_exactly(8))
+            data = self._recv_exactly(size)
+            if stream == 1:
+                self._stdout += data
+        line, self._stdout = self._stdout.split(b"\n", 1)
+        return line
+
+    def _recv_exactly(self, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = self._sock.recv(size - len(data))
+            if not chunk:
+                raise EOFError("checker worker exited")
+            data += chunk
+        return data
@@ -1,8 +1,10 @@
 import math
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Optional
 import docker
 
+from dispatcher import docker_labels
+
 
 class CustomScorerError(Exception):
     """Raised when custom scorer cannot be executed."""
@@ -16,6 +18,7 @@ class CustomScorerRunner:
     scorer_relpath: str
     time_limit_ms: int
     mem_limit_kb: int
+    submission_id: Optional[str] = None
 
     def run(self, payload: Dict) -> Dict[str, str]:
         client = docker.APIClient(base_url=self.docker_url)
@@ -42,6 +45,8 @@ class CustomScorerRunner:
             command=command,
             working_dir="/workspace",
             host_config=host_config,
+            labels=docker_labels.labels(self.submission_id,
+                                        docker_labels.ROLE_SCORER),
         )
         try:
             client.start(container)
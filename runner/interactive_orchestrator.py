@@ -10,6 +10,7 @@ Any sandbox error (CE/RE/TLE/MLE) from either side overrides Check_Result.
 from __future__ import annotations
 
 import argparse
+import fcntl
 import json
 import os
 import subprocess
@@ -18,11 +19,21 @@ import time
 import tempfile
 import math
 import logging
+import select
+import signal
+import threading
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 LANG_IDS = {"c11": 0, "cpp17": 1, "python3": 2}
+# fcntl only exports these on Python 3.10+
+F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+F_GETPIPE_SZ = getattr(fcntl, "F_GETPIPE_SZ", 1032)
+PIPE_MAX_SIZE_PATH = Path("/proc/sys/fs/pipe-max-size")
 CONFIG_PATH = Path("/app/.config/interactive.json")
+PROC_ROOT = Path("/proc")
+# writable outside the case dirs, cleared between the cases of a batch
+SCRATCH_DIRS = (Path("/tmp"), Path("/dev/shm"))
 
 
 def load_config():
@@ -33,6 +44,12 @@ def load_config():
         "studentUid": 1451,
         "sandboxGid": 1450,
         "studentAllowRead": False,
+        # pipe capacity requested in largepipe mode (capped by
+        # /proc/sys/fs/pipe-max-size)
+        "pipeSizeBytes": 1024 * 1024,
+        # keep the last N bytes sent in each direction and return them as
+        # `transcript`, 0 disables; only for devfd / largepipe
+        "transcriptBytes": 0,
     }
     try:
         data = json.loads(CONFIG_PATH.read_text())
@@ -197,26 +214,138 @@ def _setup_secure_permissions(
             f"failed to secure student dir: {exc}") from exc
 
 
-def _setup_pipes(tmpdir: Path, mode: str):
-    if mode == "devfd":
+class _Transcript:
+    """Ring buffer keeping the last `capacity` bytes written to it."""
+
+    def __init__(self, capacity: int):
+        self._buf = bytearray(capacity)
+        self._pos = 0
+        self.total = 0
+
+    def write(self, data: bytes):
+        capacity = len(self._buf)
+        if len(data) >= capacity:
+            self._buf[:] = data[-capacity:]
+            self._pos = 0
+        else:
+            end = self._pos + len(data)
+            if end <= capacity:
+                self._buf[self._pos:end] = data
+            else:
+                split = capacity - self._pos
+                self._buf[self._pos:] = data[:split]
+                self._buf[:end - capacity] = data[split:]
+            self._pos = end % capacity
+        self.total += len(data)
+
+    def tail(self) -> bytes:
+        if self.total < len(self._buf):
+            return bytes(self._buf[:self.total])
+        return bytes(self._buf[self._pos:] + self._buf[:self._pos])
+
+
+def _relay(src_fd: int, dst_fd: int, transcript: _Transcript):
+    """Forward `src_fd` to `dst_fd` until EOF, recording what passed."""
+    try:
+        while True:
+            data = os.read(src_fd, 65536)
+            if not data:
+                break
+            view = memoryview(data)
+            while view:
+                view = view[os.write(dst_fd, view):]
+            transcript.write(data)
+    except OSError:
+        # the reading side is gone
+        pass
+    finally:
+        for fd in (src_fd, dst_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def _enlarge_pipe(fd: int, size: int) -> int:
+    """
+    Grow the buffer of the pipe behind `fd` to `size` bytes, or to the
+    system maximum if that is lower. Returns the resulting capacity.
+    """
+    try:
+        return fcntl.fcntl(fd, F_SETPIPE_SZ, size)
+    except OSError:
+        pass
+    try:
+        max_size = int(PIPE_MAX_SIZE_PATH.read_text())
+        return fcntl.fcntl(fd, F_SETPIPE_SZ, min(size, max_size))
+    except (OSError, ValueError):
+        return fcntl.fcntl(fd, F_GETPIPE_SZ)
+
+
+def _setup_pipes(tmpdir: Path,
+                 mode: str,
+                 pipe_size: int = 0,
+                 transcript_bytes: int = 0):
+    """
+    devfd: anonymous pipes passed as /dev/fd/N.
+    largepipe: devfd with the pipe buffers grown to `pipe_size`, so chatty
+    protocols block on full pipes (and wake each other up) far less often.
+    Pipes stay byte streams either way, and writes up to PIPE_BUF remain
+    atomic.
+    fifo: named pipes in `tmpdir`.
+
+    With `transcript_bytes` (devfd / largepipe only), each direction goes
+    through a relay thread that forwards the data before recording it in a
+    bounded ring buffer. The recording never blocks the exchange, but the
+    relay adds a hop per message, so it is meant for debugging.
+    """
+    if mode in ("devfd", "largepipe"):
         s2t_r, s2t_w = os.pipe()
         t2s_r, t2s_w = os.pipe()
-        for fd in (s2t_r, s2t_w, t2s_r, t2s_w):
+        pipes = [s2t_w, t2s_w]
+        # ends the student / teacher write to
+        student_out, teacher_out = s2t_w, t2s_w
+        relays = {}
+        if transcript_bytes > 0:
+            relay_s_r, student_out = os.pipe()
+            relay_t_r, teacher_out = os.pipe()
+            pipes += [student_out, teacher_out]
+            relays = {
+                "studentToTeacher": (relay_s_r, s2t_w),
+                "teacherToStudent": (relay_t_r, t2s_w),
+            }
+        pipe_capacity = None
+        if mode == "largepipe":
+            pipe_capacity = min(_enlarge_pipe(fd, pipe_size) for fd in pipes)
+        keep_fds = [s2t_r, student_out, t2s_r, teacher_out]
+        for fd in keep_fds:
             os.set_inheritable(fd, True)
+        transcripts = {}
+        relay_threads = []
+        for direction, (src_fd, dst_fd) in relays.items():
+            transcripts[direction] = _Transcript(transcript_bytes)
+            relay_threads.append(
+                threading.Thread(target=_relay,
+                                 args=(src_fd, dst_fd, transcripts[direction]),
+                                 daemon=True))
+            relay_threads[-1].start()
         return {
-            "mode": "devfd",
+            "mode": mode,
             "student": {
                 "stdin": f"/dev/fd/{t2s_r}",
-                "stdout": f"/dev/fd/{s2t_w}",
+                "stdout": f"/dev/fd/{student_out}",
             },
             "teacher": {
                 "stdin": f"/dev/fd/{s2t_r}",
-                "stdout": f"/dev/fd/{t2s_w}",
+                "stdout": f"/dev/fd/{teacher_out}",
             },
-            "keep_fds": [s2t_r, s2t_w, t2s_r, t2s_w],
+            "keep_fds": keep_fds,
             "kick_student": s2t_w,
             "kick_teacher": t2s_w,
             "kick_bytes": [s2t_w, t2s_w],
+            "pipe_capacity": pipe_capacity,
+            "transcripts": transcripts,
+            "relay_threads": relay_threads,
         }
     # FIFO mode
     s2t = tmpdir / "s2t.fifo"
@@ -249,6 +378,100 @@ def _setup_pipes(tmpdir: Path, mode: str):
     }
 
 
+def _exit_fd(proc: subprocess.Popen) -> int:
+    """
+    Return an fd that becomes readable once `proc` exits.
+
+    Uses a pidfd (Linux 5.3+). Where that is unavailable, a daemon thread
+    blocks in waitid(WNOWAIT), which leaves the exit status for Popen to
+    reap, and writes to a pipe; the thread owns and closes the write end.
+    """
+    try:
+        return os.pidfd_open(proc.pid)
+    except (AttributeError, OSError):
+        pass
+    read_fd, write_fd = os.pipe()
+
+    def wait_exit():
+        try:
+            os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+        except OSError:
+            # already reaped
+            pass
+        try:
+            os.write(write_fd, b"x")
+        except OSError:
+            pass
+        os.close(write_fd)
+
+    threading.Thread(target=wait_exit, daemon=True).start()
+    return read_fd
+
+
+def _kick(kick_fd: int):
+    """Send a newline to the teacher so it stops blocking on the FIFO."""
+    try:
+        os.write(kick_fd, b"\n")
+    except Exception as exc:
+        logging.getLogger(__name__).warning("kick write failed: %s", exc)
+    try:
+        os.close(kick_fd)
+    except Exception as exc:
+        logging.getLogger(__name__).warning("kick close failed: %s", exc)
+
+
+def _supervise(procs: dict, deadline: float, kick_fd: Optional[int]):
+    """
+    Block until every process in `procs` has exited or `deadline` (epoch
+    seconds) has passed, waking up on process exit instead of polling.
+    When the student exits while the teacher is still running, `kick_fd` is
+    written and closed to unblock the teacher.
+
+    Returns `kick_fd`, or None once it has been used.
+    """
+    poller = select.poll()
+    exit_fds = {}
+    try:
+        for name, proc in procs.items():
+            fd = _exit_fd(proc)
+            exit_fds[fd] = name
+            poller.register(fd, select.POLLIN)
+        running = set(procs)
+        while running:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            for fd, _ in poller.poll(math.ceil(remaining * 1000)):
+                name = exit_fds[fd]
+                poller.unregister(fd)
+                procs[name].poll()
+                running.discard(name)
+            if (kick_fd is not None and "student" in procs
+                    and "student" not in running and "teacher" in running):
+                _kick(kick_fd)
+                kick_fd = None
+    finally:
+        for fd in exit_fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+    return kick_fd
+
+
+def _collect_transcripts(transcripts: dict, relay_threads: list) -> dict:
+    """Tail of each direction, once the relays have drained."""
+    for thread in relay_threads:
+        thread.join(timeout=1.0)
+    collected = {}
+    for direction, transcript in transcripts.items():
+        collected[direction] = {
+            "bytes": transcript.total,
+            "tail": transcript.tail().decode("utf-8", "replace"),
+        }
+    return collected
+
+
 def orchestrate(args: argparse.Namespace):
     workdir = Path(args.workdir)
     workdir.mkdir(parents=True, exist_ok=True)
@@ -317,7 +540,9 @@ def orchestrate(args: argparse.Namespace):
         os.chmod(tmpdir, 0o700)
     except Exception as exc:
         raise OrchestratorError(f"chmod tmpdir failed: {exc}") from exc
-    pipe_bundle = _setup_pipes(tmpdir, args.pipe_mode)
+    pipe_bundle = _setup_pipes(tmpdir, args.pipe_mode,
+                               int(cfg.get("pipeSizeBytes", 0)),
+                               int(cfg.get("transcriptBytes", 0)))
     pipe_mode = pipe_bundle["mode"]
     keep_fds = pipe_bundle["keep_fds"]
     kick_student_fd = pipe_bundle.get("kick_student")
@@ -381,7 +606,7 @@ def orchestrate(args: argparse.Namespace):
     env_student = os.environ.copy()
     env_teacher = os.environ.copy()
     # ensure writeable cwd
-    env_student["PWD"] = "/src"  # keep in sync with student cwd
+    env_student["PWD"] = str(student_dir)  # keep in sync with student cwd
     env_teacher["PWD"] = str(teacher_dir)
     env_student["SANDBOX_UID"] = str(student_uid)
     env_student["SANDBOX_GID"] = str(sandbox_gid)
@@ -427,7 +652,7 @@ def orchestrate(args: argparse.Namespace):
         def start_student():
             procs["student"] = subprocess.Popen(
                 commands["student"],
-                cwd=Path("/src"),
+                cwd=student_dir,
                 env=env_student,
                 pass_fds=keep_fds,
             )
@@ -465,30 +690,7 @@ def orchestrate(args: argparse.Namespace):
                                                     exc)
         keep_fds = []
 
-        while time.time() < deadline:
-            all_done = True
-            for proc in procs.values():
-                if proc.poll() is None:
-                    all_done = False
-            # If student already exited while teacher still waits on FIFO, send newline to unblock.
-            if (kick_dup is not None and "student" in procs
-                    and procs["student"].poll() is not None
-                    and procs.get("teacher")
-                    and procs["teacher"].poll() is None):
-                try:
-                    os.write(kick_dup, b"\n")
-                except Exception as exc:
-                    logging.getLogger(__name__).warning(
-                        "kick write failed: %s", exc)
-                try:
-                    os.close(kick_dup)
-                except Exception as exc:
-                    logging.getLogger(__name__).warning(
-                        "kick close failed: %s", exc)
-                kick_dup = None
-            if all_done:
-                break
-            time.sleep(0.05)
+        kick_dup = _supervise(procs, deadline, kick_dup)
         for proc in procs.values():
             if proc.poll() is None:
                 try:
@@ -568,7 +770,7 @@ def orchestrate(args: argparse.Namespace):
         "teacher").returncode if "teacher" in procs else -1
     student_exit = procs.get(
         "student").returncode if "student" in procs else -1
-    return {
+    result = {
         "Status": final_status,
         "Stdout": "",
         "Stderr": message,
@@ -583,6 +785,12 @@ def orchestrate(args: argparse.Namespace):
         "studentResult": student_result["raw"],
         "teacherResult": teacher_result["raw"],
     }
+    if pipe_bundle.get("pipe_capacity"):
+        result["pipeCapacity"] = pipe_bundle["pipe_capacity"]
+    if pipe_bundle.get("transcripts"):
+        result["transcript"] = _collect_transcripts(
+            pipe_bundle["transcripts"], pipe_bundle["relay_threads"])
+    return result
 
 
 def parse_args() -> argparse.Namespace:
@@ -611,16 +819,35 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--pipe-mode",
-        choices=("auto", "fifo", "devfd"),
+        choices=("auto", "fifo", "devfd", "largepipe"),
         default="auto",
-        help="Preferred pipe mode; auto tries fifo then devfd fallback.",
+        help=
+        "Preferred pipe mode; auto tries fifo then devfd fallback, largepipe is "
+        "devfd with enlarged pipe buffers.",
+    )
+    parser.add_argument(
+        "--cases",
+        help=
+        "Batch mode: JSON list of {caseNo, teacherDir, studentDir, casePath}; "
+        "prints {\"cases\": {caseNo: result}}.",
     )
     return parser.parse_args()
 
 
-def main():
-    args = parse_args()
-    result = {}
+def _case_failure(pipe_mode: str, message: str) -> dict:
+    return {
+        "Status": "CE",
+        "Stdout": "",
+        "Stderr": f"interactive orchestrator failed: {message}",
+        "Duration": -1,
+        "MemUsage": -1,
+        "DockerExitCode": 1,
+        "pipeMode": pipe_mode,
+    }
+
+
+def run_case(args: argparse.Namespace) -> dict:
+    """Run one teacher/student pair, never raises."""
     pipe_mode = args.pipe_mode
     try:
         if pipe_mode == "auto":
@@ -628,26 +855,132 @@ def main():
             for mode in ("devfd", "fifo"):
                 try:
                     args.pipe_mode = mode
-                    result = orchestrate(args)
-                    break
+                    return orchestrate(args)
                 except Exception as exc:
                     last_exc = exc
-            else:
-                raise OrchestratorError(
-                    f"failed to establish pipe (devfd/fifo); last error: {last_exc}"
-                )
-        else:
-            result = orchestrate(args)
+            raise OrchestratorError(
+                f"failed to establish pipe (devfd/fifo); last error: {last_exc}"
+            )
+        return orchestrate(args)
     except Exception as exc:
-        result = {
-            "Status": "CE",
-            "Stdout": "",
-            "Stderr": f"interactive orchestrator failed: {exc}",
-            "Duration": -1,
-            "MemUsage": -1,
-            "DockerExitCode": 1,
-            "pipeMode": args.pipe_mode,
-        }
+        return _case_failure(args.pipe_mode, str(exc))
+
+
+def _set_case_visible(case: dict, visible: bool):
+    """
+    Open or close the container dirs holding the mounts of a batch case
+    (/cases/<caseNo>). They are created by docker and owned by root, so
+    while closed the sandbox uids cannot reach the case's files whatever
+    their own permissions are.
+    """
+    for root in {
+            Path(case["studentDir"]).parent,
+            Path(case["teacherDir"]).parent,
+    }:
+        os.chmod(root, 0o755 if visible else 0o700)
+
+
+def _sandbox_pids(uids: set) -> List[int]:
+    pids = []
+    for entry in PROC_ROOT.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            status = (entry / "status").read_text()
+        except OSError:
+            continue
+        fields = dict(
+            line.split(":", 1) for line in status.splitlines() if ":" in line)
+        # zombies are harmless and cannot be killed
+        if fields.get("State", "").strip().startswith("Z"):
+            continue
+        if uids & {int(uid) for uid in fields.get("Uid", "").split()}:
+            pids.append(int(entry.name))
+    return pids
+
+
+def _kill_sandbox_processes(uids: set):
+    """SIGKILL whatever still runs as a sandbox uid, e.g. detached children."""
+    for _ in range(20):
+        pids = _sandbox_pids(uids)
+        if not pids:
+            return
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        time.sleep(0.05)
+    raise OrchestratorError("sandbox processes survived SIGKILL")
+
+
+def _clear_scratch():
+    for path in SCRATCH_DIRS:
+        if not path.is_dir():
+            continue
+        for entry in path.iterdir():
+            if entry.is_dir() and not entry.is_symlink():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink()
+
+
+def _reset_between_cases(cfg: dict):
+    _kill_sandbox_processes(
+        {int(cfg.get("teacherUid", 1450)),
+         int(cfg.get("studentUid", 1451))})
+    _clear_scratch()
+
+
+def run_batch(args: argparse.Namespace) -> dict:
+    """
+    Run the cases listed in `--cases` one after another. Every case gets its
+    own workdir, FIFOs and sandbox processes, exactly as a single case run.
+
+    All cases are mounted from the start, so every case dir is closed
+    before the first case runs and only the running case is opened. After
+    each case the processes left by the sandbox uids are killed and the
+    scratch dirs are cleared, so nothing carries over to the next case. If
+    that cannot be guaranteed, the remaining cases fail instead of running.
+    """
+    cases = json.loads(args.cases)
+    cfg = load_config()
+    results = {}
+    isolation_error = None
+    try:
+        for case in cases:
+            _set_case_visible(case, False)
+    except OSError as exc:
+        isolation_error = f"failed to isolate batch cases: {exc}"
+    for case in cases:
+        if isolation_error is not None:
+            results[case["caseNo"]] = _case_failure(args.pipe_mode,
+                                                    isolation_error)
+            continue
+        case_args = argparse.Namespace(**vars(args))
+        case_args.cases = None
+        case_args.workdir = str(Path(args.workdir) / case["caseNo"])
+        case_args.teacher_dir = case["teacherDir"]
+        case_args.student_dir = case["studentDir"]
+        case_args.case_path = case.get("casePath")
+        try:
+            _set_case_visible(case, True)
+            results[case["caseNo"]] = run_case(case_args)
+        except OSError as exc:
+            results[case["caseNo"]] = _case_failure(
+                args.pipe_mode, f"failed to open batch case: {exc}")
+        finally:
+            try:
+                _reset_between_cases(cfg)
+                _set_case_visible(case, False)
+            except (OSError, OrchestratorError) as exc:
+                isolation_error = f"failed to reset between cases: {exc}"
+    return {"cases": results}
+
+
+def main():
+    args = parse_args()
+    result = run_batch(args) if args.cases else run_case(args)
     print(json.dumps(result, ensure_ascii=False))
 
 
@@ -4,9 +4,10 @@ import json
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import docker  # type: ignore
+from dispatcher import docker_labels
 from runner.path_utils import PathTranslator
 
 
@@ -27,13 +28,6 @@ class InteractiveRunner:
 
     def run(self) -> dict:
         translator = PathTranslator()
-        cfg = translator.cfg
-        docker_url = cfg.get("docker_url", "unix://var/run/docker.sock")
-        interactive_image = cfg.get("interactive_image") or cfg["image"][
-            self.lang_key]
-
-        submission_root = translator.working_dir / self.submission_id
-        host_root = translator.host_root
         if self.case_dir is None:
             raise ValueError("case_dir is required for interactive run")
         student_dir = self.case_dir
@@ -47,30 +41,124 @@ class InteractiveRunner:
         if not teacher_dir.exists():
             raise ValueError(
                 f"interactive teacher_case_dir missing: {teacher_dir}")
-        submission_root_host = translator.to_host(submission_root)
-        teacher_dir_host = translator.to_host(teacher_dir)
-        student_dir_host = translator.to_host(student_dir)
-        if self.teacher_lang_key is None:
-            raise ValueError(
-                "teacher_lang_key is required for interactive mode")
-        teacher_lang_key = self.teacher_lang_key
-
-        client = docker.APIClient(base_url=docker_url)
         # No longer mount testcase/ separately - testcase.in is in teacher_case_dir
         binds = {
-            str(student_dir_host): {
+            str(translator.to_host(student_dir)): {
                 "bind": "/src",
                 "mode": "rw"
             },
-            str(teacher_dir_host): {
+            str(translator.to_host(teacher_dir)): {
                 "bind": "/teacher",
                 "mode": "rw"
             },
-            str(host_root): {
+        }
+        # testcase.in is now in teacher_case_dir, mounted at /teacher
+        command = self._command() + [
+            "--teacher-dir",
+            "/teacher",
+            "--student-dir",
+            "/src",
+            "--case-path",
+            "/teacher/testcase.in",
+        ]
+        status_code, logs = self._run_container(translator, binds, command)
+        try:
+            payload = json.loads(logs.strip().splitlines()[-1])
+        except Exception:
+            payload = self._failure(status_code, logs)
+        payload.setdefault("DockerExitCode", status_code)
+        return payload
+
+    def run_batch(self, cases: List[Tuple[str, Path,
+                                          Path]]) -> Dict[str, dict]:
+        """
+        Run several cases with the same limits in one orchestrator container.
+        `cases` holds (case_no, student case dir, teacher case dir); the
+        orchestrator runs them one after another, each with fresh pipes and
+        sandbox processes, and keeps every case but the running one out of
+        reach of the sandbox uids (see orchestrator `run_batch`). Returns
+        case_no -> result, like `run` per case.
+        """
+        translator = PathTranslator()
+        binds = {}
+        manifest = []
+        for case_no, student_dir, teacher_dir in cases:
+            for path in (student_dir, teacher_dir):
+                if not path.exists():
+                    raise ValueError(f"interactive case dir missing: {path}")
+            case_root = f"/cases/{case_no}"
+            binds[str(translator.to_host(student_dir))] = {
+                "bind": f"{case_root}/src",
+                "mode": "rw",
+            }
+            binds[str(translator.to_host(teacher_dir))] = {
+                "bind": f"{case_root}/teacher",
+                "mode": "rw",
+            }
+            manifest.append({
+                "caseNo": case_no,
+                "studentDir": f"{case_root}/src",
+                "teacherDir": f"{case_root}/teacher",
+                "casePath": f"{case_root}/teacher/testcase.in",
+            })
+        command = self._command() + ["--cases", json.dumps(manifest)]
+        status_code, logs = self._run_container(translator, binds, command)
+        try:
+            results = json.loads(logs.strip().splitlines()[-1])["cases"]
+        except Exception:
+            results = {}
+        payloads = {}
+        for case_no, _, _ in cases:
+            payload = results.get(case_no) or self._failure(status_code, logs)
+            payload.setdefault("DockerExitCode", status_code)
+            payloads[case_no] = payload
+        return payloads
+
+    def _command(self) -> List[str]:
+        if self.teacher_lang_key is None:
+            raise ValueError(
+                "teacher_lang_key is required for interactive mode")
+        command = [
+            "/usr/bin/env",
+            "python3",
+            "/app/runner/interactive_orchestrator.py",
+            "--workdir",
+            "/workspace",
+            "--student-lang",
+            self.lang_key,
+            "--teacher-lang",
+            self.teacher_lang_key or self.lang_key,
+            "--time-limit",
+            str(self.time_limit),
+            "--mem-limit",
+            str(self.mem_limit),
+            "--pipe-mode",
+            self.pipe_mode,
+        ]
+        allow_network_access = "1" if self.network_mode and self.network_mode != "none" else "0"
+        if self.teacher_first:
+            command.append("--teacher-first")
+        if self.student_allow_write:
+            command += ["--allow-write-student", "1"]
+        else:
+            command += ["--allow-write-student", "0"]
+        command += ["--allow-network-access", allow_network_access]
+        return command
+
+    def _run_container(self, translator: PathTranslator, binds: dict,
+                       command: List[str]) -> Tuple[int, str]:
+        cfg = translator.cfg
+        docker_url = cfg.get("docker_url", "unix://var/run/docker.sock")
+        interactive_image = cfg.get("interactive_image") or cfg["image"][
+            self.lang_key]
+        binds = {
+            **binds,
+            str(translator.host_root): {
                 "bind": "/app",
                 "mode": "ro"
             },
         }
+        client = docker.APIClient(base_url=docker_url)
 
         # network settings - same logic as sandbox.py
         is_net_disabled = self.network_mode == "none"
@@ -106,41 +194,6 @@ class InteractiveRunner:
             )
             networking_config = None
 
-        # testcase.in is now in teacher_case_dir, mounted at /teacher
-        case_path_container = "/teacher/testcase.in"
-
-        command = [
-            "/usr/bin/env",
-            "python3",
-            "/app/runner/interactive_orchestrator.py",
-            "--workdir",
-            "/workspace",
-            "--teacher-dir",
-            "/teacher",
-            "--student-dir",
-            "/src",
-            "--student-lang",
-            self.lang_key,
-            "--teacher-lang",
-            self.teacher_lang_key or self.lang_key,
-            "--time-limit",
-            str(self.time_limit),
-            "--mem-limit",
-            str(self.mem_limit),
-            "--pipe-mode",
-            self.pipe_mode,
-        ]
-        allow_network_access = "1" if self.network_mode and self.network_mode != "none" else "0"
-        if self.teacher_first:
-            command.append("--teacher-first")
-        if case_path_container:
-            command += ["--case-path", case_path_container]
-        if self.student_allow_write:
-            command += ["--allow-write-student", "1"]
-        else:
-            command += ["--allow-write-student", "0"]
-        command += ["--allow-network-access", allow_network_access]
-
         env = {}
         for key in ("KEEP_INTERACTIVE_TMP", "KEEP_INTERACTIVE_SUBMISSIONS"):
             if key in os.environ:
@@ -153,6 +206,8 @@ class InteractiveRunner:
             host_config=host_config,
             networking_config=networking_config,
             environment=env or None,
+            labels=docker_labels.labels(self.submission_id,
+                                        docker_labels.ROLE_INTERACTIVE),
         )
         try:
             client.start(container)
@@ -164,19 +219,16 @@ class InteractiveRunner:
                 client.remove_container(container, v=True, force=True)
             except Exception:
                 pass
+        return exit_status.get("StatusCode", 1), logs
 
-        status_code = exit_status.get("StatusCode", 1)
-        try:
-            payload = json.loads(logs.strip().splitlines()[-1])
-        except Exception:
-            payload = {
-                "Status": "JE",
-                "Stdout": "",
-                "Stderr": f"interactive runner failed: {logs}",
-                "Duration": -1,
-                "MemUsage": -1,
-                "DockerExitCode": status_code,
-                "pipeMode": "unknown",
-            }
-        payload.setdefault("DockerExitCode", status_code)
-        return payload
+    @staticmethod
+    def _failure(status_code: int, logs: str) -> dict:
+        return {
+            "Status": "JE",
+            "Stdout": "",
+            "Stderr": f"interactive runner failed: {logs}",
+            "Duration": -1,
+            "MemUsage": -1,
+            "DockerExitCode": status_code,
+            "pipeMode": "unknown",
+        }
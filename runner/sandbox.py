@@ -1,5 +1,7 @@
+import io
 import json
 import logging
+import shutil
 import tarfile
 import tempfile
 import os
@@ -8,6 +10,11 @@ from io import BytesIO
 from typing import Optional
 import docker
 
+from dispatcher import docker_labels
+
+# stdout streamed to a file is only kept in the result as a preview
+STDOUT_PREVIEW_BYTES = 4096
+
 
 class JudgeError(Exception):
     pass
@@ -38,6 +45,8 @@ class Sandbox:
         stdin_path: Optional[str] = None,
         allow_write: bool = False,
         network_mode: str = "none",
+        submission_id: Optional[str] = None,
+        stdout_path: Optional[str] = None,
     ):
         with open(".config/submission.json") as f:
             config = json.load(f)
@@ -50,6 +59,10 @@ class Sandbox:
         self.compile_need = compile_need
         self.allow_write = allow_write
         self.network_mode = network_mode
+        self.submission_id = submission_id
+        # stream the program's stdout to this file for custom checkers,
+        # Stdout of the result is then only a preview
+        self.stdout_path = stdout_path
         self.client = docker.APIClient(base_url=config["docker_url"])
 
     def run(self):
@@ -147,6 +160,9 @@ class Sandbox:
             networking_config=networking_config,
             environment={"SANDBOX_ALLOW_WRITE": "1"}
             if self.allow_write else None,
+            labels=docker_labels.labels(
+                self.submission_id, docker_labels.ROLE_BUILD
+                if self.compile_need else docker_labels.ROLE_SANDBOX),
         )
 
         if container.get("Warning"):
@@ -170,11 +186,19 @@ class Sandbox:
                 path="/result/",
                 filename="result",
             ).split("\n")
-            stdout = self.get(
-                container=container,
-                path="/result/",
-                filename="stdout",
-            )
+            if self.stdout_path:
+                stdout = self.save(
+                    container=container,
+                    path="/result/",
+                    filename="stdout",
+                    dest=self.stdout_path,
+                )
+            else:
+                stdout = self.get(
+                    container=container,
+                    path="/result/",
+                    filename="stdout",
+                )
             stderr = self.get(
                 container=container,
                 path="/result/",
@@ -210,3 +234,44 @@ class Sandbox:
             ) as f:
                 contents = f.read()
         return contents
+
+    def save(self, container, path, filename, dest):
+        """
+        Stream `filename` out of the container into `dest` without holding
+        the archive in memory, and return the first STDOUT_PREVIEW_BYTES of
+        it for display.
+        """
+        bits, _ = self.client.get_archive(container, f"{path}{filename}")
+        with tarfile.open(fileobj=_ChunkStream(bits), mode="r|") as tar:
+            for member in tar:
+                if member.name != filename:
+                    continue
+                with tar.extractfile(member) as src, open(dest, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                break
+            else:
+                raise FileNotFoundError(f"{path}{filename}")
+        with open(dest, "rb") as f:
+            return f.read(STDOUT_PREVIEW_BYTES).decode(errors="ignore")
+
+
+class _ChunkStream(io.RawIOBase):
+    """Readable file over the chunks yielded by get_archive."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b""
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
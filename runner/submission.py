@@ -4,6 +4,7 @@ import os
 import shutil
 from typing import Optional
 import docker
+from dispatcher import docker_labels
 from runner.sandbox import Sandbox, JudgeError
 from runner.path_utils import PathTranslator
 
@@ -63,6 +64,7 @@ class SubmissionRunner:
                 lang_id=self.lang_id[self.lang],
                 compile_need=True,
                 allow_write=False,
+                submission_id=self.submission_id,
             ).run()
         except JudgeError:
             return {"Status": "JE"}
@@ -137,7 +139,7 @@ class SubmissionRunner:
             "DockerExitCode": 1,
         }
 
-    def run(self, skip_diff: bool = False):
+    def run(self, skip_diff: bool = False, stdout_path: Optional[str] = None):
 
         def _resolve_container_path(path_str: str) -> str:
             path = pathlib.Path(path_str).expanduser()
@@ -171,6 +173,8 @@ class SubmissionRunner:
                     self.translator.to_host(self.testdata_input_path)),
                 allow_write=self.allow_write,
                 network_mode=self.network_mode,
+                submission_id=self.submission_id,
+                stdout_path=stdout_path,
             ).run()
         except JudgeError:
             return self._error_result("sandbox judge error")
@@ -186,7 +190,12 @@ class SubmissionRunner:
                 result.Status = "AC"
             else:
                 result.Status = "WA"
-                res_outs = self.strip(result.Stdout)
+                stdout = result.Stdout
+                if stdout_path:
+                    # Stdout is only a preview of the file
+                    with open(stdout_path, "r", errors="ignore") as f:
+                        stdout = f.read()
+                res_outs = self.strip(stdout)
                 ans_outputs = self.strip(ans_output)
                 if res_outs == ans_outputs:
                     result.Status = "AC"
@@ -208,6 +217,8 @@ class SubmissionRunner:
             working_dir="/src",
             network_disabled=True,
             host_config=host_config,
+            labels=docker_labels.labels(self.submission_id,
+                                        docker_labels.ROLE_BUILD),
         )
         exit_status = {"StatusCode": 1}
         stdout = ""
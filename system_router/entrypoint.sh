@@ -11,8 +11,20 @@ echo "=== Starting System Router (AI Checker) ==="
 # HARDCODED: Only Google AI API endpoints allowed
 WHITELIST_URLS="generativelanguage.googleapis.com aiplatform.googleapis.com"
 
+# The AI gateway's upstream (e.g. tools/stub_model_server.py for offline
+# load tests) is reachable as well
+UPSTREAM_HOST=""
+if [ -n "$AI_GATEWAY_UPSTREAM" ]; then
+    UPSTREAM_HOST=$(echo "$AI_GATEWAY_UPSTREAM" | sed -E 's#^[a-z]+://##; s#[:/].*$##')
+fi
+
 echo "=== 1. Resolving Whitelist Domains ==="
 RESOLVED_IPS=""
+if [[ "$UPSTREAM_HOST" =~ ^[0-9]+\.[0-9]+\.[0-9]+\.[0-9]+$ ]]; then
+    RESOLVED_IPS="$UPSTREAM_HOST"
+elif [ -n "$UPSTREAM_HOST" ]; then
+    WHITELIST_URLS="$WHITELIST_URLS $UPSTREAM_HOST"
+fi
 for url in $WHITELIST_URLS; do
     echo "Resolving domain: $url"
     ips=$(timeout 3s dig +short "$url" A || echo "")
@@ -70,6 +82,15 @@ if ! id -u nobody > /dev/null 2>&1; then
     adduser -D -u 65534 nobody || useradd -u 65534 -U -M -s /bin/false nobody
 fi
 
+# The AI gateway (runner/ai_gateway.py, mounted read-only on its own) serves the AI
+# checkers sharing this network namespace. It runs as UID 1450 so its
+# upstream calls go through the whitelist above.
+GATEWAY=/app/runner/ai_gateway.py
+if [ -f "$GATEWAY" ] && command -v python3 >/dev/null; then
+    echo "System Router is running the AI gateway (as UID 1450)..."
+    exec su-exec 1450:1450 python3 "$GATEWAY"
+fi
+
 echo "System Router is running (as user 'nobody')..."
 if command -v su-exec >/dev/null; then
     exec su-exec nobody sleep infinity
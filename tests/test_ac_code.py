@@ -0,0 +1,114 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from dispatcher import ac_code, build_cache
+from dispatcher.build_cache import BuildCache
+from dispatcher.cache_manager import CacheManager
+from dispatcher.constant import Language
+from runner.ac_code_runner import ACCodeCompileError
+
+
+@pytest.fixture
+def ac_env(monkeypatch, tmp_path):
+    """AC code of problem 1 in a fake cache, compiles recorded in `compiled`."""
+    testdata_root = tmp_path / "testdata"
+    ac_code_root = tmp_path / "ac_code" / "1"
+    env = {"language": Language.C, "checksum": "v1", "compiled": []}
+
+    def fake_ensure_ac_code(problem_id):
+        # as a refresh of ensure_ac_code, the extracted dir starts over
+        if ac_code_root.exists():
+            shutil.rmtree(ac_code_root)
+        ac_code_root.mkdir(parents=True)
+        (ac_code_root / "main.c").write_text("int main(){return 0;}")
+        if env["checksum"] is not None:
+            (ac_code_root / ".checksum").write_text(env["checksum"])
+        return ac_code_root, int(env["language"])
+
+    def fake_compile(self):
+        env["compiled"].append(Path(self.src_dir))
+        if env.get("fail"):
+            return {"Status": "CE", "Stderr": "error: boom"}
+        (Path(self.src_dir) / "teacher_main").write_bytes(
+            f"bin-{env['checksum']}".encode())
+        (Path(self.src_dir) / "main").write_bytes(
+            f"bin-{env['checksum']}".encode())
+        return {"Status": "AC"}
+
+    monkeypatch.setattr(ac_code, "ensure_ac_code", fake_ensure_ac_code)
+    monkeypatch.setattr(ac_code.ACCodeRunner, "compile", fake_compile)
+    monkeypatch.setattr(build_cache, "TESTDATA_ROOT", testdata_root)
+    manager = CacheManager(testdata_root, budget=0)
+    monkeypatch.setattr(build_cache, "get_cache_manager", lambda: manager)
+    env["builds"] = testdata_root / "1" / "ac_build"
+    env["root"] = ac_code_root
+    return env
+
+
+def test_compiled_ac_code_is_reused_across_trials(ac_env):
+    ac_code.get_ac_runner(1)
+    runner = ac_code.get_ac_runner(1)
+
+    assert len(ac_env["compiled"]) == 1
+    assert runner.src_dir == ac_env["root"]
+    assert (ac_env["root"] / "teacher_main").read_bytes() == b"bin-v1"
+    assert (ac_env["root"] / "main").read_bytes() == b"bin-v1"
+    assert len(list(ac_env["builds"].iterdir())) == 1
+    # copies, not links sharing the inode of the cached build
+    cached = next(ac_env["builds"].iterdir())
+    assert ((ac_env["root"] / "main").stat().st_ino
+            != (cached / "main").stat().st_ino)
+    assert sorted(p.name for p in cached.iterdir()) == ["main", "teacher_main"]
+
+
+def test_checksum_change_recompiles_and_drops_old_build(ac_env):
+    ac_code.get_ac_runner(1)
+    ac_env["checksum"] = "v2"
+    ac_code.get_ac_runner(1)
+
+    assert len(ac_env["compiled"]) == 2
+    assert (ac_env["root"] / "main").read_bytes() == b"bin-v2"
+    assert len(list(ac_env["builds"].iterdir())) == 1
+
+
+def test_build_key_includes_language_and_image(monkeypatch):
+    monkeypatch.setattr(build_cache, "get_submission_config",
+                        lambda: {"image": {
+                            "c11": "noj-c-cpp:1"
+                        }})
+    key = BuildCache.key("v1", "c11")
+    assert key != BuildCache.key("v2", "c11")
+    assert key != BuildCache.key("v1", "cpp17")
+    monkeypatch.setattr(build_cache, "get_submission_config",
+                        lambda: {"image": {
+                            "c11": "noj-c-cpp:2"
+                        }})
+    assert key != BuildCache.key("v1", "c11")
+
+
+def test_ac_code_without_checksum_is_not_cached(ac_env):
+    ac_env["checksum"] = None
+    ac_code.get_ac_runner(1)
+    ac_code.get_ac_runner(1)
+
+    assert len(ac_env["compiled"]) == 2
+    assert not ac_env["builds"].exists()
+
+
+def test_compile_error_is_not_cached(ac_env):
+    ac_env["fail"] = True
+    with pytest.raises(ACCodeCompileError):
+        ac_code.get_ac_runner(1)
+    ac_env["fail"] = False
+    ac_code.get_ac_runner(1)
+
+    assert len(ac_env["compiled"]) == 2
+
+
+def test_python_ac_code_is_not_compiled(ac_env):
+    ac_env["language"] = Language.PY
+    ac_code.get_ac_runner(1)
+
+    assert ac_env["compiled"] == []
@@ -0,0 +1,191 @@
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import dispatcher.testdata as testdata
+from runner import custom_checker_runner
+from runner.ai_gateway import Gateway, RateLimiter, serve
+
+
+@pytest.fixture
+def upstream():
+    # (path, api key, body, requests served at once)
+    calls = []
+    active = []
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            with lock:
+                active.append(1)
+                calls.append(
+                    (self.path, self.headers.get("x-goog-api-key"), body,
+                     len(active)))
+            time.sleep(0.1)
+            with lock:
+                active.pop()
+            status = 500 if b"fail" in body else 200
+            data = json.dumps({"echo": body.decode()}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", calls
+    server.shutdown()
+
+
+def _post(url, body, key="k1"):
+    request = urllib.request.Request(url,
+                                     data=body,
+                                     headers={"x-goog-api-key": key},
+                                     method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def test_gateway_forwards_and_caches_responses(upstream):
+    upstream_url, calls = upstream
+    gateway = Gateway(upstream_url, concurrency=2)
+    server = serve(gateway, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v1beta/models/m:generate"
+    try:
+        first = _post(url + "?key=a", b"prompt")
+        # another key asks the same: answered from the cache
+        second = _post(url + "?key=b", b"prompt", key="k2")
+        other = _post(url, b"other prompt")
+        failed = [_post(url, b"fail"), _post(url, b"fail")]
+    finally:
+        server.shutdown()
+
+    assert first == second == (200, b'{"echo": "prompt"}')
+    assert other[0] == 200
+    # errors are passed through and not cached
+    assert [status for status, _ in failed] == [500, 500]
+    assert [call[0] for call in calls] == [
+        "/v1beta/models/m:generate?key=a",
+        "/v1beta/models/m:generate",
+        "/v1beta/models/m:generate",
+        "/v1beta/models/m:generate",
+    ]
+    assert calls[0][1] == "k1"
+    stats = gateway.snapshot()
+    assert (stats["requests"], stats["upstreamCalls"],
+            stats["cacheHits"]) == (5, 4, 1)
+
+
+def test_gateway_limits_concurrency_and_shares_flights(upstream):
+    upstream_url, calls = upstream
+    gateway = Gateway(upstream_url, concurrency=2, cache_size=0)
+    bodies = [b"same"] * 4 + [b"a", b"b", b"c", b"d"]
+    threads = [
+        threading.Thread(target=gateway.handle, args=("/p", body, {}))
+        for body in bodies
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(call[3] for call in calls) <= 2
+    # the four identical requests made at most a couple of calls even with
+    # the cache disabled
+    assert len(calls) < len(bodies)
+    assert gateway.snapshot()["inflight"] == 0
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(20, burst=1)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.15
+    assert RateLimiter(0).acquire() == 0.0
+
+
+def test_checker_api_key_is_cached_until_ttl(monkeypatch):
+    calls = []
+
+    def fetch(problem_id):
+        calls.append(problem_id)
+        return {1: "key-1"}.get(problem_id)
+
+    monkeypatch.setattr(testdata, "fetch_checker_api_key", fetch)
+    monkeypatch.setattr(testdata, "_checker_key_cache", {})
+    assert testdata.get_checker_api_key(1) == "key-1"
+    assert testdata.get_checker_api_key(1) == "key-1"
+    # missing keys are asked for again
+    assert testdata.get_checker_api_key(2) is None
+    assert testdata.get_checker_api_key(2) is None
+    assert calls == [1, 2, 2]
+
+    testdata.invalidate_checker_api_key(1)
+    assert testdata.get_checker_api_key(1) == "key-1"
+    monkeypatch.setattr(testdata, "CHECKER_API_KEY_TTL", 0)
+    assert testdata.get_checker_api_key(1) == "key-1"
+    assert calls == [1, 2, 2, 1, 1]
+
+
+def test_system_router_is_shared_and_recreated(monkeypatch):
+
+    class DummyClient:
+
+        def __init__(self):
+            self.created = []
+            self.removed = []
+            self.running = True
+
+        def create_host_config(self, **kwargs):
+            return kwargs
+
+        def create_container(self, **kwargs):
+            self.created.append(kwargs)
+            return {"Id": f"router-{len(self.created)}"}
+
+        def start(self, container):
+            pass
+
+        def inspect_container(self, container_id):
+            return {"State": {"Running": self.running}}
+
+        def remove_container(self, container_id, force=True):
+            self.removed.append(container_id)
+
+    monkeypatch.setattr(custom_checker_runner, "wait_until_ready",
+                        lambda *args: {})
+    client = DummyClient()
+    router = custom_checker_runner.SystemRouter()
+
+    assert router.ensure(client) == "router-1"
+    assert router.ensure(client) == "router-1"
+    labels = client.created[0]["labels"]
+    assert labels[custom_checker_runner.docker_labels.ROLE] == (
+        custom_checker_runner.docker_labels.ROLE_CHECKER_ROUTER)
+    assert custom_checker_runner.docker_labels.SUBMISSION not in labels
+    # only the gateway script of the sandbox is visible to the router
+    binds = client.created[0]["host_config"]["binds"]
+    assert [bind["bind"]
+            for bind in binds.values()] == ["/app/runner/ai_gateway.py"]
+    assert all(bind["mode"] == "ro" for bind in binds.values())
+    assert all(host.endswith("runner/ai_gateway.py") for host in binds)
+
+    client.running = False
+    assert router.ensure(client) == "router-2"
+    assert client.removed == ["router-1"]
+    assert router.started == 2
@@ -54,7 +54,8 @@ def _patch_env(monkeypatch, tmp_path):
     from dispatcher import asset_cache
     monkeypatch.setattr(asset_cache, "TESTDATA_ROOT", tmp_path)
     dummy_redis = DummyRedis()
-    monkeypatch.setattr(asset_cache, "get_redis_client", lambda: dummy_redis)
+    monkeypatch.setattr(asset_cache, "get_coordination_backend",
+                        lambda: dummy_redis)
     return dummy_redis
 
 
@@ -74,7 +75,7 @@ def test_asset_cache_hit(monkeypatch, tmp_path):
     asset_path = asset_dir / ASSET_FILENAME_MAP["checker"]
     asset_path.write_bytes(data)
     # Redis checksum set manually
-    client = asset_cache.get_redis_client()
+    client = asset_cache.get_coordination_backend()
     client.setex("problem-1-checker-checksum", 600, checksum)
 
     result_path = ensure_custom_asset(1, "checker")
@@ -95,7 +96,7 @@ def test_asset_cache_miss_download(monkeypatch, tmp_path):
 
     result_path = ensure_custom_asset(2, "checker")
     assert result_path.read_bytes() == download_data
-    client = asset_cache.get_redis_client()
+    client = asset_cache.get_coordination_backend()
     assert client.get(
         "problem-2-checker-checksum").decode() == backend_checksum
 
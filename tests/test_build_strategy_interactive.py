@@ -4,7 +4,9 @@ import pytest
 
 from dispatcher.build_strategy import (BuildStrategyError,
                                        _ensure_single_executable,
+                                       _prepare_teacher_artifacts,
                                        prepare_make_interactive)
+from dispatcher.cache_manager import CacheManager
 from dispatcher.constant import (AcceptedFormat, BuildStrategy, ExecutionMode,
                                  Language)
 from dispatcher.meta import Meta, Task
@@ -30,6 +32,7 @@ def _meta(accepted_format: AcceptedFormat, language: Language,
 def _patch_teacher_assets(monkeypatch, tmp_path, teacher_file: str):
     teacher_asset = tmp_path / teacher_file
     teacher_asset.write_text("int main(){return 0;}")
+    compiled = []
 
     def fake_ensure(problem_id, asset_type, filename=None):
         assert asset_type == "teacher_file"
@@ -39,6 +42,7 @@ def _patch_teacher_assets(monkeypatch, tmp_path, teacher_file: str):
         out = Path(src_dir) / "teacher_main"
         out.write_bytes(b"bin")
         out.chmod(0o755)
+        compiled.append(src_dir)
         return {"Status": "AC"}
 
     monkeypatch.setattr("dispatcher.build_strategy.ensure_custom_asset",
@@ -46,6 +50,12 @@ def _patch_teacher_assets(monkeypatch, tmp_path, teacher_file: str):
     monkeypatch.setattr(
         "dispatcher.build_strategy.SubmissionRunner.compile_at_path",
         fake_compile_at_path)
+    testdata_root = tmp_path / "testdata"
+    monkeypatch.setattr("dispatcher.build_cache.TESTDATA_ROOT", testdata_root)
+    manager = CacheManager(testdata_root, budget=0)
+    monkeypatch.setattr("dispatcher.build_cache.get_cache_manager",
+                        lambda: manager)
+    return teacher_asset, compiled
 
 
 def test_prepare_make_interactive_zip_python_requires_main(
@@ -103,3 +113,45 @@ def test_ensure_single_executable_rejects_extra(tmp_path):
 
     with pytest.raises(BuildStrategyError):
         _ensure_single_executable(src_dir, allowed={"a.out"})
+
+
+def test_teacher_build_is_cached_per_problem(monkeypatch, tmp_path):
+    teacher_asset, compiled = _patch_teacher_assets(monkeypatch, tmp_path,
+                                                    "Teacher_file.c")
+    meta = _meta(AcceptedFormat.CODE, Language.C, "c", "Teacher_file.c")
+    first = tmp_path / "sub-1"
+    second = tmp_path / "sub-2"
+    _prepare_teacher_artifacts(meta, first, problem_id=1)
+    _prepare_teacher_artifacts(meta, second, problem_id=1)
+
+    assert len(compiled) == 1
+    binary = second / "teacher" / "common" / "teacher_main"
+    assert binary.read_bytes() == b"bin"
+    assert (second / "teacher" / "common" / "main").exists()
+    # copies, locking down one submission's teacher leaves the cache alone
+    cached = next((tmp_path / "testdata" / "1" / "teacher_build").iterdir())
+    assert binary.stat().st_ino != (cached / "teacher_main").stat().st_ino
+    binary.chmod(0o700)
+    (first / "teacher" / "common" / "teacher_main").chmod(0o700)
+    assert (cached / "teacher_main").stat().st_mode & 0o777 == 0o755
+
+    # a new teacher version is compiled again and replaces the old build
+    teacher_asset.write_text("int main(){return 1;}")
+    _prepare_teacher_artifacts(meta, tmp_path / "sub-3", problem_id=1)
+    assert len(compiled) == 2
+    builds = tmp_path / "testdata" / "1" / "teacher_build"
+    assert len(list(builds.iterdir())) == 1
+
+
+def test_teacher_build_cache_is_per_language(monkeypatch, tmp_path):
+    _, compiled = _patch_teacher_assets(monkeypatch, tmp_path,
+                                        "Teacher_file.c")
+    _prepare_teacher_artifacts(_meta(AcceptedFormat.CODE, Language.C, "c",
+                                     "Teacher_file.c"),
+                               tmp_path / "sub-1",
+                               problem_id=1)
+    _prepare_teacher_artifacts(_meta(AcceptedFormat.CODE, Language.C, "cpp",
+                                     "Teacher_file.c"),
+                               tmp_path / "sub-2",
+                               problem_id=1)
+    assert len(compiled) == 2
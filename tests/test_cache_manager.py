@@ -0,0 +1,144 @@
+import os
+
+import pytest
+
+from dispatcher import cache_manager
+from dispatcher.cache_manager import (
+    AC_CODE_KIND,
+    PUBLIC_KIND,
+    TESTDATA_KIND,
+    CacheManager,
+)
+
+
+class DummyRedis:
+
+    def __init__(self):
+        self.deleted = []
+
+    def delete(self, *keys):
+        self.deleted.extend(keys)
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = DummyRedis()
+    monkeypatch.setattr(cache_manager, "get_coordination_backend",
+                        lambda: client)
+    return client
+
+
+def _write(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+
+
+def test_touch_tracks_size_and_nested_artifacts(tmp_path, redis_client):
+    manager = CacheManager(tmp_path, budget=0)
+    _write(tmp_path / "1" / "0000.in", 100)
+    _write(tmp_path / "1" / "public" / "0000.in", 30)
+    manager.touch(1, PUBLIC_KIND, tmp_path / "1" / "public")
+    manager.touch(1, TESTDATA_KIND, tmp_path / "1")
+
+    stats = manager.stats()
+    assert stats["usedBytes"] == 130
+    assert stats["usedBytesByKind"] == {"testdata": 100, "public": 30}
+    assert stats["entryCount"] == 2
+
+
+def test_lru_eviction_skips_pinned_and_drops_keys(tmp_path, redis_client):
+    manager = CacheManager(tmp_path, budget=250)
+    for pid in (1, 2, 3):
+        _write(tmp_path / str(pid) / "0000.in", 100)
+    manager.pin(1)
+    manager.touch(1, TESTDATA_KIND, tmp_path / "1", refreshed=True)
+    manager.touch(2, TESTDATA_KIND, tmp_path / "2", refreshed=True)
+    # third problem exceeds the budget, 1 is pinned so 2 goes
+    manager.touch(3, TESTDATA_KIND, tmp_path / "3", refreshed=True)
+
+    assert (tmp_path / "1" / "0000.in").exists()
+    assert not (tmp_path / "2" / "0000.in").exists()
+    assert (tmp_path / "3" / "0000.in").exists()
+    assert redis_client.deleted == ["problem-2-checksum"]
+    stats = manager.stats()
+    assert stats["evictions"] == 1
+    assert stats["evictedBytes"] == 100
+    assert stats["pinnedProblems"] == [1]
+
+
+def test_failed_eviction_is_not_counted(tmp_path, redis_client):
+    manager = CacheManager(tmp_path, budget=0)
+    for pid in (1, 2, 3):
+        _write(tmp_path / str(pid) / "0000.in", 100)
+        manager.touch(pid, TESTDATA_KIND, tmp_path / str(pid))
+
+    def delete(*keys):
+        if "problem-1-checksum" in keys:
+            raise ConnectionError("backend down")
+        redis_client.deleted.extend(keys)
+
+    redis_client.delete = delete
+    manager.budget = 150
+    evicted = manager.enforce_budget()
+
+    # 1 could not be dropped, so 2 and 3 had to go to fit the budget
+    assert [e.problem_id for e in evicted] == [2, 3]
+    assert (tmp_path / "1" / "0000.in").exists()
+    assert (TESTDATA_KIND, "1") in manager.entries
+    stats = manager.stats()
+    assert stats["evictions"] == 2
+    assert stats["evictedBytes"] == 200
+    assert stats["usedBytes"] == 100
+
+
+def test_evicting_testdata_keeps_nested_artifacts(tmp_path, redis_client):
+    manager = CacheManager(tmp_path, budget=1)
+    _write(tmp_path / "1" / "0000.in", 100)
+    _write(tmp_path / "1" / "public" / "0000.in", 10)
+    manager.pin(1)
+    manager.touch(1, PUBLIC_KIND, tmp_path / "1" / "public")
+    manager.touch(1, TESTDATA_KIND, tmp_path / "1")
+    manager.unpin(1)
+
+    manager.entries[(PUBLIC_KIND, "1")].last_access += 10
+    manager.budget = 50
+    manager.enforce_budget()
+
+    assert not (tmp_path / "1" / "0000.in").exists()
+    assert (tmp_path / "1" / "public" / "0000.in").exists()
+    assert redis_client.deleted == ["problem-1-checksum"]
+
+
+def test_pinned_context_is_reentrant(tmp_path):
+    manager = CacheManager(tmp_path, budget=0)
+    with manager.pinned(5):
+        with manager.pinned(5):
+            assert manager.pins[5] == 2
+        assert manager.pins[5] == 1
+    assert manager.pins == {}
+
+
+def test_scan_registers_existing_artifacts(tmp_path):
+    _write(tmp_path / "7" / "0000.in", 10)
+    _write(tmp_path / "7" / "checker" / "custom_checker.py", 20)
+    _write(tmp_path / "ac_code" / "7" / "main.py", 5)
+    _write(tmp_path / "7" / "ac_build" / "0123abcd" / "teacher_main", 3)
+    _write(tmp_path / "trial" / "sub-1" / "0000.in", 1)
+    os.utime(tmp_path / "7", (1, 1))
+    manager = CacheManager(tmp_path, budget=0)
+    manager.scan()
+
+    assert manager.entries[(TESTDATA_KIND, "7")].size == 10
+    assert manager.entries[(TESTDATA_KIND, "7")].last_access == 1
+    assert manager.entries[("checker", "7")].size == 20
+    assert manager.entries[(AC_CODE_KIND, "7")].size == 5
+    assert manager.entries[("ac_build", "7")].size == 3
+    assert manager.entries[("trial", "sub-1")].problem_id is None
+    # build caches and each asset type are reported on their own
+    assert manager.stats()["usedBytesByKind"] == {
+        "testdata": 10,
+        "checker": 20,
+        "ac_code": 5,
+        "ac_build": 3,
+        "trial": 1,
+    }
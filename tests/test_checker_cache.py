@@ -0,0 +1,189 @@
+from pathlib import Path
+
+from dispatcher.checker_cache import CheckerVerdictCache
+from dispatcher.custom_checker import run_custom_checker_case
+
+
+def _case(tmp_path, checker_source="print('STATUS: AC')"):
+    checker = tmp_path / "checker" / "custom_checker.py"
+    checker.parent.mkdir(parents=True, exist_ok=True)
+    checker.write_text(checker_source)
+    case_in = tmp_path / "0000.in"
+    case_ans = tmp_path / "0000.out"
+    case_in.write_text("1 2\n")
+    case_ans.write_text("3\n")
+    return checker, case_in, case_ans
+
+
+def test_key_depends_on_every_input(tmp_path):
+    checker, case_in, case_ans = _case(tmp_path)
+    digest = CheckerVerdictCache.checker_digest(checker)
+    key = CheckerVerdictCache.make_key(1, digest, case_in, case_ans, [b"3\n"])
+
+    assert CheckerVerdictCache.make_key(1, digest, case_in, case_ans,
+                                        [b"3", b"\n"]) == key
+    assert CheckerVerdictCache.make_key(2, digest, case_in, case_ans,
+                                        [b"3\n"]) != key
+    assert CheckerVerdictCache.make_key(1, digest, case_in, case_ans,
+                                        [b"4\n"]) != key
+    assert CheckerVerdictCache.make_key(1, digest, case_ans, case_in,
+                                        [b"3\n"]) != key
+    checker.write_text("print('STATUS: WA')")
+    assert CheckerVerdictCache.make_key(
+        1, CheckerVerdictCache.checker_digest(checker), case_in, case_ans,
+        [b"3\n"]) != key
+
+
+def test_key_depends_on_mounted_case_dirs(tmp_path):
+    checker, case_in, case_ans = _case(tmp_path)
+    digest = CheckerVerdictCache.checker_digest(checker)
+    student = tmp_path / "student"
+    student.mkdir()
+
+    def key():
+        return CheckerVerdictCache.make_key(1, digest, case_in, case_ans,
+                                            [b"3\n"], (student, None))
+
+    empty = key()
+    (student / "result.txt").write_text("3")
+    written = key()
+    assert written != empty
+    (student / "result.txt").write_text("4")
+    assert key() != written
+    (student / "result.txt").unlink()
+    (student / "result.txt").symlink_to("/etc/passwd")
+    assert key() not in (empty, written)
+
+
+def test_nondeterministic_checker_has_no_digest(tmp_path):
+    checker, _, _ = _case(tmp_path,
+                          "# noj: nondeterministic\nprint('STATUS: AC')")
+    assert CheckerVerdictCache.checker_digest(checker) is None
+
+
+def test_lru_eviction_and_stats():
+    cache = CheckerVerdictCache(2)
+    cache.put("a", "AC", "")
+    cache.put("b", "WA", "off by one")
+    # judge errors may be transient and are not kept
+    cache.put("je", "JE", "custom checker timed out")
+    assert cache.get("a") == ("AC", "")
+    cache.put("c", "AC", "")
+
+    assert cache.get("b") is None
+    assert cache.get("je") is None
+    assert cache.get("c") == ("AC", "")
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"],
+            stats["evictions"]) == (2, 2, 2, 1)
+
+
+def _run(monkeypatch,
+         tmp_path,
+         cache,
+         runs,
+         checker_source,
+         ai=None,
+         student_workdir=None):
+    checker, case_in, case_ans = _case(tmp_path, checker_source)
+
+    class DummyTranslator:
+
+        def to_host(self, path):
+            return Path(path)
+
+    class DummyRunner:
+
+        def __init__(self, **kwargs):
+            pass
+
+        def run(self):
+            runs.append(1)
+            return {
+                "stdout": "STATUS: WA\nMESSAGE: expected 3\n",
+                "exit_code": 0,
+                "stderr": ""
+            }
+
+    monkeypatch.setattr("dispatcher.custom_checker.PathTranslator",
+                        DummyTranslator)
+    monkeypatch.setattr("dispatcher.custom_checker.CustomCheckerRunner",
+                        DummyRunner)
+    monkeypatch.setattr("dispatcher.testdata.fetch_checker_api_key",
+                        lambda pid: None)
+    return run_custom_checker_case(
+        submission_id="sub-1",
+        case_no="0000",
+        checker_path=checker,
+        case_in_path=case_in,
+        case_ans_path=case_ans,
+        student_output="4\n",
+        time_limit_ms=1000,
+        mem_limit_kb=1024,
+        image="dummy",
+        docker_url="unix://dummy",
+        student_workdir=student_workdir,
+        ai_checker_config=ai,
+        problem_id=7,
+        verdict_cache=cache,
+    )
+
+
+def test_run_custom_checker_case_reuses_cached_verdict(monkeypatch, tmp_path):
+    cache = CheckerVerdictCache(16)
+    runs = []
+    first = _run(monkeypatch, tmp_path, cache, runs, "print()")
+    second = _run(monkeypatch, tmp_path, cache, runs, "print()")
+
+    assert len(runs) == 1
+    assert (first["status"], first["message"]) == ("WA", "expected 3")
+    assert (second["status"], second["message"]) == ("WA", "expected 3")
+    assert second["cached"] is True
+    assert cache.stats()["hits"] == 1
+
+
+def test_run_custom_checker_case_skips_ai_and_nondeterministic_checkers(
+        monkeypatch, tmp_path):
+    cache = CheckerVerdictCache(16)
+    runs = []
+    for _ in range(2):
+        _run(monkeypatch, tmp_path, cache, runs,
+             "import random  # noj: nondeterministic")
+        _run(monkeypatch,
+             tmp_path,
+             cache,
+             runs,
+             "print()",
+             ai={
+                 "enabled": True,
+                 "model": "m"
+             })
+
+    assert len(runs) == 4
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["skipped"]) == (0, 0, 4)
+
+
+def test_run_custom_checker_case_keys_on_files_written_by_student(
+        monkeypatch, tmp_path):
+    cache = CheckerVerdictCache(16)
+    runs = []
+    student = tmp_path / "student"
+    student.mkdir()
+    (student / "answer.txt").write_text("3")
+    _run(monkeypatch,
+         tmp_path,
+         cache,
+         runs,
+         "print()",
+         student_workdir=student)
+    (student / "answer.txt").write_text("4")
+    second = _run(monkeypatch,
+                  tmp_path,
+                  cache,
+                  runs,
+                  "print()",
+                  student_workdir=student)
+
+    assert len(runs) == 2
+    assert "cached" not in second
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from dispatcher import coordination
+from dispatcher.coordination import (
+    CoordinationBackendError,
+    FileLockBackend,
+    InProcessBackend,
+    create_coordination_backend,
+)
+
+
+@pytest.fixture(params=["memory", "file"])
+def backend(request, tmp_path):
+    return create_coordination_backend(request.param, tmp_path / "coord")
+
+
+def test_values_round_trip_as_bytes(backend):
+    assert backend.get("problem-1-checksum") is None
+    backend.setex("problem-1-checksum", 600, "abc")
+    assert backend.get("problem-1-checksum") == b"abc"
+    assert backend.delete("problem-1-checksum", "missing") == 1
+    assert backend.get("problem-1-checksum") is None
+
+
+def test_values_expire(backend, monkeypatch):
+    backend.setex("k", 10, b"v")
+    now = time.time() + 11
+    monotonic = time.monotonic() + 11
+    monkeypatch.setattr(coordination.time, "time", lambda: now)
+    monkeypatch.setattr(coordination.time, "monotonic", lambda: monotonic)
+    assert backend.get("k") is None
+
+
+def test_lock_is_exclusive_between_threads(backend):
+    inside = []
+    overlap = []
+
+    def worker():
+        for _ in range(20):
+            with backend.lock("problem-1-checksum-lock", timeout=60):
+                inside.append(1)
+                if len(inside) > 1:
+                    overlap.append(1)
+                time.sleep(0.001)
+                inside.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert overlap == []
+
+
+def test_file_backend_shares_state_between_instances(tmp_path):
+    first = FileLockBackend(tmp_path)
+    second = FileLockBackend(tmp_path)
+    first.setex("problem-2-public-checksum", 600, "xyz")
+    assert second.get("problem-2-public-checksum") == b"xyz"
+
+
+def test_unknown_backend():
+    with pytest.raises(CoordinationBackendError):
+        create_coordination_backend("etcd")
+
+
+def test_local_backend_is_singleton(monkeypatch):
+    monkeypatch.setattr(coordination, "COORDINATION_BACKEND", "memory")
+    monkeypatch.setattr(coordination, "_backend", None)
+    backend = coordination.get_coordination_backend()
+    assert isinstance(backend, InProcessBackend)
+    assert coordination.get_coordination_backend() is backend
@@ -1,6 +1,14 @@
+import io
+import json
+import time
 from pathlib import Path
 
+import pytest
+
+from dispatcher import custom_checker
 from dispatcher.custom_checker import _parse_checker_output, run_custom_checker_case
+from runner import checker_worker, custom_checker_runner
+from runner.custom_checker_runner import CheckerWorkerError
 
 
 def test_parse_checker_output_accepts_ac():
@@ -74,3 +82,275 @@ def test_run_custom_checker_case_ai_env(monkeypatch, tmp_path):
     assert captured["env"]["AI_API_KEY"] == "key-123"
     assert captured["env"]["AI_MODEL"] == "fake-model"
     assert captured["enable_ai_network"] is True
+
+
+CHECKER_SOURCE = """
+import os, sys, time
+inp, out, ans = sys.argv[1:]
+if open(inp).read() == "sleep":
+    time.sleep(30)
+with open(os.environ["CHECK_TMP"] + "/scratch", "w") as f:
+    f.write("x")
+ok = open(out).read().split() == open(ans).read().split()
+print("STATUS: " + ("AC" if ok else "WA"))
+print("MESSAGE: " + os.path.basename(os.getcwd()) + " "
+      + open("student/main.out").read())
+"""
+
+
+def _worker_case(work, case_no, given, expected):
+    case_dir = work / case_no
+    case_dir.mkdir(parents=True)
+    (case_dir / "custom_checker.py").write_text(CHECKER_SOURCE)
+    (case_dir / "input.in").write_text(given)
+    (case_dir / "student.out").write_text(expected)
+    (case_dir / "answer.out").write_text("1 2\n")
+    return case_dir
+
+
+def test_checker_worker_serves_cases_in_one_process(monkeypatch, tmp_path):
+    work = tmp_path / "work"
+    student = tmp_path / "student"
+    student.mkdir()
+    (student / "main.out").write_text("from-student")
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    monkeypatch.setenv("CHECK_TMP", str(scratch))
+    requests = []
+    for case_no, given, output in [("0000", "1", "1 2"), ("0001", "1", "2"),
+                                   ("0002", "sleep", "")]:
+        requests.append({
+            "caseNo": case_no,
+            "dir": str(_worker_case(work, case_no, given, output)),
+            "student": str(student),
+            "timeoutSec": 1,
+        })
+    stdin = io.StringIO("".join(json.dumps(r) + "\n" for r in requests))
+    stdout = io.StringIO()
+
+    start = time.monotonic()
+    checker_worker.serve(stdin, stdout, tmp_path / "workspace", scratch)
+    assert time.monotonic() - start < 20
+
+    replies = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [r["caseNo"] for r in replies] == ["0000", "0001", "0002"]
+    assert _parse_checker_output(replies[0]["stdout"]) == ("AC",
+                                                           "0000 from-student")
+    assert _parse_checker_output(replies[1]["stdout"])[0] == "WA"
+    assert replies[2]["timedOut"] is True
+    assert replies[2]["exitCode"] == 137
+    # /workspace follows the case and /tmp does not leak between cases
+    assert (tmp_path / "workspace").resolve() == work / "0002"
+    assert list(scratch.iterdir()) == []
+
+
+class FakePool:
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def run(self, submission_id, submission_path, mem_limit_kb, request,
+            timeout_sec):
+        self.calls.append((submission_id, submission_path, mem_limit_kb,
+                           request, timeout_sec))
+        if self.error:
+            raise self.error
+        return {"stdout": "STATUS: WA\nMESSAGE: off\n", "exit_code": 0}
+
+
+def _run_with_pool(monkeypatch, tmp_path, pool):
+    submission = tmp_path / "sub-1"
+    checker_path = submission / "checker" / "custom_checker.py"
+    checker_path.parent.mkdir(parents=True)
+    checker_path.write_text("print('ok')")
+    (submission / "testcase").mkdir()
+    case_in = submission / "testcase" / "0103.in"
+    case_out = submission / "testcase" / "0103.out"
+    case_in.write_text("1")
+    case_out.write_text("1")
+    stdout_path = submission / "checker" / "stdout" / "0103.out"
+    stdout_path.parent.mkdir()
+    stdout_path.write_text("1")
+    one_shot = []
+
+    class DummyRunner:
+
+        def __init__(self, **kwargs):
+            one_shot.append(kwargs)
+
+        def run(self):
+            return {"stdout": "STATUS: AC\n", "exit_code": 0, "stderr": ""}
+
+    monkeypatch.setattr("dispatcher.custom_checker.CustomCheckerRunner",
+                        DummyRunner)
+    result = run_custom_checker_case(
+        submission_id="sub-1",
+        case_no="0103",
+        checker_path=checker_path,
+        case_in_path=case_in,
+        case_ans_path=case_out,
+        student_output="1",
+        time_limit_ms=2500,
+        mem_limit_kb=65536,
+        image="dummy",
+        docker_url="unix://dummy",
+        student_workdir=submission / "src" / "cases" / "0103",
+        teacher_dir=submission / "teacher" / "cases" / "0103",
+        worker_pool=pool,
+        student_output_path=stdout_path,
+    )
+    return result, one_shot
+
+
+def test_run_custom_checker_case_uses_worker_pool(monkeypatch, tmp_path):
+    pool = FakePool()
+    result, one_shot = _run_with_pool(monkeypatch, tmp_path, pool)
+
+    assert result["status"] == "WA"
+    assert result["message"] == "off"
+    assert one_shot == []
+    submission_id, submission_path, mem, request, timeout = pool.calls[0]
+    assert (submission_id, submission_path, mem) == ("sub-1",
+                                                     tmp_path / "sub-1", 65536)
+    assert request == {
+        "caseNo": "0103",
+        "dir": "/checker-work/0103",
+        "student": "/submission/src/cases/0103",
+        "teacher": "/submission/teacher/cases/0103",
+        "files": {
+            "custom_checker.py": "/submission/checker/custom_checker.py",
+            "input.in": "/submission/testcase/0103.in",
+            "answer.out": "/submission/testcase/0103.out",
+            "student.out": "/submission/checker/stdout/0103.out",
+        },
+    }
+    # the stdout file the sandbox streamed is what the checker reads
+    assert result["bytesWritten"] == 1
+    # same time budget as the one-shot container
+    assert timeout == 15
+
+
+def test_run_custom_checker_case_mounts_inputs_read_only(
+        monkeypatch, tmp_path):
+    result, one_shot = _run_with_pool(monkeypatch, tmp_path, None)
+
+    submission = tmp_path / "sub-1"
+    assert result["status"] == "AC"
+    assert result["bytesWritten"] == 1
+    assert one_shot[0]["files"] == {
+        "custom_checker.py": str(submission / "checker" / "custom_checker.py"),
+        "input.in": str(submission / "testcase" / "0103.in"),
+        "answer.out": str(submission / "testcase" / "0103.out"),
+        "student.out": str(submission / "checker" / "stdout" / "0103.out"),
+    }
+
+
+def test_run_custom_checker_case_falls_back_when_worker_breaks(
+        monkeypatch, tmp_path):
+    pool = FakePool(CheckerWorkerError("worker exited"))
+    result, one_shot = _run_with_pool(monkeypatch, tmp_path, pool)
+
+    assert len(pool.calls) == 1
+    assert len(one_shot) == 1
+    assert result["status"] == "AC"
+
+
+def test_checker_worker_pool_reuses_workers_per_memory_limit(
+        monkeypatch, tmp_path):
+    started = []
+
+    class FakeWorker:
+
+        def __init__(self, **kwargs):
+            self.mem_limit_kb = kwargs["mem_limit_kb"]
+            self.worker_source = kwargs["worker_source"]
+            self.stopped = False
+            self.fail = False
+
+        def start(self):
+            started.append(self)
+
+        def run(self, request, timeout_sec):
+            if self.fail:
+                raise CheckerWorkerError("gone")
+            return {"stdout": "STATUS: AC\n", "exit_code": 0, "stderr": ""}
+
+        def stop(self):
+            self.stopped = True
+
+    class DummyTranslator:
+        host_root = Path("/host")
+
+        def to_host(self, path):
+            return Path(path)
+
+    monkeypatch.setattr(custom_checker, "CheckerWorker", FakeWorker)
+    monkeypatch.setattr(custom_checker, "PathTranslator", DummyTranslator)
+    pool = custom_checker.CheckerWorkerPool("dummy", "unix://dummy")
+
+    for mem in (1024, 1024, 2048):
+        pool.run("sub-1", tmp_path, mem, {}, 5)
+    assert [w.mem_limit_kb for w in started] == [1024, 2048]
+    assert started[0].worker_source == "/host/runner/checker_worker.py"
+
+    started[0].fail = True
+    with pytest.raises(CheckerWorkerError):
+        pool.run("sub-1", tmp_path, 1024, {}, 5)
+    assert started[0].stopped
+    pool.run("sub-1", tmp_path, 1024, {}, 5)
+    assert len(started) == 3
+
+    pool.release("sub-1")
+    assert all(w.stopped for w in started)
+
+
+def test_checker_worker_mounts_only_its_script(monkeypatch):
+    created = {}
+
+    class DummyClient:
+
+        def __init__(self, base_url):
+            pass
+
+        def create_host_config(self, **kwargs):
+            return kwargs
+
+        def create_container(self, **kwargs):
+            created.update(kwargs)
+            return {"Id": "worker-1"}
+
+        def attach_socket(self, container_id, params):
+            return object()
+
+        def start(self, container_id):
+            pass
+
+    monkeypatch.setattr(custom_checker_runner.docker, "APIClient", DummyClient)
+    worker = custom_checker_runner.CheckerWorker(
+        submission_id="sub-1",
+        image="dummy",
+        docker_url="unix://dummy",
+        worker_source="/host/runner/checker_worker.py",
+        submission_dir="/host/submissions/sub-1",
+        work_dir="/host/submissions/sub-1/checker/work",
+        mem_limit_kb=1024,
+    )
+    worker.start()
+
+    binds = created["host_config"]["binds"]
+    assert binds == {
+        "/host/runner/checker_worker.py": {
+            "bind": "/app/runner/checker_worker.py",
+            "mode": "ro"
+        },
+        "/host/submissions/sub-1": {
+            "bind": "/submission",
+            "mode": "ro"
+        },
+        "/host/submissions/sub-1/checker/work": {
+            "bind": "/checker-work",
+            "mode": "rw"
+        },
+    }
+    assert created["command"] == ["python3", "/app/runner/checker_worker.py"]
@@ -621,7 +621,7 @@ def test_create_container_passes_network_mode_to_submission_runner(
         def __init__(self, *args, **kwargs):
             captured.update(kwargs)
 
-        def run(self, skip_diff=False):
+        def run(self, skip_diff=False, stdout_path=None):
             return {
                 "Status": "AC",
                 "Stdout": "",
@@ -649,6 +649,81 @@ def test_create_container_passes_network_mode_to_submission_runner(
     assert captured.get("network_mode") == "container:router-1"
 
 
+def test_create_container_checks_streamed_stdout_file(monkeypatch, tmp_path):
+    monkeypatch.setattr("dispatcher.dispatcher.NetworkController", MagicMock)
+    dispatcher = Dispatcher()
+    dispatcher.SUBMISSION_DIR = tmp_path / "submissions"
+    dispatcher.testing = True
+
+    submission_id = "checker-stdout"
+    case_no = "0000"
+    (dispatcher.SUBMISSION_DIR / submission_id / "src" / "common").mkdir(
+        parents=True, exist_ok=True)
+    meta = Meta(
+        language=Language.PY,
+        tasks=[
+            Task(taskScore=100, memoryLimit=128, timeLimit=1000, caseCount=1)
+        ],
+        acceptedFormat=AcceptedFormat.CODE,
+        executionMode=ExecutionMode.GENERAL,
+        buildStrategy=BuildStrategy.COMPILE,
+        customChecker=True,
+    )
+    dispatcher.result[submission_id] = (meta, {case_no: None})
+    dispatcher.locks[submission_id] = threading.Lock()
+    dispatcher.custom_checker_info[submission_id] = {
+        "enabled": True,
+        "checker_path": tmp_path / "custom_checker.py",
+    }
+
+    class DummyRunner:
+        docker_url = "unix://dummy"
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def run(self, skip_diff=False, stdout_path=None):
+            Path(stdout_path).write_bytes(b"x" * 10000)
+            return {
+                "Status": "AC",
+                "Stdout": "x" * 4096,
+                "Stderr": "",
+                "DockerExitCode": 0,
+                "Duration": 1,
+                "MemUsage": 1,
+            }
+
+    checked = {}
+
+    def fake_checker(**kwargs):
+        checked.update(kwargs)
+        return {
+            "status": "AC",
+            "message": "",
+            "bytesWritten": kwargs["student_output_path"].stat().st_size,
+        }
+
+    monkeypatch.setattr("dispatcher.dispatcher.SubmissionRunner", DummyRunner)
+    monkeypatch.setattr("dispatcher.dispatcher.run_custom_checker_case",
+                        fake_checker)
+    dispatcher.create_container(
+        submission_id=submission_id,
+        case_no=case_no,
+        mem_limit=128,
+        time_limit=1000,
+        case_in_path=str(tmp_path / "0000.in"),
+        case_out_path=str(tmp_path / "0000.out"),
+        lang=Language.PY,
+        execution_mode=ExecutionMode.GENERAL,
+    )
+
+    # the checker reads the file, not the preview kept in Stdout
+    assert checked["student_output"] is None
+    assert checked["student_output_path"].name == "0000.out"
+    assert not checked["student_output_path"].exists()
+    assert dispatcher.checker_stats() == {"cases": 1, "bytesWritten": 10000}
+
+
 def test_create_container_passes_network_mode_to_interactive_runner(
         monkeypatch, tmp_path):
     monkeypatch.setattr("dispatcher.dispatcher.NetworkController", MagicMock)
@@ -858,3 +933,346 @@ def test_interactive_compile_error_short_circuits(monkeypatch):
     _, results = dispatcher.result[submission_id]
     assert results["0000"]["status"] == "CE"
     assert "compile failed" in (results["0000"]["stderr"] or "")
+
+
+def _sa_meta():
+    return Meta(
+        language=Language.C,
+        tasks=[
+            Task(taskScore=100, memoryLimit=1024, timeLimit=1000, caseCount=1)
+        ],
+        acceptedFormat=AcceptedFormat.CODE,
+        executionMode=ExecutionMode.GENERAL,
+        buildStrategy=BuildStrategy.COMPILE,
+    )
+
+
+def test_static_analysis_posts_network_setup(docker_dispatcher, monkeypatch):
+    submission_id = "sa-pass"
+    docker_dispatcher.result[submission_id] = (_sa_meta(), {"0000": None})
+    monkeypatch.setattr("dispatcher.dispatcher.get_problem_rules",
+                        lambda pid: {"model": "black"})
+    pool = MagicMock()
+    pool.run.return_value = (True, {"status": "pass"}, None)
+    docker_dispatcher.sa_pool = pool
+
+    docker_dispatcher.static_analysis(submission_id, 7)
+
+    assert pool.run.call_args.kwargs["rules_json"] == {"model": "black"}
+    posted = docker_dispatcher.queue.get_nowait()
+    assert isinstance(posted, dispatcher_job.NetworkSetup)
+    assert posted.problem_id == 7
+    assert docker_dispatcher.sa_payloads[submission_id] == {"status": "pass"}
+
+
+def test_static_analysis_timeout_marks_submission(docker_dispatcher,
+                                                  monkeypatch):
+    from dispatcher.sa_pool import StaticAnalysisTimeout
+
+    submission_id = "sa-timeout"
+    docker_dispatcher.result[submission_id] = (_sa_meta(), {"0000": None})
+    monkeypatch.setattr("dispatcher.dispatcher.get_problem_rules",
+                        lambda pid: {"model": "black"})
+    pool = MagicMock()
+    pool.run.side_effect = StaticAnalysisTimeout("exceeded 60s")
+    docker_dispatcher.sa_pool = pool
+    finished = []
+    monkeypatch.setattr(docker_dispatcher, "on_submission_complete",
+                        finished.append)
+
+    docker_dispatcher.static_analysis(submission_id, 7)
+
+    assert finished == [submission_id]
+    assert docker_dispatcher.queue.empty()
+    payload = docker_dispatcher.sa_payloads[submission_id]
+    assert payload["status"] == "sys_err"
+    assert "exceeded 60s" in payload["message"]
+
+
+def test_static_analysis_reuses_cached_verdict(docker_dispatcher, monkeypatch):
+    monkeypatch.setattr(
+        "dispatcher.dispatcher.get_problem_rules", lambda pid: {
+            "model": "black",
+            "functions": ["printf"]
+        })
+    payload = {"status": "fail", "message": "printf is forbidden"}
+    pool = MagicMock()
+    pool.run.return_value = (False, payload, {"0000": {"status": "AE"}})
+    docker_dispatcher.sa_pool = pool
+    finished = []
+    monkeypatch.setattr(docker_dispatcher, "on_submission_complete",
+                        finished.append)
+
+    for submission_id in ("sa-cache-1", "sa-cache-2"):
+        common = docker_dispatcher.SUBMISSION_DIR / submission_id / "src" / "common"
+        common.mkdir(parents=True)
+        (common / "main.c").write_text('int main(){printf("x");}')
+        docker_dispatcher.result[submission_id] = (_sa_meta(), {"0000": None})
+        docker_dispatcher.static_analysis(submission_id, 7)
+
+    assert pool.run.call_count == 1
+    assert finished == ["sa-cache-1", "sa-cache-2"]
+    _, task_content = docker_dispatcher.result["sa-cache-2"]
+    assert task_content["0000"]["status"] == "AE"
+    assert "printf is forbidden" in task_content["0000"]["stderr"]
+    assert docker_dispatcher.sa_cache.stats()["hits"] == 1
+
+
+def test_static_analysis_does_not_cache_crashed_analysis(
+        docker_dispatcher, monkeypatch):
+    monkeypatch.setattr(
+        "dispatcher.dispatcher.get_problem_rules", lambda pid: {
+            "model": "black",
+            "functions": ["printf"]
+        })
+    payload = {"status": "sys_err", "message": "Libclang init failed"}
+    pool = MagicMock()
+    pool.run.return_value = (False, payload, {"0000": {"status": "AE"}})
+    docker_dispatcher.sa_pool = pool
+    monkeypatch.setattr(docker_dispatcher, "on_submission_complete",
+                        lambda submission_id: None)
+
+    for submission_id in ("sa-crash-1", "sa-crash-2"):
+        common = docker_dispatcher.SUBMISSION_DIR / submission_id / "src" / "common"
+        common.mkdir(parents=True)
+        (common / "main.c").write_text('int main(){printf("x");}')
+        docker_dispatcher.result[submission_id] = (_sa_meta(), {"0000": None})
+        docker_dispatcher.static_analysis(submission_id, 7)
+
+    assert pool.run.call_count == 2
+    assert docker_dispatcher.sa_cache.stats()["hits"] == 0
+
+
+def _write_c_submission(dispatcher_obj, submission_id, strategy):
+    sub_dir = dispatcher_obj.SUBMISSION_DIR / submission_id
+    (sub_dir / "src" / "common").mkdir(parents=True)
+    meta = Meta(
+        language=Language.C,
+        tasks=[
+            Task(taskScore=100, memoryLimit=1024, timeLimit=1000, caseCount=2)
+        ],
+        acceptedFormat=AcceptedFormat.CODE,
+        executionMode=ExecutionMode.GENERAL,
+        buildStrategy=strategy,
+    )
+    (sub_dir / "meta.json").write_text(json.dumps(meta.dict()))
+
+
+def test_speculative_compile_is_queued_with_static_analysis(
+        docker_dispatcher, monkeypatch):
+    _mock_pipeline(monkeypatch)
+    docker_dispatcher.speculative_build = True
+    _write_c_submission(docker_dispatcher, "spec-1", BuildStrategy.COMPILE)
+
+    docker_dispatcher.handle("spec-1", 1)
+
+    first = docker_dispatcher.queue.get_nowait()
+    second = docker_dispatcher.queue.get_nowait()
+    assert isinstance(first, dispatcher_job.StaticAnalysis)
+    assert isinstance(second, dispatcher_job.Compile)
+    assert docker_dispatcher.queue.empty()
+    pending = docker_dispatcher.pending_tasks["spec-1"]
+    assert all(isinstance(j, dispatcher_job.Execute) for j in pending)
+    assert len(pending) == 2
+
+
+def test_compile_waits_for_static_analysis_by_default(docker_dispatcher,
+                                                      monkeypatch):
+    _mock_pipeline(monkeypatch)
+    _write_c_submission(docker_dispatcher, "spec-2", BuildStrategy.COMPILE)
+
+    docker_dispatcher.handle("spec-2", 1)
+
+    assert isinstance(docker_dispatcher.queue.get_nowait(),
+                      dispatcher_job.StaticAnalysis)
+    assert docker_dispatcher.queue.empty()
+    assert isinstance(docker_dispatcher.pending_tasks["spec-2"][0],
+                      dispatcher_job.Compile)
+
+
+def test_speculative_compile_result_dropped_after_sa_failure(
+        docker_dispatcher, monkeypatch):
+    submission_id = "spec-3"
+    docker_dispatcher.result[submission_id] = (_sa_meta(), {"0000": None})
+    docker_dispatcher.compile_locks[submission_id] = threading.Lock()
+
+    class SlowRunner:
+
+        def __init__(self, **kwargs):
+            pass
+
+        def compile(self):
+            # SA rejects the submission while the compiler is running
+            docker_dispatcher.release(submission_id)
+            return {"Status": "AC"}
+
+    monkeypatch.setattr("dispatcher.dispatcher.SubmissionRunner", SlowRunner)
+    docker_dispatcher.compile(submission_id, Language.C)
+
+    assert submission_id not in docker_dispatcher.compile_results
+    # a compile job picked up after the release is a no-op
+    docker_dispatcher.compile(submission_id, Language.C)
+
+
+def test_speculative_build_failure_waits_for_network_setup(
+        docker_dispatcher, monkeypatch):
+    submission_id = "spec-4"
+    meta = _sa_meta()
+    docker_dispatcher.result[submission_id] = (meta, {"0000": None})
+    docker_dispatcher.created_at[submission_id] = datetime.now()
+    docker_dispatcher.pending_tasks[submission_id] = [
+        dispatcher_job.Execute(submission_id=submission_id,
+                               task_id=0,
+                               case_id=0)
+    ]
+    failed = []
+    monkeypatch.setattr(
+        docker_dispatcher, "_mark_submission_failed",
+        lambda sid, status, msg: failed.append((sid, status, msg)))
+
+    docker_dispatcher._handle_build_failure(submission_id, "make: error")
+    assert failed == []
+    assert docker_dispatcher.deferred_build_failures == {
+        submission_id: "make: error"
+    }
+
+    docker_dispatcher.queue.put(
+        dispatcher_job.NetworkSetup(submission_id=submission_id, problem_id=1))
+    docker_dispatcher.start()
+    try:
+        deadline = datetime.now().timestamp() + 5
+        while not failed and datetime.now().timestamp() < deadline:
+            threading.Event().wait(0.05)
+    finally:
+        docker_dispatcher.stop()
+        docker_dispatcher.join(timeout=3)
+    assert failed == [(submission_id, "CE", "make: error")]
+    assert docker_dispatcher.queue.empty()
+
+
+def test_network_setup_releases_pending_jobs(docker_dispatcher,
+                                             mock_network_controller):
+    submission_id = "net-1"
+    docker_dispatcher.result[submission_id] = (_sa_meta(), {"0000": None})
+    execute = dispatcher_job.Execute(submission_id=submission_id,
+                                     task_id=0,
+                                     case_id=0)
+    docker_dispatcher.pending_tasks[submission_id] = [execute]
+
+    docker_dispatcher.network_setup(submission_id, 1)
+
+    mock_network_controller.provision_network.assert_called_once_with(
+        submission_id=submission_id, problem_id=1)
+    assert submission_id not in docker_dispatcher.pending_tasks
+    assert docker_dispatcher.queue.get_nowait() is execute
+
+
+def test_network_setup_cleans_up_after_release(docker_dispatcher,
+                                               mock_network_controller):
+    submission_id = "net-2"
+    docker_dispatcher.result[submission_id] = (_sa_meta(), {"0000": None})
+    docker_dispatcher.pending_tasks[submission_id] = []
+
+    def provision(submission_id, problem_id):
+        # the submission times out while its sidecars are starting
+        docker_dispatcher.result.pop(submission_id)
+
+    mock_network_controller.provision_network.side_effect = provision
+    docker_dispatcher.network_setup(submission_id, 1)
+
+    mock_network_controller.cleanup.assert_called_with(submission_id)
+    assert docker_dispatcher.queue.empty()
+
+
+def test_interactive_cases_are_batched(docker_dispatcher, monkeypatch):
+    _mock_pipeline(monkeypatch)
+    docker_dispatcher.interactive_batch_size = 2
+    sub_dir = docker_dispatcher.SUBMISSION_DIR / "batch-1"
+    (sub_dir / "src" / "common").mkdir(parents=True)
+    meta = Meta(
+        language=Language.C,
+        tasks=[
+            Task(taskScore=100, memoryLimit=1024, timeLimit=1000, caseCount=3)
+        ],
+        acceptedFormat=AcceptedFormat.CODE,
+        executionMode=ExecutionMode.INTERACTIVE,
+        buildStrategy=BuildStrategy.COMPILE,
+        assetPaths={"teacherLang": "c"},
+    )
+    (sub_dir / "meta.json").write_text(json.dumps(meta.dict()))
+
+    docker_dispatcher.handle("batch-1", 1)
+
+    batches = [
+        j for j in docker_dispatcher.pending_tasks["batch-1"]
+        if isinstance(j, dispatcher_job.ExecuteBatch)
+    ]
+    assert [b.case_ids for b in batches] == [[0, 1], [2]]
+    _, task_content = docker_dispatcher.result["batch-1"]
+    assert sorted(task_content) == ["0000", "0001", "0002"]
+
+
+def test_run_interactive_batch_reports_every_case(monkeypatch, tmp_path):
+    monkeypatch.setattr("dispatcher.dispatcher.NetworkController", MagicMock)
+    dispatcher = Dispatcher()
+    dispatcher.SUBMISSION_DIR = tmp_path / "submissions"
+    dispatcher.testing = True
+    submission_id = "batch-run"
+    sub_dir = dispatcher.SUBMISSION_DIR / submission_id
+    (sub_dir / "src" / "common").mkdir(parents=True)
+    (sub_dir / "teacher" / "common").mkdir(parents=True)
+    meta = Meta(
+        language=Language.PY,
+        tasks=[
+            Task(taskScore=100, memoryLimit=128, timeLimit=1000, caseCount=2)
+        ],
+        acceptedFormat=AcceptedFormat.CODE,
+        executionMode=ExecutionMode.INTERACTIVE,
+        buildStrategy=BuildStrategy.COMPILE,
+        assetPaths={"teacherLang": "py"},
+    )
+    dispatcher.result[submission_id] = (meta, {"0000": None, "0001": None})
+    dispatcher.locks[submission_id] = threading.Lock()
+    containers = []
+    completed = []
+    monkeypatch.setattr(dispatcher, "on_submission_complete",
+                        lambda sid: completed.append(sid))
+
+    class DummyRunner:
+
+        def __init__(self, *args, **kwargs):
+            self.kwargs = kwargs
+
+        def run_batch(self, cases):
+            containers.append([case_no for case_no, _, _ in cases])
+            for _, student_dir, teacher_dir in cases:
+                assert student_dir.exists() and teacher_dir.exists()
+            return {
+                case_no: {
+                    "Status": "AC" if case_no == "0000" else "WA",
+                    "Stdout": "",
+                    "Stderr": "",
+                    "DockerExitCode": 0,
+                    "Duration": 1,
+                    "MemUsage": 1,
+                }
+                for case_no, _, _ in cases
+            }
+
+    monkeypatch.setattr("dispatcher.dispatcher.InteractiveRunner", DummyRunner)
+
+    dispatcher.run_interactive_batch(
+        submission_id=submission_id,
+        task_id=0,
+        case_ids=[0, 1],
+        mem_limit=128,
+        time_limit=1000,
+        lang=Language.PY,
+    )
+
+    assert containers == [["0000", "0001"]]
+    _, results = dispatcher.result[submission_id]
+    assert results["0000"]["status"] == "AC"
+    assert results["0001"]["status"] == "WA"
+    assert completed == [submission_id]
+    assert dispatcher.container_count == 0
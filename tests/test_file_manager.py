@@ -6,6 +6,7 @@ import pytest
 
 from dispatcher import file_manager
 import dispatcher.testdata as testdata
+from dispatcher.cache_manager import CacheManager
 from dispatcher.meta import Meta
 from dispatcher.constant import AcceptedFormat, BuildStrategy, ExecutionMode
 
@@ -216,7 +217,8 @@ def _build_zip_bytes(entries: dict[str, str]) -> bytes:
 
 def test_ensure_testdata_blocks_path_traversal(monkeypatch, tmp_path):
     monkeypatch.setattr(testdata, "TESTDATA_ROOT", tmp_path)
-    monkeypatch.setattr(testdata, "get_redis_client", lambda: DummyRedis())
+    monkeypatch.setattr(testdata, "get_coordination_backend",
+                        lambda: DummyRedis())
     monkeypatch.setattr(testdata, "get_checksum", lambda problem_id: "abc")
     monkeypatch.setattr(testdata, "fetch_problem_meta",
                         lambda problem_id: "{}")
@@ -227,3 +229,27 @@ def test_ensure_testdata_blocks_path_traversal(monkeypatch, tmp_path):
 
     with pytest.raises(ValueError):
         testdata.ensure_testdata(1)
+
+
+def test_ensure_testdata_refresh_keeps_build_caches(monkeypatch, tmp_path):
+    monkeypatch.setattr(testdata, "TESTDATA_ROOT", tmp_path)
+    monkeypatch.setattr(testdata, "get_coordination_backend",
+                        lambda: DummyRedis())
+    monkeypatch.setattr(testdata, "get_cache_manager",
+                        lambda: CacheManager(tmp_path, budget=0))
+    monkeypatch.setattr(testdata, "fetch_problem_meta",
+                        lambda problem_id: "{}")
+    monkeypatch.setattr(testdata, "fetch_testdata",
+                        lambda problem_id: _build_zip_bytes({"0000.in": "1"}))
+    problem_root = tmp_path / "1"
+    for name in ("public", "ac_build", "teacher_build", "checker"):
+        (problem_root / name / "key").mkdir(parents=True)
+    (problem_root / "0000.in").write_text("old")
+
+    testdata.ensure_testdata(1)
+
+    assert sorted(p.name for p in problem_root.iterdir()) == [
+        "0000.in", "ac_build", "public", "teacher_build"
+    ]
+    assert (problem_root / "0000.in").read_text() == "1"
+    assert (problem_root / "ac_build" / "key").is_dir()
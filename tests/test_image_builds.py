@@ -0,0 +1,58 @@
+import threading
+import time
+from pathlib import Path
+
+from dispatcher.image_builds import ImageBuildCoordinator
+
+
+def test_concurrent_requests_share_one_build():
+    release = threading.Event()
+    calls = []
+
+    def build(context_path, tag, checksum):
+        calls.append(tag)
+        release.wait(5)
+        return True
+
+    coordinator = ImageBuildCoordinator(build, max_workers=2)
+    first = coordinator.submit(Path("env"), "img:1-env", "hash")
+    second = coordinator.submit(Path("env"), "img:1-env", "hash")
+    assert first is second
+    release.set()
+    assert first.result(5) is True
+    assert calls == ["img:1-env"]
+    assert coordinator.stats()["joined"] == 1
+    coordinator.shutdown()
+
+
+def test_new_checksum_or_finished_build_starts_again():
+    coordinator = ImageBuildCoordinator(lambda c, t, h: h, max_workers=1)
+    assert coordinator.submit(Path("env"), "img", "a").result(5) == "a"
+    assert coordinator.submit(Path("env"), "img", "b").result(5) == "b"
+    assert coordinator.submit(Path("env"), "img", "a").result(5) == "a"
+    assert coordinator.stats() == {"inflight": 0, "started": 3, "joined": 0}
+    coordinator.shutdown()
+
+
+def test_builds_run_in_parallel_up_to_the_cap():
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def build(context_path, tag, checksum):
+        with lock:
+            running.append(tag)
+            peak.append(len(running))
+        time.sleep(0.1)
+        with lock:
+            running.remove(tag)
+        return True
+
+    coordinator = ImageBuildCoordinator(build, max_workers=2)
+    futures = [
+        coordinator.submit(Path(f"env-{i}"), f"img:{i}", "hash")
+        for i in range(4)
+    ]
+    assert all(f.result(5) for f in futures)
+    assert max(peak) == 2
+    coordinator.shutdown()
@@ -52,8 +52,10 @@ class DummyDockerClient:
                          working_dir,
                          host_config,
                          networking_config=None,
-                         environment=None):
+                         environment=None,
+                         labels=None):
         self.last_command = command
+        self.last_labels = labels
         return {"Id": "dummy"}
 
     def start(self, container):
@@ -135,3 +137,56 @@ def test_interactive_runner_passes_network_access_flag(monkeypatch, tmp_path,
     command = holder["client"].last_command
     assert command is not None
     assert _get_flag_value(command, "--allow-network-access") == expected_flag
+
+
+class BatchDockerClient(DummyDockerClient):
+
+    def logs(self, container, stdout=True, stderr=True):
+        payload = {"cases": {"0000": {"Status": "AC", "Duration": 1}}}
+        return (json.dumps(payload) + "\n").encode("utf-8")
+
+
+def test_interactive_runner_batch_mounts_every_case(monkeypatch, tmp_path):
+    cfg_path = _write_submission_config(tmp_path)
+    monkeypatch.setenv("SUBMISSION_CONFIG", str(cfg_path))
+    for name in ("submissions", "sandbox", "host"):
+        (tmp_path / name).mkdir()
+    holder = {}
+
+    def _fake_client(*args, **kwargs):
+        holder["client"] = BatchDockerClient()
+        return holder["client"]
+
+    monkeypatch.setattr(interactive_runner.docker, "APIClient", _fake_client)
+    cases = []
+    for case_no in ("0000", "0001"):
+        student_dir = tmp_path / "student" / case_no
+        teacher_dir = tmp_path / "teacher" / case_no
+        student_dir.mkdir(parents=True)
+        teacher_dir.mkdir(parents=True)
+        cases.append((case_no, student_dir, teacher_dir))
+
+    runner = InteractiveRunner(
+        submission_id="sub-1",
+        time_limit=1000,
+        mem_limit=65536,
+        case_in_path=str(tmp_path / "testcase"),
+        teacher_first=True,
+        lang_key="c11",
+        teacher_lang_key="c11",
+    )
+    results = runner.run_batch(cases)
+
+    client = holder["client"]
+    binds = client.last_host_config["binds"]
+    assert {b["bind"]
+            for b in binds.values()} >= {
+                "/cases/0000/src", "/cases/0000/teacher", "/cases/0001/src",
+                "/cases/0001/teacher", "/app"
+            }
+    manifest = json.loads(_get_flag_value(client.last_command, "--cases"))
+    assert [c["caseNo"] for c in manifest] == ["0000", "0001"]
+    assert manifest[1]["casePath"] == "/cases/0001/teacher/testcase.in"
+    assert results["0000"]["Status"] == "AC"
+    # a case missing from the payload is a judge error
+    assert results["0001"]["Status"] == "JE"
@@ -0,0 +1,321 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from runner import interactive_orchestrator
+from runner.interactive_orchestrator import _supervise
+
+
+def _spawn(code: str, **kwargs) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-c", code], **kwargs)
+
+
+@pytest.fixture(params=["pidfd", "waitid"])
+def exit_notification(request, monkeypatch):
+    if request.param == "waitid":
+        monkeypatch.delattr(os, "pidfd_open", raising=False)
+    elif not hasattr(os, "pidfd_open"):
+        pytest.skip("os.pidfd_open unavailable")
+    return request.param
+
+
+def test_supervise_wakes_up_on_exit(exit_notification):
+    procs = {
+        "teacher": _spawn("import time; time.sleep(0.2)"),
+        "student": _spawn("pass"),
+    }
+    start = time.monotonic()
+    assert _supervise(procs, time.time() + 30, None) is None
+    assert time.monotonic() - start < 5
+    assert all(p.returncode == 0 for p in procs.values())
+
+
+def test_supervise_kicks_teacher_after_student_exit(exit_notification):
+    read_fd, kick_fd = os.pipe()
+    # teacher blocks on its input until it gets the kick newline
+    teacher = _spawn("import sys; sys.exit(sys.stdin.readline() != '\\n')",
+                     stdin=read_fd)
+    os.close(read_fd)
+    procs = {"teacher": teacher, "student": _spawn("pass")}
+    assert _supervise(procs, time.time() + 30, kick_fd) is None
+    assert teacher.returncode == 0
+    with pytest.raises(OSError):
+        os.fstat(kick_fd)
+
+
+def test_supervise_returns_at_deadline(exit_notification):
+    procs = {"teacher": _spawn("import time; time.sleep(30)")}
+    try:
+        start = time.monotonic()
+        _supervise(procs, time.time() + 0.2, None)
+        assert 0.1 < time.monotonic() - start < 5
+        assert procs["teacher"].poll() is None
+    finally:
+        procs["teacher"].kill()
+        procs["teacher"].wait()
+
+
+def test_supervise_closes_exit_fds(monkeypatch):
+    opened = []
+    exit_fd = interactive_orchestrator._exit_fd
+
+    def record(proc):
+        opened.append(exit_fd(proc))
+        return opened[-1]
+
+    monkeypatch.setattr(interactive_orchestrator, "_exit_fd", record)
+    _supervise({"student": _spawn("pass")}, time.time() + 30, None)
+    for fd in opened:
+        with pytest.raises(OSError):
+            os.fstat(fd)
+
+
+def _batch_cases(tmp_path, case_nos):
+    cases = []
+    for case_no in case_nos:
+        root = tmp_path / "cases" / case_no
+        (root / "teacher").mkdir(parents=True)
+        (root / "src").mkdir()
+        (root / "teacher" / "testcase.in").write_text("secret")
+        cases.append({
+            "caseNo": case_no,
+            "teacherDir": str(root / "teacher"),
+            "studentDir": str(root / "src"),
+            "casePath": str(root / "teacher" / "testcase.in"),
+        })
+    return cases
+
+
+@pytest.fixture
+def batch_env(monkeypatch, tmp_path):
+    """Fake /proc and scratch dirs for run_batch, kills land in `killed`."""
+    proc_root = tmp_path / "proc"
+    proc_root.mkdir()
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    killed = []
+
+    def fake_kill(pid, sig):
+        killed.append(pid)
+        (proc_root / str(pid) / "status").unlink()
+
+    monkeypatch.setattr(interactive_orchestrator, "PROC_ROOT", proc_root)
+    monkeypatch.setattr(interactive_orchestrator, "SCRATCH_DIRS", (scratch, ))
+    monkeypatch.setattr(interactive_orchestrator.os, "kill", fake_kill)
+    return {"proc": proc_root, "scratch": scratch, "killed": killed}
+
+
+def _fake_process(proc_root, pid, uid, state="S (sleeping)"):
+    (proc_root / str(pid)).mkdir(exist_ok=True)
+    (proc_root / str(pid) / "status").write_text(
+        f"Name:\tmain\nState:\t{state}\nUid:\t{uid}\t{uid}\t{uid}\t{uid}\n")
+
+
+def test_run_batch_runs_cases_in_order(monkeypatch, tmp_path, batch_env):
+    seen = []
+    cases = _batch_cases(tmp_path, ("0000", "0001"))
+
+    def fake_orchestrate(args):
+        seen.append(
+            (args.workdir, args.teacher_dir, args.student_dir, args.case_path))
+        if args.teacher_dir == cases[1]["teacherDir"]:
+            raise interactive_orchestrator.OrchestratorError("boom")
+        return {"Status": "AC", "pipeMode": args.pipe_mode}
+
+    monkeypatch.setattr(interactive_orchestrator, "orchestrate",
+                        fake_orchestrate)
+    args = argparse.Namespace(workdir=str(tmp_path / "work"),
+                              pipe_mode="devfd",
+                              cases=json.dumps(cases))
+
+    results = interactive_orchestrator.run_batch(args)["cases"]
+
+    assert seen[0] == (str(tmp_path / "work" / "0000"), cases[0]["teacherDir"],
+                       cases[0]["studentDir"], cases[0]["casePath"])
+    assert [s[0] for s in seen] == [
+        str(tmp_path / "work" / "0000"),
+        str(tmp_path / "work" / "0001")
+    ]
+    assert results["0000"]["Status"] == "AC"
+    # a failing case does not stop the batch and is reported on its own
+    assert results["0001"]["Status"] == "CE"
+    assert "boom" in results["0001"]["Stderr"]
+
+
+def test_run_batch_isolates_cases(monkeypatch, tmp_path, batch_env):
+    cases = _batch_cases(tmp_path, ("0000", "0001", "0002"))
+    roots = [tmp_path / "cases" / c["caseNo"] for c in cases]
+    modes = []
+
+    def fake_orchestrate(args):
+        modes.append([root.stat().st_mode & 0o777 for root in roots])
+        # the student leaves a file and a detached child behind
+        (batch_env["scratch"] / "state").write_text("carry over")
+        _fake_process(batch_env["proc"], 4242, 1451)
+        return {"Status": "AC"}
+
+    _fake_process(batch_env["proc"], 1, 0)
+    _fake_process(batch_env["proc"], 77, 1450, state="Z (zombie)")
+    monkeypatch.setattr(interactive_orchestrator, "orchestrate",
+                        fake_orchestrate)
+    args = argparse.Namespace(workdir=str(tmp_path / "work"),
+                              pipe_mode="devfd",
+                              cases=json.dumps(cases))
+
+    results = interactive_orchestrator.run_batch(args)["cases"]
+
+    assert [r["Status"] for r in results.values()] == ["AC"] * 3
+    # only the running case is reachable
+    assert modes == [
+        [0o755, 0o700, 0o700],
+        [0o700, 0o755, 0o700],
+        [0o700, 0o700, 0o755],
+    ]
+    assert all(root.stat().st_mode & 0o777 == 0o700 for root in roots)
+    assert batch_env["killed"] == [4242] * 3
+    assert list(batch_env["scratch"].iterdir()) == []
+
+
+def test_run_batch_stops_when_isolation_fails(monkeypatch, tmp_path,
+                                              batch_env):
+    cases = _batch_cases(tmp_path, ("0000", "0001"))
+
+    def fake_orchestrate(args):
+        return {"Status": "AC"}
+
+    def stuck_kill(pid, sig):
+        pass
+
+    _fake_process(batch_env["proc"], 4242, 1451)
+    monkeypatch.setattr(interactive_orchestrator, "orchestrate",
+                        fake_orchestrate)
+    monkeypatch.setattr(interactive_orchestrator.os, "kill", stuck_kill)
+    monkeypatch.setattr(interactive_orchestrator.time, "sleep", lambda _: None)
+    args = argparse.Namespace(workdir=str(tmp_path / "work"),
+                              pipe_mode="devfd",
+                              cases=json.dumps(cases))
+
+    results = interactive_orchestrator.run_batch(args)["cases"]
+
+    assert results["0000"]["Status"] == "AC"
+    assert results["0001"]["Status"] == "CE"
+    assert "survived" in results["0001"]["Stderr"]
+
+
+def test_transcript_keeps_last_bytes():
+    transcript = interactive_orchestrator._Transcript(8)
+    transcript.write(b"abc")
+    assert transcript.tail() == b"abc"
+    transcript.write(b"defgh")
+    transcript.write(b"ij")
+    assert transcript.tail() == b"cdefghij"
+    transcript.write(b"0123456789")
+    assert transcript.tail() == b"23456789"
+    assert transcript.total == 20
+
+
+def test_largepipe_grows_pipe_buffers(tmp_path):
+    bundle = interactive_orchestrator._setup_pipes(tmp_path, "largepipe",
+                                                   256 * 1024)
+    try:
+        assert bundle["mode"] == "largepipe"
+        assert bundle["pipe_capacity"] >= 256 * 1024
+    finally:
+        for fd in bundle["keep_fds"]:
+            os.close(fd)
+
+
+def test_transcript_relays_both_directions(tmp_path):
+    bundle = interactive_orchestrator._setup_pipes(tmp_path,
+                                                   "devfd",
+                                                   transcript_bytes=64)
+    opened = []
+
+    def open_end(path, flags):
+        opened.append(os.open(path, flags))
+        return opened[-1]
+
+    procs = [
+        _spawn("print('ping', flush=True); input()",
+               stdin=open_end(bundle["teacher"]["stdin"], os.O_RDONLY),
+               stdout=open_end(bundle["teacher"]["stdout"], os.O_WRONLY)),
+        _spawn("print(input() + ' pong', flush=True)",
+               stdin=open_end(bundle["student"]["stdin"], os.O_RDONLY),
+               stdout=open_end(bundle["student"]["stdout"], os.O_WRONLY)),
+    ]
+    for fd in opened + bundle["keep_fds"]:
+        os.close(fd)
+    for proc in procs:
+        assert proc.wait(timeout=30) == 0
+
+    transcript = interactive_orchestrator._collect_transcripts(
+        bundle["transcripts"], bundle["relay_threads"])
+    assert transcript["teacherToStudent"]["tail"] == "ping\n"
+    assert transcript["studentToTeacher"]["tail"] == "ping pong\n"
+
+
+FAKE_SANDBOX = """#!/usr/bin/env python3
+import os, sys
+args = sys.argv[1:]
+stdin, stdout, result = args[2], args[3], args[11]
+student = os.environ["SANDBOX_UID"] == "1451"
+with open(stdout, "w") as out, open(stdin) as inp:
+    if student:
+        out.write(inp.readline().strip() + " pong\\n")
+    else:
+        out.write("ping\\n")
+        out.flush()
+        reply = inp.readline()
+        with open("Check_Result", "w") as f:
+            f.write("STATUS: AC\\nMESSAGE: " + reply.strip() + "\\n")
+with open(result, "w") as f:
+    f.write("Exited Normally\\nWEXITSTATUS() = 0\\n1\\n100\\n")
+"""
+
+
+@pytest.mark.parametrize("pipe_mode", ["devfd", "largepipe"])
+def test_orchestrate_returns_transcript(monkeypatch, tmp_path, pipe_mode):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    sandbox = bin_dir / "sandbox_interactive"
+    sandbox.write_text(FAKE_SANDBOX)
+    sandbox.chmod(0o755)
+    config = tmp_path / "interactive.json"
+    config.write_text(json.dumps({"transcriptBytes": 64}))
+    teacher_dir = tmp_path / "teacher"
+    student_dir = tmp_path / "src"
+    teacher_dir.mkdir()
+    student_dir.mkdir()
+    (teacher_dir / "main.py").write_text("")
+    (student_dir / "main.py").write_text("")
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(interactive_orchestrator, "CONFIG_PATH", config)
+    monkeypatch.setattr(interactive_orchestrator, "_setup_secure_permissions",
+                        lambda *args: None)
+    monkeypatch.setattr(interactive_orchestrator.os, "chown",
+                        lambda *args: None)
+    args = argparse.Namespace(workdir=str(tmp_path / "work"),
+                              teacher_dir=str(teacher_dir),
+                              student_dir=str(student_dir),
+                              student_lang="python3",
+                              teacher_lang="python3",
+                              teacher_first=True,
+                              time_limit=5000,
+                              mem_limit=65536,
+                              case_path=None,
+                              allow_write_student=None,
+                              allow_network_access="0",
+                              pipe_mode=pipe_mode)
+
+    result = interactive_orchestrator.run_case(args)
+
+    assert result["Status"] == "AC", result
+    assert result["pipeMode"] == pipe_mode
+    assert result["Stderr"] == "ping pong"
+    assert result["transcript"]["teacherToStudent"]["tail"] == "ping\n"
+    assert result["transcript"]["studentToTeacher"]["tail"] == "ping pong\n"
@@ -1,8 +1,10 @@
 from pathlib import Path
 import pytest
 from unittest.mock import MagicMock, patch, call
+from dispatcher import docker_labels
 from dispatcher.network_control import BuildTimeoutError, NetworkController
 from dispatcher.meta import Sidecar
+from dispatcher.readiness import Probe
 
 
 @pytest.fixture
@@ -10,6 +12,8 @@ def mock_docker_client():
     with patch("dispatcher.network_control.docker.APIClient") as mock_api, \
          patch("dispatcher.network_control.docker.from_env") as mock_from_env:
         client_instance = MagicMock()
+        # readiness probes run in containers pass right away
+        client_instance.exec_inspect.return_value = {"ExitCode": 0}
         mock_api.return_value = client_instance
         docker_cli_instance = MagicMock()
         mock_from_env.return_value = docker_cli_instance
@@ -131,6 +135,7 @@ def test_setup_sidecars_creates_network_and_containers(network_controller,
         f"noj-net-{submission_id}",
         driver="bridge",
         internal=False,  # Blacklist mode allows external access
+        labels=docker_labels.labels(submission_id, docker_labels.ROLE_NETWORK),
     )
     # 2. Check Container Creation
     mock_docker_client.create_container.assert_called()
@@ -1027,3 +1032,400 @@ class TestWhitelistModeComplete:
         # In blacklist mode, should block specific domains
         assert "Blocking domain:" in content
         assert 'address=/$domain/0.0.0.0' in content
+
+
+class TestAsyncProvisioning:
+    """Tests for the no-network fast path and concurrent container starts."""
+
+    def test_no_network_skips_docker(self, network_controller,
+                                     mock_docker_client):
+        network_controller._startup_cleanup.join()
+        mock_docker_client.reset_mock()
+        with patch("dispatcher.network_control.fetch_problem_network_config",
+                   return_value={}):
+            network_controller.provision_network("plain", 1)
+
+        assert mock_docker_client.method_calls == []
+        assert "plain" not in network_controller.resources
+        stats = network_controller.provision_stats()
+        assert stats["none"]["count"] == 1
+        assert stats["none"]["failures"] == 0
+
+    def test_failed_provision_is_counted(self, network_controller,
+                                         monkeypatch):
+        monkeypatch.setattr(network_controller, "cleanup_stale_resources",
+                            lambda sid: None)
+
+        def fail(**kwargs):
+            raise RuntimeError("no sidecar")
+
+        monkeypatch.setattr(network_controller, "_setup_topology", fail)
+        with patch("dispatcher.network_control.fetch_problem_network_config",
+                   return_value={
+                       "sidecars": [{
+                           "name": "db",
+                           "image": "mysql:5.7"
+                       }]
+                   }):
+            with pytest.raises(RuntimeError):
+                network_controller.provision_network("broken", 1)
+
+        stats = network_controller.provision_stats()["sidecars"]
+        assert stats["count"] == 1
+        assert stats["failures"] == 1
+
+    def test_start_all_keeps_order(self, network_controller):
+        import time
+
+        def start_one(item):
+            time.sleep(0.05 * (3 - item))
+            return f"c{item}"
+
+        assert network_controller._start_all([0, 1, 2],
+                                             start_one) == ["c0", "c1", "c2"]
+
+    def test_start_all_removes_started_containers_on_failure(
+            self, network_controller, mock_docker_client):
+
+        def start_one(item):
+            if item == 1:
+                raise RuntimeError("pull failed")
+            return f"c{item}"
+
+        with pytest.raises(RuntimeError, match="pull failed"):
+            network_controller._start_all([0, 1, 2], start_one)
+
+        removed = {
+            c.args[0]
+            for c in mock_docker_client.remove_container.call_args_list
+        }
+        assert removed == {"c0", "c2"}
+
+
+class TestReadinessProbes:
+    """Tests for readiness probes replacing the fixed startup delay."""
+
+    def test_probed_containers_skip_startup_delay(self, network_controller,
+                                                  mock_docker_client,
+                                                  monkeypatch):
+        monkeypatch.setattr(
+            "dispatcher.network_control.config."
+            "SERVICE_STARTUP_DELAY", 30.0)
+        mock_docker_client.inspect_container.return_value = {
+            "Config": {
+                "ExposedPorts": {
+                    "6379/tcp": {}
+                }
+            }
+        }
+        import time
+        start = time.monotonic()
+        network_controller._wait_for_services_ready({
+            "sc1":
+            Probe.exec(["redis-cli", "ping"]),
+            "ce1":
+            None,
+        })
+        assert time.monotonic() - start < 5
+        stats = network_controller.readiness_stats()
+        assert stats["exec"]["count"] == 1
+        assert stats["tcp"]["count"] == 1
+        assert "delay" not in stats
+
+    def test_unprobed_containers_wait_startup_delay(self, network_controller,
+                                                    mock_docker_client,
+                                                    monkeypatch):
+        monkeypatch.setattr(
+            "dispatcher.network_control.config."
+            "SERVICE_STARTUP_DELAY", 0.2)
+        mock_docker_client.inspect_container.return_value = {"Config": {}}
+        import time
+        start = time.monotonic()
+        network_controller._wait_for_services_ready({"ce1": None})
+        assert time.monotonic() - start >= 0.2
+        assert network_controller.readiness_stats()["delay"]["count"] == 1
+
+    def test_timeout_fails_provisioning(self, network_controller,
+                                        mock_docker_client):
+        mock_docker_client.exec_inspect.return_value = {"ExitCode": 1}
+        with pytest.raises(RuntimeError, match="not ready"):
+            network_controller._wait_for_services_ready(
+                {"sc1": Probe.exec(["false"], timeout=0.1)})
+        assert network_controller.readiness_stats()["exec"]["failures"] == 1
+
+    def test_inferred_probe_falls_back_to_startup_delay(
+            self, network_controller, mock_docker_client, monkeypatch):
+        monkeypatch.setattr(
+            "dispatcher.network_control.config."
+            "SERVICE_STARTUP_DELAY", 0.2)
+        mock_docker_client.inspect_container.return_value = {
+            "Config": {
+                "ExposedPorts": {
+                    "8080/tcp": {}
+                }
+            }
+        }
+        # the image has neither nc nor bash
+        mock_docker_client.exec_inspect.return_value = {"ExitCode": 127}
+        import time
+        start = time.monotonic()
+        network_controller._wait_for_services_ready({"ce1": None})
+        assert time.monotonic() - start >= 0.2
+        stats = network_controller.readiness_stats()
+        assert stats["tcp"]["failures"] == 1
+        assert stats["delay"]["count"] == 1
+
+    def test_declared_probes_follow_sidecar_order(self):
+        probes = NetworkController._declared_probes(["sc1", "sc2", "ce1"],
+                                                    [{
+                                                        "name": "db",
+                                                        "image": "mysql:5.7",
+                                                        "readiness": {
+                                                            "tcpPort": 3306
+                                                        }
+                                                    }, {
+                                                        "name": "cache",
+                                                        "image": "redis:7"
+                                                    }])
+        assert probes["sc1"].kind == "tcp"
+        assert probes["sc2"] is None
+        assert probes["ce1"] is None
+
+
+class TestTopologyPool:
+    """Tests for reusing topologies across submissions."""
+
+    @pytest.fixture
+    def pooled_controller(self, mock_docker_client, monkeypatch):
+        monkeypatch.setattr(
+            "dispatcher.network_control.config."
+            "TOPOLOGY_POOL_SIZE", 2)
+        nc = NetworkController(docker_url="unix://fake.sock")
+        monkeypatch.setattr(nc, "cleanup_stale_resources", lambda sid: None)
+        built = []
+
+        def fake_setup(submission_id, external_config, sidecars_config,
+                       custom_image):
+            built.append(submission_id)
+            nc.resources[submission_id] = {
+                "net_ids": [f"net-{submission_id}"],
+                "container_ids": [f"sc-{submission_id}"],
+                "router_id": None,
+                "mode": f"noj-net-{submission_id}",
+                "custom_image": custom_image,
+            }
+
+        monkeypatch.setattr(nc, "_setup_topology", fake_setup)
+        nc.built = built
+        yield nc
+        nc._reset_executor.shutdown(wait=True)
+
+    @staticmethod
+    def _net_config(reset):
+        sidecar = {"name": "db", "image": "mysql:5.7"}
+        if reset:
+            sidecar["reset"] = ["/reset.sh"]
+        return {"sidecars": [sidecar]}
+
+    def test_released_topology_is_reset_and_reused(self, pooled_controller,
+                                                   mock_docker_client):
+        nc = pooled_controller
+        with patch("dispatcher.network_control.fetch_problem_network_config",
+                   return_value=self._net_config(reset=True)):
+            nc.provision_network("s1", 1)
+            mode = nc.get_network_mode("s1")
+            assert mode.startswith("noj-net-pool-")
+            nc.cleanup("s1")
+            nc._reset_executor.shutdown(wait=True)
+            nc.provision_network("s2", 1)
+
+        assert len(nc.built) == 1
+        assert nc.get_network_mode("s2") == mode
+        mock_docker_client.exec_create.assert_called_with(f"sc-{nc.built[0]}",
+                                                          ["/reset.sh"],
+                                                          stdout=False,
+                                                          stderr=False)
+        mock_docker_client.exec_start.assert_called_with(
+            mock_docker_client.exec_create.return_value["Id"], detach=True)
+        mock_docker_client.remove_container.assert_not_called()
+        assert nc.topology_pool_stats()["hits"] == 1
+
+    def test_failed_reset_tears_topology_down(self, pooled_controller,
+                                              mock_docker_client):
+        nc = pooled_controller
+        mock_docker_client.exec_inspect.return_value = {"ExitCode": 1}
+        with patch("dispatcher.network_control.fetch_problem_network_config",
+                   return_value=self._net_config(reset=True)):
+            nc.provision_network("s1", 1)
+            nc.cleanup("s1")
+            nc._reset_executor.shutdown(wait=True)
+
+        mock_docker_client.remove_container.assert_called_with(
+            f"sc-{nc.built[0]}", v=True, force=True)
+        assert nc.topology_pool_stats()["idle"] == 0
+
+    def test_hanging_reset_tears_topology_down(self, pooled_controller,
+                                               mock_docker_client,
+                                               monkeypatch):
+        nc = pooled_controller
+        monkeypatch.setattr(
+            "dispatcher.network_control.config."
+            "TOPOLOGY_RESET_TIMEOUT", 0.1)
+        # the reset hook never finishes
+        mock_docker_client.exec_inspect.return_value = {
+            "Running": True,
+            "ExitCode": None
+        }
+        with patch("dispatcher.network_control.fetch_problem_network_config",
+                   return_value=self._net_config(reset=True)):
+            nc.provision_network("s1", 1)
+            nc.cleanup("s1")
+            nc._reset_executor.shutdown(wait=True)
+
+        mock_docker_client.remove_container.assert_called_with(
+            f"sc-{nc.built[0]}", v=True, force=True)
+        assert nc.topology_pool_stats()["idle"] == 0
+
+    def test_sidecars_without_reset_hook_are_not_pooled(
+            self, pooled_controller, mock_docker_client):
+        nc = pooled_controller
+        with patch("dispatcher.network_control.fetch_problem_network_config",
+                   return_value=self._net_config(reset=False)):
+            nc.provision_network("s1", 1)
+            nc.cleanup("s1")
+
+        assert nc.built == ["s1"]
+        mock_docker_client.remove_container.assert_called_with("sc-s1",
+                                                               v=True,
+                                                               force=True)
+        assert nc.topology_pool_stats()["misses"] == 0
+
+
+class TestLabelCleanup:
+    """Tests for label-based stale resource cleanup."""
+
+    @staticmethod
+    def _resource(rid, submission_id, role, instance="old-instance"):
+        labels = docker_labels.labels(submission_id, role)
+        labels[docker_labels.INSTANCE] = instance
+        return {"Id": rid, "Labels": labels}
+
+    def test_submission_cleanup_filters_by_label(self, network_controller,
+                                                 mock_docker_client):
+        network_controller._startup_cleanup.join()
+        mock_docker_client.reset_mock()
+        mock_docker_client.containers.return_value = [
+            self._resource("router-1", "s1", docker_labels.ROLE_ROUTER),
+            self._resource("sandbox-1", "s1", docker_labels.ROLE_SANDBOX),
+        ]
+        mock_docker_client.networks.return_value = [
+            self._resource("net-1", "s1", docker_labels.ROLE_NETWORK),
+        ]
+
+        network_controller.cleanup_stale_resources("s1")
+
+        mock_docker_client.containers.assert_called_once_with(
+            all=True, filters=docker_labels.label_filters("s1"))
+        mock_docker_client.networks.assert_called_once_with(
+            filters=docker_labels.label_filters("s1"))
+        removed = [
+            c.args[0]
+            for c in mock_docker_client.remove_container.call_args_list
+        ]
+        assert removed == ["router-1"]
+        mock_docker_client.remove_network.assert_called_once_with("net-1")
+
+    def test_startup_cleanup_keeps_own_resources(self, network_controller,
+                                                 mock_docker_client):
+        network_controller._startup_cleanup.join()
+        mock_docker_client.reset_mock()
+        mock_docker_client.containers.return_value = [
+            self._resource("old", "s1", docker_labels.ROLE_SIDECAR),
+            self._resource("mine",
+                           "s2",
+                           docker_labels.ROLE_SIDECAR,
+                           instance=docker_labels.INSTANCE_ID),
+        ]
+        mock_docker_client.networks.return_value = []
+
+        network_controller.cleanup_stale_resources()
+
+        mock_docker_client.containers.assert_called_once_with(
+            all=True, filters=docker_labels.label_filters())
+        removed = [
+            c.args[0]
+            for c in mock_docker_client.remove_container.call_args_list
+        ]
+        assert removed == ["old"]
+
+    def test_startup_cleanup_runs_in_background(self, mock_docker_client):
+        import threading
+        listed = threading.Event()
+        release = threading.Event()
+
+        def slow_containers(**kwargs):
+            listed.set()
+            release.wait(5)
+            return []
+
+        mock_docker_client.containers.side_effect = slow_containers
+        nc = NetworkController(docker_url="unix://fake.sock")
+        assert listed.wait(5)
+        assert nc._startup_cleanup.is_alive()
+        release.set()
+        nc._startup_cleanup.join(5)
+        assert not nc._startup_cleanup.is_alive()
+
+
+class TestImageBuildCoordination:
+    """Tests for single-flight custom env image builds."""
+
+    def test_concurrent_submissions_build_each_image_once(
+            self, network_controller, monkeypatch, tmp_path):
+        import threading
+        import time
+        monkeypatch.setattr("dispatcher.network_control.get_asset_checksum",
+                            lambda problem_id, asset_type: "hash")
+        for env in ("env-a", "env-b"):
+            (tmp_path / env).mkdir()
+            (tmp_path / env / "Dockerfile").write_text("FROM scratch")
+        monkeypatch.setattr(
+            "dispatcher.network_control.ensure_extracted_resource",
+            lambda problem_id, asset_type: tmp_path)
+        monkeypatch.setattr(network_controller, "_image_up_to_date",
+                            lambda tag, checksum: False)
+        release = threading.Event()
+        built = []
+
+        def fake_build(context_path, tag, checksum):
+            built.append(tag)
+            release.wait(5)
+            return True
+
+        monkeypatch.setattr(network_controller, "_build_one_image", fake_build)
+
+        results = []
+        workers = [
+            threading.Thread(target=lambda: results.append(
+                network_controller._ensure_docker_image(problem_id=1)))
+            for _ in range(2)
+        ]
+        for w in workers:
+            w.start()
+        deadline = time.monotonic() + 5
+        while (network_controller.image_build_stats()["joined"] < 2
+               and time.monotonic() < deadline):
+            time.sleep(0.01)
+        # env-a and env-b are building at the same time
+        assert sorted(built) == [
+            "noj-custom-env:1-env-a", "noj-custom-env:1-env-b"
+        ]
+        release.set()
+        for w in workers:
+            w.join(5)
+
+        assert len(built) == 2
+        assert results == [{
+            "env-a": "noj-custom-env:1-env-a",
+            "env-b": "noj-custom-env:1-env-b",
+        }] * 2
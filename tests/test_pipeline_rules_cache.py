@@ -0,0 +1,80 @@
+import pytest
+
+import dispatcher.pipeline as pipeline
+
+
+class DummyResponse:
+
+    def __init__(self, data=None, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.text = ""
+
+    def json(self):
+        return {"data": self._data}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    calls = []
+    responses = {}
+
+    def fake_get(url, params=None):
+        calls.append(url)
+        return responses.get(url, DummyResponse(status_code=500))
+
+    monkeypatch.setattr(pipeline.rq, "get", fake_get)
+    monkeypatch.setattr(pipeline, "_rules_cache", {})
+    monkeypatch.setattr(pipeline, "_rules_cache_stats", {
+        "hits": 0,
+        "misses": 0,
+        "invalidations": 0
+    })
+    return calls, responses
+
+
+def _url(problem_id):
+    return f"{pipeline.BACKEND_API}/problem/{problem_id}/rules"
+
+
+def test_rules_are_cached_until_invalidated(backend):
+    calls, responses = backend
+    responses[_url(1)] = DummyResponse({"model": "black"})
+
+    assert pipeline.get_problem_rules(1) == {"model": "black"}
+    assert pipeline.get_problem_rules(1) == {"model": "black"}
+    assert len(calls) == 1
+
+    pipeline.invalidate_problem_rules(1)
+    responses[_url(1)] = DummyResponse({"model": "white"})
+    assert pipeline.get_problem_rules(1) == {"model": "white"}
+    assert len(calls) == 2
+    stats = pipeline.rules_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["invalidations"] == 1
+
+
+def test_rules_expire_after_ttl(backend, monkeypatch):
+    calls, responses = backend
+    responses[_url(2)] = DummyResponse({"model": "black"})
+    monkeypatch.setattr(pipeline, "SA_RULES_TTL", 0)
+
+    pipeline.get_problem_rules(2)
+    pipeline.get_problem_rules(2)
+    assert len(calls) == 2
+
+
+def test_missing_rules_are_cached_but_errors_are_not(backend):
+    calls, responses = backend
+    responses[_url(3)] = DummyResponse(status_code=404)
+
+    assert pipeline.get_problem_rules(3) == {}
+    assert pipeline.get_problem_rules(3) == {}
+    assert len(calls) == 1
+
+    # backend error: answer {} like fetch_problem_rules, retry next time
+    assert pipeline.get_problem_rules(4) == {}
+    assert pipeline.get_problem_rules(4) == {}
+    assert len(calls) == 3
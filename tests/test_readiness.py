@@ -0,0 +1,169 @@
+import time
+from unittest.mock import MagicMock
+
+import docker
+import pytest
+
+from dispatcher.meta import Readiness
+from dispatcher.readiness import (
+    PROBE_EXEC,
+    PROBE_HEALTHCHECK,
+    PROBE_TCP,
+    Probe,
+    ReadinessTimeout,
+    wait_until_ready,
+)
+
+
+def _exec_client(exit_codes):
+    """Client whose exec probes exit with the given codes, in order."""
+    client = MagicMock()
+    client.exec_create.return_value = {"Id": "exec-1"}
+    client.exec_inspect.side_effect = [{"ExitCode": c} for c in exit_codes]
+    return client
+
+
+def test_probe_from_readiness():
+    assert Probe.from_readiness(None) is None
+    tcp = Probe.from_readiness(Readiness(tcpPort=6379, timeout=3))
+    assert tcp.kind == PROBE_TCP
+    assert "6379" in tcp.command[-1]
+    assert tcp.timeout == 3
+    cmd = Probe.from_readiness(Readiness(command=["redis-cli", "ping"]))
+    assert cmd.kind == PROBE_EXEC
+    assert cmd.command == ["redis-cli", "ping"]
+
+
+def test_probe_from_container_prefers_healthcheck():
+    info = {
+        "Config": {
+            "Healthcheck": {
+                "Test": ["CMD", "pg_isready"]
+            },
+            "ExposedPorts": {
+                "5432/tcp": {}
+            },
+        }
+    }
+    assert Probe.from_container(info).kind == PROBE_HEALTHCHECK
+
+
+def test_probe_from_container_uses_lowest_tcp_port():
+    info = {
+        "Config": {
+            "Healthcheck": {
+                "Test": ["NONE"]
+            },
+            "ExposedPorts": {
+                "33060/tcp": {},
+                "3306/tcp": {},
+                "53/udp": {},
+            },
+        }
+    }
+    probe = Probe.from_container(info, timeout=7)
+    assert probe.kind == PROBE_TCP
+    assert "127.0.0.1/3306" in probe.command[-1]
+    assert probe.optional is True
+    assert probe.timeout == 7
+    assert Probe.from_container({"Config": {}}) is None
+
+
+def test_wait_until_ready_polls_until_probe_passes():
+    client = _exec_client([1, 1, 0])
+    ready_after = wait_until_ready(client, {"c1": Probe.exec(["true"])},
+                                   default_timeout=5,
+                                   initial_interval=0.01,
+                                   max_interval=0.02)
+    assert list(ready_after) == ["c1"]
+    assert client.exec_inspect.call_count == 3
+
+
+def test_wait_until_ready_healthcheck():
+    client = MagicMock()
+    client.inspect_container.side_effect = [
+        {
+            "State": {
+                "Status": "running",
+                "Health": {
+                    "Status": "starting"
+                }
+            }
+        },
+        {
+            "State": {
+                "Status": "running",
+                "Health": {
+                    "Status": "healthy"
+                }
+            }
+        },
+    ]
+    ready_after = wait_until_ready(client, {"c1": Probe.healthcheck()},
+                                   default_timeout=5,
+                                   initial_interval=0.01)
+    assert "c1" in ready_after
+
+
+def test_wait_until_ready_times_out():
+    client = MagicMock()
+    client.exec_create.return_value = {"Id": "exec-1"}
+    client.exec_inspect.return_value = {"ExitCode": 1}
+    with pytest.raises(ReadinessTimeout) as exc:
+        wait_until_ready(client, {"c1": Probe.exec(["false"], timeout=0.1)},
+                         default_timeout=30,
+                         initial_interval=0.01)
+    assert list(exc.value.pending) == ["c1"]
+
+
+def test_wait_until_ready_fails_fast_on_crash():
+    client = MagicMock()
+    client.exec_create.side_effect = docker.errors.APIError("not running")
+    client.inspect_container.return_value = {
+        "State": {
+            "Status": "exited",
+            "ExitCode": 1
+        }
+    }
+    with pytest.raises(RuntimeError, match="crashed"):
+        wait_until_ready(client, {"c1": Probe.tcp(6379)}, default_timeout=30)
+
+
+def test_exec_probe_attempt_is_bounded():
+    client = MagicMock()
+    client.exec_create.return_value = {"Id": "exec-1"}
+    # the probe command never finishes
+    client.exec_inspect.return_value = {"Running": True, "ExitCode": None}
+    start = time.monotonic()
+    with pytest.raises(ReadinessTimeout):
+        wait_until_ready(client,
+                         {"c1": Probe.exec(["sleep", "inf"], timeout=0.3)},
+                         default_timeout=30,
+                         initial_interval=0.01)
+    assert time.monotonic() - start < 2
+    client.exec_start.assert_called_with("exec-1", detach=True)
+
+
+def test_required_probe_that_cannot_run_fails_fast():
+    client = _exec_client([127])
+    with pytest.raises(ReadinessTimeout, match="cannot run"):
+        wait_until_ready(client, {"c1": Probe.tcp(6379)}, default_timeout=30)
+
+
+def test_optional_probes_are_given_up():
+    unavailable = Probe.tcp(6379)
+    unavailable.optional = True
+    never_ready = Probe.exec(["false"], timeout=0.1)
+    never_ready.optional = True
+    client = MagicMock()
+    client.exec_create.side_effect = lambda cid, *a, **kw: {"Id": cid}
+    client.exec_inspect.side_effect = lambda exec_id: {
+        "ExitCode": 127 if exec_id == "c1" else 1
+    }
+    ready_after = wait_until_ready(client, {
+        "c1": unavailable,
+        "c2": never_ready
+    },
+                                   default_timeout=30,
+                                   initial_interval=0.01)
+    assert ready_after == {}
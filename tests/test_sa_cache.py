@@ -0,0 +1,93 @@
+from dispatcher.constant import BuildStrategy, Language
+from dispatcher.meta import Meta, Task
+from dispatcher.sa_cache import StaticAnalysisCache
+
+
+def _meta(language=Language.C):
+    return Meta(
+        language=language,
+        tasks=[
+            Task(taskScore=100, memoryLimit=1024, timeLimit=1000, caseCount=1)
+        ],
+        buildStrategy=BuildStrategy.COMPILE,
+    )
+
+
+def _submission(tmp_path, name, source):
+    common = tmp_path / name / "src" / "common"
+    common.mkdir(parents=True)
+    (common / "main.c").write_text(source)
+    return tmp_path / name
+
+
+def test_key_depends_on_sources_rules_and_language(tmp_path):
+    rules = {"model": "black", "functions": ["printf"]}
+    a = _submission(tmp_path, "a", "int main(){}")
+    b = _submission(tmp_path, "b", "int main(){}")
+    c = _submission(tmp_path, "c", "int main(){return 1;}")
+    key = StaticAnalysisCache.make_key(a, _meta(), rules, False)
+
+    assert StaticAnalysisCache.make_key(b, _meta(), rules, False) == key
+    assert StaticAnalysisCache.make_key(c, _meta(), rules, False) != key
+    assert StaticAnalysisCache.make_key(a, _meta(Language.CPP), rules,
+                                        False) != key
+    assert StaticAnalysisCache.make_key(a, _meta(), rules, True) != key
+    assert StaticAnalysisCache.make_key(a, _meta(), {
+        "model": "white",
+        "functions": ["printf"]
+    }, False) != key
+
+
+def test_key_ignores_build_outputs(tmp_path):
+    rules = {"model": "black"}
+    sub = _submission(tmp_path, "a", "int main(){}")
+    key = StaticAnalysisCache.make_key(sub, _meta(), rules, True)
+    common = sub / "src" / "common"
+    (common / "a.out").write_bytes(b"\x7fELF")
+    (common / "main.o").write_bytes(b"obj")
+    assert StaticAnalysisCache.make_key(sub, _meta(), rules, True) == key
+    (common / "Makefile").write_text("all:\n\tcc main.c\n")
+    assert StaticAnalysisCache.make_key(sub, _meta(), rules, True) != key
+
+
+def test_lru_eviction_and_stats(tmp_path):
+    cache = StaticAnalysisCache(max_entries=2)
+    for key in ("k1", "k2"):
+        cache.put(key, True, {"status": "pass"}, tmp_path)
+    assert cache.get("k1") == (True, {"status": "pass"})
+    cache.put("k3", False, {"status": "fail"}, tmp_path)
+
+    assert cache.get("k2") is None
+    assert cache.get("k3") == (False, {"status": "fail"})
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+
+def test_cached_payload_is_copied(tmp_path):
+    cache = StaticAnalysisCache(max_entries=4)
+    payload = {"status": "fail", "json_result": {"functions": []}}
+    cache.put("k", False, payload, tmp_path)
+    payload["json_result"]["functions"].append("printf")
+    _, cached = cache.get("k")
+    cached["status"] = "mutated"
+    assert cache.get("k") == (False, {
+        "status": "fail",
+        "json_result": {
+            "functions": []
+        }
+    })
+
+
+def test_submission_specific_messages_are_not_cached(tmp_path):
+    cache = StaticAnalysisCache(max_entries=4)
+    submission_path = tmp_path / "sub-1"
+    cache.put(
+        "k", False, {
+            "status": "fail",
+            "message":
+            f"Not found 'main.c'. Source path: {submission_path}/src",
+        }, submission_path)
+    assert cache.get("k") is None
@@ -0,0 +1,66 @@
+import os
+import time
+
+import pytest
+
+from dispatcher.sa_pool import (
+    StaticAnalysisPool,
+    StaticAnalysisTimeout,
+    StaticAnalysisWorkerError,
+)
+
+
+def _echo(**kwargs):
+    return True, {"pid": os.getpid(), **kwargs}, None
+
+
+def _slow(seconds=0, **kwargs):
+    time.sleep(seconds)
+    return True, {"pid": os.getpid()}, None
+
+
+def _boom(**kwargs):
+    raise RuntimeError("libclang exploded")
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def factory(func, workers=1, timeout=30):
+        pool = StaticAnalysisPool(workers, timeout, func=func)
+        pools.append(pool)
+        return pool
+
+    yield factory
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_pool_reuses_worker_process(make_pool):
+    pool = make_pool(_echo)
+    _, first, _ = pool.run(submission_id="a")
+    _, second, _ = pool.run(submission_id="b")
+    assert first["submission_id"] == "a"
+    assert second["submission_id"] == "b"
+    assert first["pid"] == second["pid"] != os.getpid()
+
+
+def test_pool_timeout_replaces_worker(make_pool):
+    pool = make_pool(_slow)
+    _, before, _ = pool.run(seconds=0)
+    with pytest.raises(StaticAnalysisTimeout):
+        pool.run(timeout=0.5, seconds=30)
+    _, after, _ = pool.run(seconds=0)
+    assert before["pid"] != after["pid"]
+
+
+def test_pool_reports_job_errors(make_pool):
+    pool = make_pool(_boom)
+    with pytest.raises(StaticAnalysisWorkerError, match="libclang exploded"):
+        pool.run()
+
+
+def test_pool_requires_workers():
+    with pytest.raises(ValueError):
+        StaticAnalysisPool(0, 10)
@@ -0,0 +1,166 @@
+import importlib.util
+from pathlib import Path
+
+from dispatcher.constant import AcceptedFormat, BuildStrategy, ExecutionMode, Language
+from dispatcher.dispatcher import Dispatcher
+from dispatcher.meta import Meta, ScoringPolicy, Task
+from dispatcher.scoring_policy import evaluate_scoring_policy
+
+EXAMPLE_SCORER = (Path(__file__).resolve().parent.parent / "problem" /
+                  "custom-scorer-test" / "score.py")
+
+
+def _case(status, exec_time=100):
+    return {"status": status, "execTime": exec_time, "memoryUsage": 1024}
+
+
+def _meta(policy=None, scoring_script=False):
+    return Meta(
+        language=Language.PY,
+        tasks=[
+            Task(taskScore=30, memoryLimit=256, timeLimit=1000, caseCount=2),
+            Task(taskScore=40, memoryLimit=256, timeLimit=1000, caseCount=2),
+            Task(taskScore=30, memoryLimit=512, timeLimit=2000, caseCount=2),
+        ],
+        acceptedFormat=AcceptedFormat.CODE,
+        executionMode=ExecutionMode.GENERAL,
+        buildStrategy=BuildStrategy.COMPILE,
+        scoringScript=scoring_script,
+        scoringPolicy=policy,
+    )
+
+
+def _evaluate(policy, submission_result, late_seconds=0):
+    dispatcher = Dispatcher()
+    tasks, _ = dispatcher._build_scoring_tasks(_meta(), submission_result)
+    return evaluate_scoring_policy(
+        ScoringPolicy.parse_obj(policy),
+        tasks,
+        dispatcher._build_scoring_stats(submission_result),
+        late_seconds,
+    )
+
+
+RESULT = [
+    [_case("AC"), _case("WA")],
+    [_case("AC"), _case("AC")],
+    [_case("TLE", 2000), _case("AC")],
+]
+
+
+def test_default_policy_is_all_or_nothing():
+    result = _evaluate({}, RESULT)
+    assert result["status"] == "OK"
+    assert result["breakdown"]["taskScores"] == [0, 40, 0]
+    assert result["score"] == 40
+
+
+def test_partial_credit_by_share_of_ac_cases():
+    result = _evaluate({"partialCredit": True}, RESULT)
+    assert result["breakdown"]["taskScores"] == [15, 40, 15]
+    assert result["score"] == 70
+
+
+def test_runtime_bonus_metric_and_require_all_ac():
+    fast = [[_case("AC", 10)] * 2] * 3
+    policy = {"runtimeBonus": {"thresholdMs": 50, "rate": 0.1}}
+    assert _evaluate(policy, fast)["score"] == 100
+    assert _evaluate(policy, fast)["breakdown"]["runtimeBonus"] == 10
+
+    policy = {
+        "partialCredit": True,
+        "runtimeBonus": {
+            "thresholdMs": 500,
+            "rate": 0.1,
+            "requireAllAC": True,
+        },
+    }
+    assert _evaluate(policy, RESULT)["breakdown"]["runtimeBonus"] == 0
+
+    policy["runtimeBonus"].update(requireAllAC=False, metric="maxRunTime")
+    assert _evaluate(policy, RESULT)["breakdown"]["runtimeBonus"] == 0
+    policy["runtimeBonus"]["thresholdMs"] = 5000
+    assert _evaluate(policy, RESULT)["breakdown"]["runtimeBonus"] == 7
+
+
+def test_late_penalty_capped_and_grace_period():
+    policy = {
+        "partialCredit": True,
+        "latePenalty": {
+            "perDay": 0.1,
+            "max": 0.3,
+            "graceSeconds": 3600,
+        },
+    }
+    assert _evaluate(policy, RESULT, late_seconds=3600)["score"] == 70
+    assert _evaluate(policy, RESULT, late_seconds=-1)["score"] == 70
+    result = _evaluate(policy, RESULT, late_seconds=86400)
+    assert result["breakdown"]["latePenalty"] == 7
+    assert result["score"] == 63
+    result = _evaluate(policy, RESULT, late_seconds=10 * 86400)
+    assert result["breakdown"]["latePenalty"] == 21
+    assert result["score"] == 49
+
+
+def test_policy_matches_example_scorer_script():
+    spec = importlib.util.spec_from_file_location("example_score",
+                                                  EXAMPLE_SCORER)
+    example = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(example)
+    policy = {
+        "partialCredit": True,
+        "runtimeBonus": {
+            "thresholdMs": 500,
+            "rate": 0.05
+        },
+        "latePenalty": {
+            "perDay": 0.1,
+            "max": 0.3
+        },
+    }
+    dispatcher = Dispatcher()
+    for result in (RESULT, [[_case("AC", 10)] * 2] * 3):
+        tasks, _ = dispatcher._build_scoring_tasks(_meta(), result)
+        stats = dispatcher._build_scoring_stats(result)
+        for late_seconds in (0, 86400, 5 * 86400):
+            expected = example.calculate_score({
+                "tasks": tasks,
+                "stats": stats,
+                "lateSeconds": late_seconds,
+            })
+            actual = _evaluate(policy, result, late_seconds)
+            assert actual["score"] == expected["score"]
+            assert (actual["breakdown"]["taskScores"] == expected["breakdown"]
+                    ["taskScores"])
+
+
+def test_dispatcher_runs_policy_without_scorer_container(monkeypatch):
+    dispatcher = Dispatcher()
+    submission_id = "policy-sub"
+    meta = _meta(policy=ScoringPolicy(partialCredit=True), scoring_script=True)
+    dispatcher._prepare_custom_scorer(
+        submission_id=submission_id,
+        problem_id=1,
+        meta=meta,
+        submission_path=dispatcher.SUBMISSION_DIR / submission_id,
+    )
+    assert dispatcher.custom_scorer_info[submission_id]["enabled"] is True
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unexpected call")
+
+    monkeypatch.setattr("dispatcher.dispatcher.run_custom_scorer", fail)
+    # no late penalty in the policy, so no backend call either
+    monkeypatch.setattr(dispatcher, "_fetch_late_seconds", fail)
+    scoring_payload, status_override = dispatcher._run_custom_scorer_if_needed(
+        submission_id=submission_id,
+        meta=meta,
+        submission_result=RESULT,
+        sa_payload=None,
+        checker_payload=None,
+    )
+    assert status_override is None
+    assert scoring_payload["status"] == "OK"
+    assert scoring_payload["score"] == 70
+    assert scoring_payload["breakdown"]["taskScores"] == [15, 40, 15]
+    assert set(scoring_payload) == {"status", "score", "message", "breakdown"}
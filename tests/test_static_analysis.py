@@ -305,3 +305,190 @@ def test_get_violations_python_whitelist_blocks_unlisted_import():
     }
     violations = analyzer.get_violations(facts, rules, Language.PY)
     assert any(item["content"] == "sys" for item in violations["imports"])
+
+
+def test_detect_include_args_probes_compilers_once(monkeypatch):
+    from dispatcher import static_analysis
+
+    calls = []
+
+    def fake_check_output(cmd, text=True):
+        calls.append(cmd)
+        return "/fake/include\n"
+
+    static_analysis._detect_include_args.cache_clear()
+    monkeypatch.setattr(static_analysis.subprocess, "check_output",
+                        fake_check_output)
+    try:
+        first = static_analysis.detect_include_args()
+        first.append("-DMUTATED")
+        second = static_analysis.detect_include_args()
+    finally:
+        static_analysis._detect_include_args.cache_clear()
+    assert len(calls) == 2
+    assert "-DMUTATED" not in second
+    assert "-I/usr/include" in second
+
+
+def test_leading_system_includes_stop_at_first_code_line(tmp_path):
+    from dispatcher.static_analysis import _leading_system_includes
+
+    source = tmp_path / "main.cpp"
+    source.write_text("// header comment\n"
+                      "/* multi\n   line */\n"
+                      "#include <bits/stdc++.h>\n"
+                      "#include <vector> // for v\n"
+                      "\n"
+                      "#include \"local.h\"\n"
+                      "#include <map>\n"
+                      "int main() {}\n")
+    assert _leading_system_includes(source) == ("bits/stdc++.h", "vector")
+
+
+def test_pch_only_for_cpp_when_enabled(tmp_path, monkeypatch):
+    from dispatcher import static_analysis
+
+    source = tmp_path / "main.cpp"
+    source.write_text("#include <bits/stdc++.h>\nint main() {}\n")
+    built = []
+    monkeypatch.setattr(static_analysis._PCH_CACHE, "get",
+                        lambda *args: built.append(args) or "/tmp/x.pch")
+    cpp_args = ["-x", "c++", "-std=c++17"]
+
+    monkeypatch.setattr(static_analysis.dispatcher_config, "SA_CLANG_PCH",
+                        False)
+    assert static_analysis._pch_args(source, Language.CPP, cpp_args, []) == []
+    monkeypatch.setattr(static_analysis.dispatcher_config, "SA_CLANG_PCH",
+                        True)
+    assert static_analysis._pch_args(source, Language.C,
+                                     ["-x", "c", "-std=c11"], []) == []
+    assert static_analysis._pch_args(source, Language.CPP, cpp_args,
+                                     []) == ["-include-pch", "/tmp/x.pch"]
+    assert built == [(("bits/stdc++.h", ), cpp_args, [])]
+
+
+def test_zip_c_analysis_reparses_only_changed_files(tmp_path, monkeypatch):
+    from dispatcher import static_analysis
+
+    static_analysis._FILE_FACT_CACHE.clear()
+    parsed = []
+    real_facts = static_analysis._cpp_file_facts
+
+    def counting_facts(target_path, args):
+        parsed.append(target_path.name)
+        return real_facts(target_path, args)
+
+    monkeypatch.setattr(static_analysis, "_cpp_file_facts", counting_facts)
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "util.h").write_text("int helper(int x);\n")
+    (src / "util.c"
+     ).write_text("#include \"util.h\"\nint helper(int x) { return x + 1; }\n")
+    (src / "main.c"
+     ).write_text("#include \"util.h\"\nint main() { return helper(1); }\n")
+
+    def run():
+        result = StaticAnalyzer().analyze_zip_sources(src, Language.C, {})
+        assert result.is_success()
+        return result
+
+    run()
+    assert sorted(parsed) == ["main.c", "util.c", "util.h"]
+
+    parsed.clear()
+    run()
+    assert parsed == []
+
+    parsed.clear()
+    (src / "main.c"
+     ).write_text("#include \"util.h\"\nint main() { return helper(2); }\n")
+    run()
+    assert parsed == ["main.c"]
+
+    parsed.clear()
+    (src / "util.h").write_text("int helper(int y);\n")
+    run()
+    assert sorted(parsed) == ["main.c", "util.c", "util.h"]
+    static_analysis._FILE_FACT_CACHE.clear()
+
+
+def test_zip_c_analysis_merges_in_path_order(tmp_path, monkeypatch):
+    from dispatcher import static_analysis
+
+    static_analysis._FILE_FACT_CACHE.clear()
+    monkeypatch.setattr(static_analysis.dispatcher_config, "SA_FILE_WORKERS",
+                        4)
+    src = tmp_path / "src"
+    src.mkdir()
+    names = [f"part{i}.c" for i in range(6)]
+    for i, name in enumerate(names):
+        (src / name).write_text(f"int f{i}(void) {{ return {i}; }}\n")
+    seen = {}
+
+    def capture(self, facts, rules, language):
+        seen["files"] = [item["file"] for item in facts["syntax"]]
+        return {}
+
+    monkeypatch.setattr(StaticAnalyzer, "get_violations", capture)
+    StaticAnalyzer().analyze_zip_sources(src, Language.C, {})
+    files = list(dict.fromkeys(seen["files"]))
+    assert files == names
+    static_analysis._FILE_FACT_CACHE.clear()
+
+
+def test_rule_matcher_exact_suffix_and_glob():
+    from dispatcher.static_analysis import RuleMatcher
+
+    matcher = RuleMatcher(["sort", "path.join", "str*", "operator*", "q?"])
+    assert matcher.matches("sort")
+    assert matcher.matches("std.sort")
+    assert matcher.matches("os.path.join")
+    assert not matcher.matches("os.join")
+    assert not matcher.matches("mysort")
+    # globs match the whole name or a dotted suffix of it
+    assert matcher.matches("strcpy")
+    assert matcher.matches("std.strlen")
+    assert not matcher.matches("wcsstr")
+    assert matcher.matches("qs")
+    assert not matcher.matches("qsort")
+    # C++ operator names are literal
+    assert matcher.matches("operator*")
+    assert not matcher.matches("operator<<")
+
+
+def test_compiled_rules_are_cached_per_rules_json():
+    from dispatcher.static_analysis import compile_rules
+
+    first = compile_rules({"model": "white", "functions": ["printf"]})
+    second = compile_rules({"functions": ["printf"], "model": "white"})
+    assert first is second
+    assert first.model == "white"
+    assert first.functions.matches("printf")
+    assert compile_rules({}).model == "black"
+
+
+def test_crashed_analysis_reports_system_error(tmp_path, monkeypatch):
+    submission_dir = tmp_path / "crash-sa"
+    src_dir = submission_dir / "src" / "common"
+    src_dir.mkdir(parents=True)
+    (src_dir / "function.h").write_text("int add(int a, int b);\n")
+
+    def crash(self, *args, **kwargs):
+        raise OSError("disk gone")
+
+    monkeypatch.setattr(StaticAnalyzer, "_analyze_c_cpp", crash)
+    success, payload, task_content = run_static_analysis(
+        submission_id="crash-sa",
+        submission_path=submission_dir,
+        meta=_function_only_meta(Language.C),
+        rules_json={
+            "model": "black",
+            "functions": ["printf"]
+        },
+        is_zip_mode=False,
+    )
+
+    assert success is False
+    assert payload["status"] == "sys_err"
+    assert "disk gone" in payload["message"]
+    assert task_content is not None
@@ -1,7 +1,11 @@
+import io
 import json
 import pathlib
+import tarfile
 import pytest
 
+from dispatcher import docker_labels
+
 
 @pytest.mark.parametrize(
     "stdout, answer, excepted",
@@ -242,6 +246,7 @@ def test_sandbox_run_skips_stdin_bind_when_missing(monkeypatch, tmp_path):
             host_config,
             networking_config=None,
             environment=None,
+            labels=None,
         ):
             self.last_volumes = volumes
             return {"Id": "dummy", "Warning": None}
@@ -327,6 +332,7 @@ def test_sandbox_run_sets_allow_write_and_network(monkeypatch, tmp_path,
             host_config,
             networking_config=None,
             environment=None,
+            labels=None,
         ):
             self.container_kwargs = {
                 "image": image,
@@ -336,6 +342,7 @@ def test_sandbox_run_sets_allow_write_and_network(monkeypatch, tmp_path,
                 "working_dir": working_dir,
                 "host_config": host_config,
                 "environment": environment,
+                "labels": labels,
             }
             return {"Id": "dummy", "Warning": None}
 
@@ -374,6 +381,7 @@ def test_sandbox_run_sets_allow_write_and_network(monkeypatch, tmp_path,
         stdin_path=str(stdin_path),
         allow_write=True,
         network_mode=network_mode,
+        submission_id="sub-1",
     )
     runner.run()
 
@@ -385,3 +393,33 @@ def test_sandbox_run_sets_allow_write_and_network(monkeypatch, tmp_path,
     assert client.container_kwargs["network_disabled"] is expected_disabled
     expected_net_mode = None if expected_disabled else network_mode
     assert client.host_config_kwargs["network_mode"] == expected_net_mode
+    labels = client.container_kwargs["labels"]
+    assert labels[docker_labels.SUBMISSION] == "sub-1"
+    assert labels[docker_labels.ROLE] == docker_labels.ROLE_SANDBOX
+
+
+def test_sandbox_save_streams_result_file(tmp_path):
+    from runner.sandbox import STDOUT_PREVIEW_BYTES, Sandbox
+
+    payload = b"line\n" * 100000
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        info = tarfile.TarInfo("stdout")
+        info.size = len(payload)
+        tar.addfile(info, io.BytesIO(payload))
+    data = archive.getvalue()
+
+    class DummyDockerClient:
+
+        def get_archive(self, container, path):
+            assert path == "/result/stdout"
+            return (data[i:i + 4096] for i in range(0, len(data), 4096)), {}
+
+    sandbox = Sandbox.__new__(Sandbox)
+    sandbox.client = DummyDockerClient()
+    dest = tmp_path / "0000.out"
+
+    # only a preview of the output stays in memory
+    assert sandbox.save("dummy", "/result/", "stdout",
+                        str(dest)) == (payload[:STDOUT_PREVIEW_BYTES].decode())
+    assert dest.read_bytes() == payload
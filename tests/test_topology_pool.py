@@ -0,0 +1,47 @@
+import time
+
+from dispatcher.topology_pool import TopologyPool, topology_key
+
+
+def _record(topology_id):
+    return {"topology_id": topology_id, "container_ids": []}
+
+
+def test_key_is_order_insensitive_for_config_dicts():
+    a = topology_key({"model": "white", "url": ["a.test"]}, [], None)
+    b = topology_key({"url": ["a.test"], "model": "white"}, [], {})
+    assert a == b
+    assert a != topology_key({"model": "black"}, [], None)
+    assert topology_key({}, [], {"env": "sha256:1"}) != topology_key(
+        {}, [], {"env": "sha256:2"})
+
+
+def test_acquire_returns_released_topology_once():
+    pool = TopologyPool(max_size=4, idle_seconds=60)
+    assert pool.acquire("k") is None
+    pool.release("k", "t1", _record("t1"))
+    assert pool.acquire("other") is None
+    assert pool.acquire("k")["topology_id"] == "t1"
+    assert pool.acquire("k") is None
+    assert pool.stats()["hits"] == 1
+    assert pool.stats()["misses"] == 3
+
+
+def test_release_evicts_least_recently_released():
+    pool = TopologyPool(max_size=2, idle_seconds=60)
+    assert pool.release("k", "t1", _record("t1")) == []
+    assert pool.release("k", "t2", _record("t2")) == []
+    evicted = pool.release("j", "t3", _record("t3"))
+    assert [r["topology_id"] for r in evicted] == ["t1"]
+    assert pool.stats()["idle"] == 2
+
+
+def test_expire_removes_idle_topologies():
+    pool = TopologyPool(max_size=4, idle_seconds=0.05)
+    pool.release("k", "t1", _record("t1"))
+    assert pool.expire() == []
+    time.sleep(0.1)
+    pool.release("k", "t2", _record("t2"))
+    assert [r["topology_id"] for r in pool.expire()] == ["t1"]
+    assert [r["topology_id"] for r in pool.drain()] == ["t2"]
+    assert pool.stats()["idle"] == 0
@@ -0,0 +1,114 @@
+"""Offline load test of the AI checker path through the AI gateway.
+
+Starts ``tools/stub_model_server.py`` and ``runner/ai_gateway.py`` in this
+process and judges ``--cases`` cases with the checker of
+``problem/ai-checker-test``, ``--parallel`` at a time, as the dispatcher
+does for a rejudge: each case runs the checker script in its own
+interpreter with AI_GATEWAY_URL set. Only ``--distinct`` different student
+answers are used, so most prompts repeat.
+
+Compared setups:
+
+- ``direct``: the checkers call the stub model themselves
+- ``gateway``: through the gateway, with its concurrency limit and cache
+
+Example::
+
+    python tools/bench_ai_gateway.py --cases 40 --parallel 8 --latency 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from runner.ai_gateway import Gateway, serve  # noqa: E402
+from stub_model_server import StubModel, make_server  # noqa: E402
+
+PROBLEM = ROOT / "problem" / "ai-checker-test"
+
+
+def _start(server) -> str:
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def run_checker(workdir: Path, case: int, answer: str, url: str) -> str:
+    case_dir = workdir / str(case)
+    case_dir.mkdir()
+    (case_dir / "student.out").write_text(answer)
+    proc = subprocess.run(
+        [
+            sys.executable,
+            str(PROBLEM / "custom_checker.py"),
+            str(PROBLEM / "testcase" / "0000.in"),
+            str(case_dir / "student.out"),
+            str(PROBLEM / "testcase" / "0000.out"),
+        ],
+        env={
+            **os.environ,
+            "AI_API_KEY": "offline",
+            "AI_MODEL": "gemini-2.5-flash",
+            "AI_GATEWAY_URL": url,
+            "CHECKER_DEBUG": "0",
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return proc.stdout.split()[1]
+
+
+def run_setup(url: str, answers: list, parallel: int) -> tuple:
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(parallel) as pool:
+            verdicts = list(
+                pool.map(lambda item: run_checker(Path(tmp), *item, url),
+                         enumerate(answers)))
+        return time.perf_counter() - start, verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=40)
+    parser.add_argument("--parallel", type=int, default=8)
+    parser.add_argument("--distinct", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0)
+    args = parser.parse_args()
+
+    expected = (PROBLEM / "testcase" / "0000.out").read_text().strip()
+    pool = [expected] + [f"wrong answer {i}" for i in range(args.distinct)]
+    answers = [pool[i % args.distinct] for i in range(args.cases)]
+
+    print(f"{'setup':<10}{'seconds':>10}{'cases/s':>10}{'model calls':>13}"
+          f"{'max at once':>13}{'AC':>5}")
+    for setup in ("direct", "gateway"):
+        model = StubModel(args.latency)
+        url = _start(make_server("127.0.0.1", 0, model))
+        if setup == "gateway":
+            gateway = Gateway(url, args.concurrency, args.rate)
+            url = _start(serve(gateway, "127.0.0.1", 0))
+        elapsed, verdicts = run_setup(url, answers, args.parallel)
+        stats = model.stats()
+        print(f"{setup:<10}{elapsed:>10.2f}{args.cases / elapsed:>10.1f}"
+              f"{stats['requests']:>13}{stats['maxActive']:>13}"
+              f"{verdicts.count('AC'):>5}")
+
+
+if __name__ == "__main__":
+    main()
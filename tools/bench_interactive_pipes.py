@@ -0,0 +1,111 @@
+"""Round trips per second of each interactive pipe mode.
+
+Builds the teacher and student of ``problem/interactive-pipe-stress`` with
+gcc. The teacher sends numbers one at a time and waits for each reply. The
+pair is wired with ``interactive_orchestrator._setup_pipes`` in every mode
+and run directly, without sandbox_interactive, so the numbers compare the
+pipe setups alone.
+
+Example::
+
+    python tools/bench_interactive_pipes.py --round-trips 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from runner.interactive_orchestrator import _setup_pipes  # noqa: E402
+
+PROBLEM = ROOT / "problem" / "interactive-pipe-stress"
+
+# (label, pipe mode, transcript bytes)
+SETUPS = [
+    ("fifo", "fifo", 0),
+    ("devfd", "devfd", 0),
+    ("largepipe", "largepipe", 0),
+    ("largepipe+transcript", "largepipe", 64 * 1024),
+]
+
+
+def _compile(src: Path, out: Path):
+    subprocess.run(["gcc", "-O2", "-o", str(out), str(src)], check=True)
+
+
+def run_setup(workdir: Path, teacher: Path, student: Path, mode: str,
+              transcript_bytes: int, pipe_size: int) -> tuple:
+    tmpdir = Path(tempfile.mkdtemp(dir=workdir))
+    bundle = _setup_pipes(tmpdir, mode, pipe_size, transcript_bytes)
+    opened = []
+
+    def open_end(path: str, flags: int) -> int:
+        opened.append(os.open(path, flags))
+        return opened[-1]
+
+    start = time.perf_counter()
+    procs = [
+        subprocess.Popen(
+            [str(teacher)],
+            cwd=workdir,
+            stdin=open_end(bundle["teacher"]["stdin"], os.O_RDONLY),
+            stdout=open_end(bundle["teacher"]["stdout"], os.O_WRONLY),
+        ),
+        subprocess.Popen(
+            [str(student)],
+            stdin=open_end(bundle["student"]["stdin"], os.O_RDONLY),
+            stdout=open_end(bundle["student"]["stdout"], os.O_WRONLY),
+        ),
+    ]
+    for fd in opened + bundle["keep_fds"] + bundle.get("holder", []):
+        os.close(fd)
+    for proc in procs:
+        proc.wait()
+    elapsed = time.perf_counter() - start
+    for thread in bundle.get("relay_threads", []):
+        thread.join(timeout=1.0)
+    verdict = (workdir / "Check_Result").read_text()
+    if "STATUS: AC" not in verdict:
+        raise SystemExit(f"{mode}: {verdict}")
+    return elapsed, bundle.get("pipe_capacity"), bundle.get("transcripts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--round-trips", type=int, default=100000)
+    parser.add_argument("--pipe-size", type=int, default=1024 * 1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        teacher = workdir / "teacher"
+        student = workdir / "student"
+        _compile(PROBLEM / "Teacher_file.c", teacher)
+        _compile(PROBLEM / "src" / "main.c", student)
+        (workdir / "testcase.in").write_text(f"{args.round_trips}\n")
+
+        print(f"{'mode':<22}{'round trips/s':>15}{'pipe bytes':>12}"
+              f"{'transcript':>12}")
+        for label, mode, transcript_bytes in SETUPS:
+            best, capacity, transcripts = None, None, None
+            for _ in range(args.repeat):
+                elapsed, capacity, transcripts = run_setup(
+                    workdir, teacher, student, mode, transcript_bytes,
+                    args.pipe_size)
+                best = elapsed if best is None else min(best, elapsed)
+            captured = sum(t.total for t in (transcripts or {}).values())
+            print(f"{label:<22}{args.round_trips / best:>15.0f}"
+                  f"{capacity or 65536:>12}{captured:>12}")
+
+
+if __name__ == "__main__":
+    main()
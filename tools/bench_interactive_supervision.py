@@ -0,0 +1,134 @@
+"""Micro-benchmark for interactive process supervision.
+
+Runs the teacher / student pair of an interactive problem (by default
+``interactive-py-teacher-c-student``) wired together through pipes, and
+waits for them with:
+
+- ``wait``: plain blocking ``Popen.wait()``, the lower bound
+- ``poll``: the previous supervision loop, ``poll()`` every 50 ms
+- ``event``: ``interactive_orchestrator._supervise`` (pidfd / waitid)
+
+The sandbox binary is not involved, so the difference to ``wait`` is the
+per-case wall-clock overhead the supervision loop itself adds.
+
+Example::
+
+    python tools/bench_interactive_supervision.py --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from runner.interactive_orchestrator import _supervise  # noqa: E402
+
+
+def poll_supervise(procs: dict, deadline: float, kick_fd):
+    """The pre-pidfd supervision loop."""
+    while time.time() < deadline:
+        all_done = True
+        for proc in procs.values():
+            if proc.poll() is None:
+                all_done = False
+        if (kick_fd is not None and procs["student"].poll() is not None
+                and procs["teacher"].poll() is None):
+            os.write(kick_fd, b"\n")
+            os.close(kick_fd)
+            kick_fd = None
+        if all_done:
+            break
+        time.sleep(0.05)
+    return kick_fd
+
+
+def wait_supervise(procs: dict, deadline: float, kick_fd):
+    for proc in procs.values():
+        proc.wait()
+    return kick_fd
+
+
+SUPERVISORS = {
+    "wait": wait_supervise,
+    "poll": poll_supervise,
+    "event": _supervise,
+}
+
+
+def run_case(teacher_cmd, student_cmd, workdir: Path, supervise) -> float:
+    to_student_r, to_student_w = os.pipe()
+    to_teacher_r, to_teacher_w = os.pipe()
+    start = time.perf_counter()
+    procs = {
+        "teacher":
+        subprocess.Popen(teacher_cmd,
+                         cwd=workdir,
+                         stdin=to_teacher_r,
+                         stdout=to_student_w),
+        "student":
+        subprocess.Popen(student_cmd, stdin=to_student_r, stdout=to_teacher_w),
+    }
+    for fd in (to_student_r, to_student_w, to_teacher_r):
+        os.close(fd)
+    # the kick fd is the student's end of the teacher's input, as in the
+    # orchestrator
+    kick_fd = supervise(procs, time.time() + 10, to_teacher_w)
+    elapsed = time.perf_counter() - start
+    if kick_fd is not None:
+        os.close(kick_fd)
+    status = (workdir / "Check_Result").read_text().split()[1]
+    if status != "AC":
+        raise SystemExit(f"unexpected verdict {status}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--problem",
+                        type=Path,
+                        default=ROOT / "problem" /
+                        "interactive-py-teacher-c-student")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        student = workdir / "student"
+        subprocess.run([
+            "gcc", "-O2", "-o",
+            str(student),
+            str(args.problem / "src" / "main.c")
+        ],
+                       check=True)
+        teacher_cmd = [
+            sys.executable,
+            str(args.problem / "Teacher_file.py"),
+        ]
+        results = {}
+        for name, supervise in SUPERVISORS.items():
+            run_case(teacher_cmd, [str(student)], workdir, supervise)  # warmup
+            results[name] = [
+                run_case(teacher_cmd, [str(student)], workdir, supervise)
+                for _ in range(args.repeat)
+            ]
+
+    baseline = statistics.median(results["wait"])
+    print(f"{'mode':<8}{'median ms':>12}{'mean ms':>12}{'overhead ms':>14}")
+    for name, samples in results.items():
+        median = statistics.median(samples)
+        print(f"{name:<8}{median * 1000:>12.2f}"
+              f"{statistics.mean(samples) * 1000:>12.2f}"
+              f"{(median - baseline) * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
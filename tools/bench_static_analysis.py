@@ -0,0 +1,468 @@
+"""Throughput benchmark for static analysis.
+
+Runs ``run_static_analysis`` over a corpus made of
+
+* the samples under ``problem/`` that ship source code (their
+  ``rules.json`` when present, a default blacklist otherwise), and
+* generated Python / C / C++ sources, single file and zip (multi-file with
+  a Makefile), each once clean and once with forbidden constructs,
+
+and reports, per case and in total, the time spent in every phase: rule
+fetch, include detection, parse, AST visit, cycle detection and violation
+matching, plus the peak memory of the run.
+
+No backend is needed: ``pipeline._request_problem_rules`` (the request
+behind ``fetch_problem_rules`` / ``get_problem_rules``) is replaced by a
+lookup into the corpus. Phases are measured by wrapping the analyzer's
+functions, so the numbers come from the production code path.
+
+Example::
+
+    python tools/bench_static_analysis.py --repeat 3 --scale 50
+    python tools/bench_static_analysis.py --only synthetic --trace-memory
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import contextlib
+import functools
+import json
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from dispatcher import config as dispatcher_config  # noqa: E402
+from dispatcher import pipeline, static_analysis  # noqa: E402
+from dispatcher.constant import (  # noqa: E402
+    AcceptedFormat, BuildStrategy, Language,
+)
+from dispatcher.meta import Meta, Task  # noqa: E402
+
+PHASES = ("rules", "includes", "parse", "visit", "cycles", "violations")
+
+DEFAULT_RULES = {
+    "model": "black",
+    "imports": ["os", "subprocess"],
+    "headers": ["windows.h"],
+    "functions": ["system", "exec", "eval", "fork", "popen"],
+    "syntax": [],
+}
+
+_EXT = {Language.C: ".c", Language.CPP: ".cpp", Language.PY: ".py"}
+
+
+@dataclass
+class Case:
+    name: str
+    language: Language
+    zip_mode: bool
+    files: dict[str, str]
+    rules: dict
+    forbidden: bool = False
+    problem_id: int = 0
+
+
+@dataclass
+class CaseResult:
+    case: Case
+    verdict: str
+    total: float
+    phases: dict[str, float] = field(default_factory=dict)
+    peak_py_bytes: int = 0
+
+
+# -----------------------------------------------------------------------------
+# Phase instrumentation
+# -----------------------------------------------------------------------------
+class PhaseTimer:
+    """Accumulates wall time per phase; nested (recursive) calls count once."""
+
+    def __init__(self):
+        self.totals: dict[str, float] = defaultdict(float)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._patches = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        depth = getattr(self._local, name, 0)
+        setattr(self._local, name, depth + 1)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            setattr(self._local, name, depth)
+            if depth == 0:
+                with self._lock:
+                    self.totals[name] += time.perf_counter() - start
+
+    def wrap(self, owner, attr: str, name: str):
+        original = getattr(owner, attr)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            with self.phase(name):
+                return original(*args, **kwargs)
+
+        self._patches.append((owner, attr, original))
+        setattr(owner, attr, timed)
+
+    def reset(self):
+        with self._lock:
+            self.totals = defaultdict(float)
+
+    def restore(self):
+        for owner, attr, original in reversed(self._patches):
+            setattr(owner, attr, original)
+        self._patches.clear()
+
+
+class _TimedIndex:
+
+    def __init__(self, index, timer: PhaseTimer):
+        self._index = index
+        self._timer = timer
+
+    def parse(self, *args, **kwargs):
+        with self._timer.phase("parse"):
+            return self._index.parse(*args, **kwargs)
+
+
+def instrument(timer: PhaseTimer):
+    sa = static_analysis
+    timer.wrap(sa, "detect_include_args", "includes")
+    timer.wrap(ast, "parse", "parse")
+    if sa.clang is not None:
+        get_index = sa._get_clang_index
+        sa._get_clang_index = lambda: _TimedIndex(get_index(), timer)
+        timer._patches.append((sa, "_get_clang_index", get_index))
+        timer.wrap(sa.CppAstVisitor, "visit", "visit")
+        timer.wrap(sa.CppAstVisitor, "detect_cycles", "cycles")
+    timer.wrap(sa.DefinitionVisitor, "visit", "visit")
+    timer.wrap(sa.PythonAstVisitor, "visit", "visit")
+    timer.wrap(sa.PythonAstVisitor, "detect_cycles", "cycles")
+    timer.wrap(sa.StaticAnalyzer, "get_violations", "violations")
+
+
+# -----------------------------------------------------------------------------
+# Corpus
+# -----------------------------------------------------------------------------
+def _problem_cases() -> list[Case]:
+    cases = []
+    for meta_path in sorted((REPO_ROOT / "problem").rglob("meta.json")):
+        problem_dir = meta_path.parent
+        src = problem_dir / "src"
+        if not src.is_dir():
+            continue
+        meta = json.loads(meta_path.read_text())
+        try:
+            language = Language(meta.get("language", Language.PY))
+        except ValueError:
+            continue
+        ext = _EXT[language]
+        zip_mode = (meta.get("acceptedFormat") == "zip"
+                    or meta.get("submissionMode") == 1
+                    or (src / "Makefile").exists())
+        sources = sorted(p for p in src.iterdir()
+                         if p.is_file() and p.suffix == ext)
+        if not sources:
+            continue
+        if zip_mode:
+            files = {p.name: p.read_text(errors="replace") for p in sources}
+            makefile = src / "Makefile"
+            if makefile.exists():
+                files["Makefile"] = makefile.read_text(errors="replace")
+        else:
+            # single-file mode analyses main.<ext>
+            main = next((p for p in sources if p.stem == "main"), sources[0])
+            files = {f"main{ext}": main.read_text(errors="replace")}
+        rules_path = problem_dir / "rules.json"
+        rules = (json.loads(rules_path.read_text())
+                 if rules_path.exists() else DEFAULT_RULES)
+        cases.append(
+            Case(
+                name=str(problem_dir.relative_to(REPO_ROOT / "problem")),
+                language=language,
+                zip_mode=zip_mode,
+                files=files,
+                rules=rules,
+            ))
+    return cases
+
+
+def _py_module(i: int, scale: int, forbidden: bool) -> str:
+    lines = ["import math", "import collections", ""]
+    if forbidden:
+        lines.insert(0, "import os")
+    for j in range(scale):
+        lines += [
+            f"def f{i}_{j}(xs):",
+            "    total = 0",
+            "    for x in xs:",
+            "        if x % 2:",
+            "            total += math.isqrt(x)",
+            "    return collections.Counter(xs).most_common(1), total",
+            "",
+        ]
+    if forbidden:
+        lines += ["def run():", "    os.system('id')", "    eval('1')", ""]
+    return "\n".join(lines)
+
+
+def _c_unit(i: int, scale: int, forbidden: bool, cpp: bool) -> str:
+    if cpp:
+        lines = ["#include <bits/stdc++.h>", "using namespace std;", ""]
+    else:
+        lines = ["#include <stdio.h>", "#include <stdlib.h>", ""]
+    for j in range(scale):
+        lines += [
+            f"int f{i}_{j}(int n) {{",
+            "    int total = 0;",
+            "    for (int k = 0; k < n; ++k) {",
+            "        if (k % 3 == 0) total += k; else total -= 1;",
+            "    }",
+            "    return total;",
+            "}",
+            "",
+        ]
+    if forbidden:
+        lines += ["void run(void) { system(\"id\"); }", ""]
+    return "\n".join(lines)
+
+
+def _synthetic_cases(scale: int, zip_files: int) -> list[Case]:
+    cases = []
+    for language in (Language.PY, Language.C, Language.CPP):
+        ext = _EXT[language]
+        for zip_mode in (False, True):
+            for forbidden in (False, True):
+                count = zip_files if zip_mode else 1
+
+                def unit(i, bad):
+                    if language == Language.PY:
+                        return _py_module(i, scale, bad)
+                    return _c_unit(i, scale, bad, language == Language.CPP)
+
+                files = {
+                    f"part{i}{ext}": unit(i, forbidden and i == 0)
+                    for i in range(1, count)
+                }
+                main_body = unit(0, forbidden and count == 1)
+                if language == Language.PY:
+                    main_body += "\nif __name__ == '__main__':\n    pass\n"
+                else:
+                    main_body += "\nint main(void) { return 0; }\n"
+                files[f"main{ext}"] = main_body
+                if forbidden and count > 1:
+                    files[f"part1{ext}"] = unit(1, True)
+                if zip_mode and language != Language.PY:
+                    objs = " ".join(sorted(files))
+                    files["Makefile"] = f"all:\n\tcc -o a.out {objs}\n"
+                cases.append(
+                    Case(
+                        name=(f"synthetic/{language.name.lower()}-"
+                              f"{'zip' if zip_mode else 'single'}-"
+                              f"{'forbidden' if forbidden else 'clean'}"),
+                        language=language,
+                        zip_mode=zip_mode,
+                        files=files,
+                        rules=DEFAULT_RULES,
+                        forbidden=forbidden,
+                    ))
+    return cases
+
+
+# -----------------------------------------------------------------------------
+# Runner
+# -----------------------------------------------------------------------------
+def _materialise(case: Case, root: Path) -> Path:
+    submission = root / case.name.replace("/", "__")
+    common = submission / "src" / "common"
+    common.mkdir(parents=True)
+    for name, text in case.files.items():
+        (common / name).write_text(text)
+    return submission
+
+
+def _meta(case: Case) -> Meta:
+    return Meta(
+        language=case.language,
+        tasks=[
+            Task(taskScore=100, memoryLimit=65536, timeLimit=1000, caseCount=1)
+        ],
+        acceptedFormat=(AcceptedFormat.ZIP
+                        if case.zip_mode else AcceptedFormat.CODE),
+        buildStrategy=(BuildStrategy.MAKE_NORMAL
+                       if case.zip_mode else BuildStrategy.COMPILE),
+    )
+
+
+def run_case(case: Case, submission: Path, timer: PhaseTimer,
+             trace_memory: bool) -> CaseResult:
+    timer.reset()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with timer.phase("rules"):
+        rules = pipeline.get_problem_rules(case.problem_id)
+    success, payload, _ = static_analysis.run_static_analysis(
+        submission_id=submission.name,
+        submission_path=submission,
+        meta=_meta(case),
+        rules_json=rules,
+        is_zip_mode=case.zip_mode,
+    )
+    total = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    verdict = (payload or {}).get("status") or ("pass" if success else "fail")
+    return CaseResult(case, verdict, total, dict(timer.totals), peak)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:9.1f}"
+
+
+def report(results: list[CaseResult], wall: float, trace_memory: bool):
+    header = (f"{'case':<48} {'verdict':<7} {'total':>9} " +
+              " ".join(f"{p:>10}" for p in PHASES))
+    if trace_memory:
+        header += f" {'py-peak':>9}"
+    print(header)
+    print("-" * len(header))
+    by_name = defaultdict(list)
+    for result in results:
+        by_name[result.case.name].append(result)
+    for name, runs in by_name.items():
+        mean_total = statistics.mean(r.total for r in runs)
+        phase_cols = " ".join(
+            f"{_ms(statistics.mean(r.phases.get(p, 0.0) for r in runs)):>10}"
+            for p in PHASES)
+        line = f"{name[:48]:<48} {runs[-1].verdict:<7} {_ms(mean_total)} {phase_cols}"
+        if trace_memory:
+            peak = max(r.peak_py_bytes for r in runs)
+            line += f" {peak / 2**20:7.1f}MB"
+        print(line)
+
+    print()
+    totals = {p: sum(r.phases.get(p, 0.0) for r in results) for p in PHASES}
+    analysed = sum(r.total for r in results)
+    print(f"analyses: {len(results)}  wall: {wall:.2f}s  "
+          f"throughput: {len(results) / wall:.1f} analyses/s")
+    for phase in PHASES:
+        share = totals[phase] / analysed * 100 if analysed else 0.0
+        print(f"  {phase:<11} {_ms(totals[phase])} ms  {share:5.1f}%")
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"peak RSS: {max_rss / 1024:.1f} MB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only",
+                        choices=("all", "problems", "synthetic"),
+                        default="all")
+    parser.add_argument("--language",
+                        choices=("all", "c", "cpp", "py"),
+                        default="all")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--scale",
+                        type=int,
+                        default=20,
+                        help="functions per generated source file")
+    parser.add_argument("--zip-files",
+                        type=int,
+                        default=4,
+                        help="source files per generated zip project")
+    parser.add_argument(
+        "--file-workers",
+        type=int,
+        default=1,
+        help="SA_FILE_WORKERS; with more than one, phase times of the "
+        "parallel files add up and can exceed the wall time")
+    parser.add_argument("--warm",
+                        action="store_true",
+                        help="keep the per-file fact cache between runs")
+    parser.add_argument("--trace-memory",
+                        action="store_true",
+                        help="track Python heap peak per case (slow)")
+    parser.add_argument("--json", type=Path, help="write raw results here")
+    args = parser.parse_args()
+
+    cases = []
+    if args.only in ("all", "problems"):
+        cases += _problem_cases()
+    if args.only in ("all", "synthetic"):
+        cases += _synthetic_cases(args.scale, args.zip_files)
+    if args.language != "all":
+        wanted = {"c": Language.C, "cpp": Language.CPP, "py": Language.PY}
+        cases = [c for c in cases if c.language == wanted[args.language]]
+    if static_analysis.clang is None:
+        print("libclang missing: C/C++ cases only measure the skip path")
+    for problem_id, case in enumerate(cases, start=1):
+        case.problem_id = problem_id
+
+    # no backend: rules come straight from the corpus
+    rules_by_id = {case.problem_id: case.rules for case in cases}
+    pipeline._request_problem_rules = lambda pid: rules_by_id[pid]
+    pipeline.invalidate_problem_rules()
+    dispatcher_config.SA_FILE_WORKERS = args.file_workers
+    if not args.warm:
+        dispatcher_config.SA_FILE_CACHE_SIZE = 0
+    static_analysis._detect_include_args.cache_clear()
+
+    timer = PhaseTimer()
+    instrument(timer)
+    root = Path(tempfile.mkdtemp(prefix="bench-sa-"))
+    results = []
+    try:
+        submissions = {case.name: _materialise(case, root) for case in cases}
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for case in cases:
+                results.append(
+                    run_case(case, submissions[case.name], timer,
+                             args.trace_memory))
+        wall = time.perf_counter() - start
+    finally:
+        timer.restore()
+        shutil.rmtree(root, ignore_errors=True)
+
+    report(results, wall, args.trace_memory)
+    unexpected = [
+        r.case.name for r in results
+        if r.case.forbidden and r.verdict == "pass"
+    ]
+    if unexpected:
+        print(f"forbidden cases that passed: {sorted(set(unexpected))}")
+    if args.json:
+        args.json.write_text(
+            json.dumps([{
+                "case": r.case.name,
+                "language": r.case.language.name,
+                "zip": r.case.zip_mode,
+                "verdict": r.verdict,
+                "total": r.total,
+                "phases": r.phases,
+                "peakPyBytes": r.peak_py_bytes,
+            } for r in results],
+                       indent=2))
+    return 1 if unexpected else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
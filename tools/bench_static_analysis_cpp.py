@@ -0,0 +1,120 @@
+"""Benchmark libclang static analysis on C++ submissions.
+
+Generates ``--submissions`` small C++ programs that start with
+``#include <bits/stdc++.h>`` (the usual competitive-programming preamble)
+and analyses each of them the way ``StaticAnalyzer._analyze_c_cpp`` does,
+once parsing the headers from source and once through the precompiled
+header cache (``SA_CLANG_PCH``). Parse and AST walk time are reported
+separately, and the facts of both modes are compared.
+
+Example::
+
+    python tools/bench_static_analysis_cpp.py --submissions 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import clang.cindex  # noqa: E402
+
+from dispatcher import config as dispatcher_config  # noqa: E402
+from dispatcher import static_analysis  # noqa: E402
+from dispatcher.constant import Language  # noqa: E402
+
+TEMPLATE = """#include <bits/stdc++.h>
+using namespace std;
+
+int solve_{i}(const vector<int>& v) {{
+    int best = 0;
+    for (size_t j = 0; j < v.size(); ++j) {{
+        best = max(best, v[j] * {i});
+    }}
+    return best;
+}}
+
+int main() {{
+    int n;
+    scanf("%d", &n);
+    vector<int> v(n);
+    for (auto& x : v) cin >> x;
+    sort(v.begin(), v.end());
+    printf("%d\\n", solve_{i}(v));
+    return 0;
+}}
+"""
+
+LANG_ARGS = ["-x", "c++", "-std=c++17"]
+
+
+def analyse(path: Path, use_pch: bool):
+    dispatcher_config.SA_CLANG_PCH = use_pch
+    include_args = static_analysis.detect_include_args()
+    pch_args = static_analysis._pch_args(path, Language.CPP, LANG_ARGS,
+                                         include_args)
+    start = time.perf_counter()
+    tu = static_analysis._get_clang_index().parse(
+        str(path),
+        args=LANG_ARGS + include_args + pch_args,
+        options=clang.cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD,
+    )
+    parsed = time.perf_counter()
+    visitor = static_analysis.CppAstVisitor(str(path), file_name=path.name)
+    visitor.visit(tu.cursor)
+    visitor.detect_cycles()
+    walked = time.perf_counter()
+    return parsed - start, walked - parsed, visitor.facts
+
+
+def summarise(label: str, samples: list[float]) -> str:
+    return (f"{label:<6} mean {statistics.mean(samples) * 1000:8.1f} ms  "
+            f"min {min(samples) * 1000:8.1f} ms  "
+            f"max {max(samples) * 1000:8.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-sa-cpp-") as tmp:
+        paths = []
+        for i in range(args.submissions):
+            path = Path(tmp) / f"sub{i}" / "main.cpp"
+            path.parent.mkdir()
+            path.write_text(TEMPLATE.format(i=i))
+            paths.append(path)
+
+        results = {}
+        for mode, use_pch in (("source", False), ("pch", True)):
+            if use_pch:
+                # the first submission pays for building the PCH
+                start = time.perf_counter()
+                analyse(paths[0], True)
+                print(f"pch build + first analysis: "
+                      f"{(time.perf_counter() - start) * 1000:.1f} ms")
+            parse, walk, facts = [], [], []
+            for path in paths:
+                p, w, f = analyse(path, use_pch)
+                parse.append(p)
+                walk.append(w)
+                facts.append(f)
+            results[mode] = facts
+            print(f"[{mode}] {len(paths)} submissions")
+            print("  " + summarise("parse", parse))
+            print("  " + summarise("walk", walk))
+
+    same = results["source"] == results["pch"]
+    print(f"facts identical: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
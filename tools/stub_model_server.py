@@ -0,0 +1,136 @@
+"""Local stand-in for the Gemini generateContent API.
+
+Answers ``POST /v1beta/models/<model>:generateContent`` after a fixed
+latency, so AI checkers and the AI gateway (``runner/ai_gateway.py``) can be
+exercised and load-tested offline. The reply is "CORRECT" when most words of
+the prompt's ``Expected Answer:`` line appear in its ``Student Answer:``
+line, "INCORRECT" otherwise. ``GET /stats`` returns the number of requests
+and the highest number served at once.
+
+Point the gateway at it with ``AI_GATEWAY_UPSTREAM=http://<host>:<port>``.
+
+Example::
+
+    python tools/stub_model_server.py --host 0.0.0.0 --port 9090 --latency 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GENERATE_PATH = re.compile(r"^/v1beta/models/([^/:]+):generateContent")
+
+
+class StubModel:
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+
+    @staticmethod
+    def grade(prompt: str) -> str:
+        fields = dict(
+            re.findall(r"^\s*(Expected Answer|Student Answer):(.*)$", prompt,
+                       re.MULTILINE))
+        expected = set(fields.get("Expected Answer", "").lower().split())
+        student = set(fields.get("Student Answer", "").lower().split())
+        if expected and len(expected & student) / len(expected) < 0.7:
+            return "INCORRECT The answer does not match the expected one."
+        return "CORRECT The answer matches the expected one."
+
+    def generate(self, model: str, request: dict) -> dict:
+        with self._lock:
+            self.requests += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.latency)
+            prompt = "\n".join(
+                part.get("text", "")
+                for content in request.get("contents", [])
+                for part in content.get("parts", []))
+            return {
+                "candidates": [{
+                    "content": {
+                        "role": "model",
+                        "parts": [{
+                            "text": self.grade(prompt)
+                        }],
+                    },
+                    "finishReason": "STOP",
+                }],
+                "modelVersion":
+                model,
+            }
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "maxActive": self.max_active}
+
+
+def make_server(host: str, port: int, model: StubModel) -> ThreadingHTTPServer:
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(
+                self.headers.get("Content-Length") or 0))
+            match = GENERATE_PATH.match(self.path)
+            if match is None:
+                self._reply(404, {"error": {"message": "not found"}})
+                return
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError:
+                self._reply(400, {"error": {"message": "invalid JSON"}})
+                return
+            self._reply(200, model.generate(match.group(1), request))
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._reply(200, model.stats())
+            else:
+                self._reply(404, {"error": {"message": "not found"}})
+
+        def _reply(self, status: int, payload: dict):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9090)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, StubModel(args.latency))
+    print(f"stub model server on http://{args.host}:{server.server_port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()